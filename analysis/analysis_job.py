@@ -3,15 +3,28 @@ Orchestrated analysis job - SQLite to MetricsJSON pipeline.
 Queries database, calls pure functions, persists analysis JSON.
 """
 
+import os
 import sqlite3
 import json
+import hashlib
+import threading
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import date, datetime
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the stdlib encoder when orjson isn't installed
+    orjson = None
 
 # Import the metrics aggregator
-from analysis.metrics_aggregator import compose_metrics
+from analysis.metrics_aggregator import compose_metrics, CALCULATION_VERSION
 
 
 class AnalysisJobError(Exception):
@@ -19,13 +32,81 @@ class AnalysisJobError(Exception):
     pass
 
 
+# Column dtypes for price rows read straight off the cursor.
+# Prices stay float64 on purpose: close is reported verbatim in MetricsJSON
+# (float32 turns 223.55 into 223.5500030517578), and mixing float32
+# open/high/low with float64 close would make the high >= close integrity
+# check flag equal values as violations. Only columns the metrics and
+# guardrails read are selected (prices.as_of and holdings_13f.name are not).
+_PRICE_COLUMNS = {
+    'ticker': object,
+    'date': object,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'adj_close': np.float64,
+    'volume': np.int64,
+    'source': object
+}
+
+# value_usd and shares stay float64: share counts above 2**24 are not exact
+# in float32 and both are reported in top_holders
+_HOLDINGS_COLUMNS = {
+    'cik': object,
+    'filer': object,
+    'ticker': object,
+    'cusip': object,
+    'value_usd': np.float64,
+    'shares': np.float64,
+    'as_of': object,
+    'source': object
+}
+
+# Stay under SQLite's historical 999 bound-parameter limit for IN (...) lists
+_MAX_IN_PARAMS = 900
+
+# Query text is kept constant so sqlite3's statement cache can reuse the
+# compiled statement across tickers
+_PRICE_QUERY = """
+    SELECT ticker, date, open, high, low, close, adj_close, volume, source
+    FROM prices 
+    WHERE ticker = ?
+"""
+
+_HOLDINGS_QUARTER_QUERY = """
+    SELECT cik, filer, ticker, cusip, value_usd, shares, as_of, source
+    FROM holdings_13f
+    WHERE ticker = ? AND as_of = ?
+    ORDER BY value_usd DESC
+"""
+
+# Resolve the latest quarter once (an index seek on idx_13f_ticker_as_of)
+# and join on it, instead of a correlated MAX subquery; ?1 binds the
+# ticker for both references
+_HOLDINGS_LATEST_QUERY = """
+    WITH latest AS (
+        SELECT as_of FROM holdings_13f
+        WHERE ticker = ?1
+        ORDER BY as_of DESC
+        LIMIT 1
+    )
+    SELECT h.cik, h.filer, h.ticker, h.cusip, h.value_usd, h.shares,
+           h.as_of, h.source
+    FROM holdings_13f AS h, latest
+    WHERE h.ticker = ?1 AND h.as_of = latest.as_of
+    ORDER BY h.value_usd DESC
+"""
+
+
 def analyze_ticker(
     conn: sqlite3.Connection,
     ticker: str,
     output_path: Path,
     as_of_date: Optional[date] = None,
     start_date: Optional[date] = None,
-    end_date: Optional[date] = None
+    end_date: Optional[date] = None,
+    db_path: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Run complete analysis for a ticker and save results to JSON.
@@ -33,10 +114,13 @@ def analyze_ticker(
     Args:
         conn: SQLite database connection
         ticker: Stock ticker to analyze
-        output_path: Path to save MetricsJSON file
+        output_path: Path to save MetricsJSON file; an input digest is kept
+            beside it as <stem>.hash so reruns on unchanged data reuse it
         as_of_date: Date for analysis (defaults to today)
         start_date: Start of price data window (optional filter)
         end_date: End of price data window (optional filter)
+        db_path: Database file backing conn; when given, the price and
+            holdings queries run concurrently on two read-only connections
         
     Returns:
         Dictionary with job results and summary
@@ -50,26 +134,113 @@ def analyze_ticker(
     start_time = datetime.now()
     
     try:
-        # Query price data
-        price_df = _query_price_data(conn, ticker, start_date, end_date)
+        if db_path is not None:
+            price_df, holdings_df = _query_ticker_data_concurrently(
+                db_path, ticker, start_date, end_date
+            )
+        else:
+            # Query price data, then 13F holdings only if there is something to analyze
+            price_df = _query_price_data(conn, ticker, start_date, end_date)
+            holdings_df = _query_holdings_data(conn, ticker) if not price_df.empty else None
+    except Exception as e:
+        return _failed_result(ticker, str(e), start_time)
+    
+    return _analyze_frames(ticker, price_df, holdings_df, output_path, as_of_date, start_time)
+
+
+def _query_ticker_data_concurrently(
+    db_path: str,
+    ticker: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run the price and holdings queries at the same time.
+    
+    The two reads are independent and sqlite3 releases the GIL while
+    stepping statements, so each gets its own read-only connection opened
+    inside its worker thread.
+    
+    Args:
+        db_path: Path to SQLite database file
+        ticker: Stock ticker
+        start_date: Optional start date filter
+        end_date: Optional end date filter
         
-        if price_df.empty:
+    Returns:
+        Tuple of (price_df, holdings_df)
+    """
+    # as_uri() percent-encodes '#', '?' and '%' so they stay part of the path
+    uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+    
+    def run(query_func, *args):
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            return query_func(conn, ticker, *args)
+        finally:
+            conn.close()
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        price_future = executor.submit(run, _query_price_data, start_date, end_date)
+        holdings_future = executor.submit(run, _query_holdings_data)
+        return price_future.result(), holdings_future.result()
+
+
+def _analyze_frames(
+    ticker: str,
+    price_df: pd.DataFrame,
+    holdings_df: Optional[pd.DataFrame],
+    output_path: Path,
+    as_of_date: date,
+    start_time: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Compose metrics from already-loaded frames and save them to JSON.
+    
+    Module-level and free of connection state so it can run in a worker
+    process during batch analysis.
+    
+    Args:
+        ticker: Stock ticker to analyze
+        price_df: Price rows for the ticker
+        holdings_df: Latest-quarter 13F rows for the ticker (optional)
+        output_path: Path to save MetricsJSON file
+        as_of_date: Date for analysis
+        start_time: When work on this ticker started (defaults to now)
+        
+    Returns:
+        Dictionary with job results and summary
+    """
+    if start_time is None:
+        start_time = datetime.now()
+    
+    if price_df.empty:
+        return _failed_result(ticker, f'No price data found for ticker {ticker}', start_time)
+    
+    if holdings_df is not None and holdings_df.empty:
+        holdings_df = None
+    
+    try:
+        # Skip recomposition when the inputs match the last run for this path
+        digest = _input_digest(price_df, holdings_df, as_of_date)
+        hash_path = output_path.with_suffix('.hash')
+        
+        if _cached_digest(hash_path) == digest and output_path.exists():
+            metrics_json = _read_metrics_json(output_path)
             return {
                 'ticker': ticker,
-                'status': 'failed',
-                'error_message': f'No price data found for ticker {ticker}',
-                'output_path': None,
-                'metrics_calculated': 0,
+                'status': 'completed',
+                'output_path': str(output_path),
+                'metrics_calculated': _count_calculated_metrics(metrics_json),
+                'price_data_points': len(price_df),
+                'holdings_data_points': len(holdings_df) if holdings_df is not None else 0,
                 'duration_seconds': (datetime.now() - start_time).total_seconds()
             }
         
-        # Query 13F holdings data
-        holdings_df = _query_holdings_data(conn, ticker)
-        
         # Compose all metrics
         metrics_json = compose_metrics(
             price_df=price_df,
-            holdings_df=holdings_df if not holdings_df.empty else None,
+            holdings_df=holdings_df,
             ticker=ticker,
             as_of_date=as_of_date
         )
@@ -77,9 +248,11 @@ def analyze_ticker(
         # Create output directory if needed
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save metrics to file
-        with open(output_path, 'w') as f:
-            json.dump(metrics_json, f, indent=2, default=str)
+        # Drop the old digest first: if the run dies between the two writes,
+        # the new JSON must not be paired with the previous inputs' digest
+        hash_path.unlink(missing_ok=True)
+        _write_metrics_json(metrics_json, output_path)
+        _write_digest(hash_path, digest)
         
         # Count calculated metrics
         metrics_count = _count_calculated_metrics(metrics_json)
@@ -90,19 +263,143 @@ def analyze_ticker(
             'output_path': str(output_path),
             'metrics_calculated': metrics_count,
             'price_data_points': len(price_df),
-            'holdings_data_points': len(holdings_df) if not holdings_df.empty else 0,
+            'holdings_data_points': len(holdings_df) if holdings_df is not None else 0,
             'duration_seconds': (datetime.now() - start_time).total_seconds()
         }
         
     except Exception as e:
-        return {
-            'ticker': ticker,
-            'status': 'failed', 
-            'error_message': str(e),
-            'output_path': None,
-            'metrics_calculated': 0,
-            'duration_seconds': (datetime.now() - start_time).total_seconds()
-        }
+        return _failed_result(ticker, str(e), start_time)
+
+
+def _input_digest(
+    price_df: pd.DataFrame,
+    holdings_df: Optional[pd.DataFrame],
+    as_of_date: date
+) -> str:
+    """
+    Content hash of everything compose_metrics output depends on.
+    
+    Rows are hashed by value (hash_pandas_object), not by buffer, since
+    object columns would otherwise hash pointers. The run date is included
+    because 13F age and filing lag are measured against today.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(price_df, index=False).values.tobytes())
+    if holdings_df is not None:
+        h.update(pd.util.hash_pandas_object(holdings_df, index=False).values.tobytes())
+    h.update(f'{as_of_date}|{date.today()}|{CALCULATION_VERSION}'.encode())
+    return h.hexdigest()
+
+
+def _cached_digest(hash_path: Path) -> Optional[str]:
+    """Read the input digest recorded by the previous run, if any."""
+    try:
+        return hash_path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _temp_path(path: Path) -> Path:
+    """
+    Per-writer temp file beside path for write-then-rename.
+    
+    Named by process and thread so pooled workers writing the same target
+    (a ticker listed twice in a batch) never share or rename each other's
+    temp file. Unlike mkstemp, the file keeps the umask's permissions.
+    """
+    return path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+
+def _write_digest(hash_path: Path, digest: str) -> None:
+    """Record the input digest for output_path, renamed into place like the JSON."""
+    tmp_path = _temp_path(hash_path)
+    
+    try:
+        tmp_path.write_text(digest)
+        os.replace(tmp_path, hash_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _read_metrics_json(output_path: Path) -> Dict[str, Any]:
+    """Load a previously written MetricsJSON file."""
+    if orjson is not None:
+        return orjson.loads(output_path.read_bytes())
+    with open(output_path, 'r') as f:
+        return json.load(f)
+
+
+def _write_metrics_json(metrics_json: Dict[str, Any], output_path: Path) -> None:
+    """
+    Serialize MetricsJSON to disk.
+    
+    Uses orjson when available: its native encoder handles dates and NumPy
+    scalars without a Python-level default hook per value. The file is
+    written beside the target and renamed into place, so readers never see
+    a partially written file.
+    """
+    tmp_path = _temp_path(output_path)
+    
+    try:
+        if orjson is not None:
+            tmp_path.write_bytes(orjson.dumps(
+                metrics_json,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
+        else:
+            with open(tmp_path, 'w') as f:
+                json.dump(metrics_json, f, indent=2, default=str)
+        
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _failed_result(ticker: str, error_message: str, start_time: datetime) -> Dict[str, Any]:
+    """Build the job summary for a ticker that could not be analyzed."""
+    return {
+        'ticker': ticker,
+        'status': 'failed',
+        'error_message': error_message,
+        'output_path': None,
+        'metrics_calculated': 0,
+        'duration_seconds': (datetime.now() - start_time).total_seconds()
+    }
+
+
+def _frame_from_rows(
+    rows: Sequence[Tuple],
+    column_dtypes: Dict[str, Any],
+    date_column: str
+) -> pd.DataFrame:
+    """
+    Build a DataFrame from raw cursor rows with typed NumPy columns.
+    
+    Args:
+        rows: Tuples in the same column order as column_dtypes
+        column_dtypes: Ordered mapping of column name to NumPy dtype
+        date_column: Column holding ISO date strings to convert to date objects
+        
+    Returns:
+        DataFrame with the given columns (empty if no rows)
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(column_dtypes)
+    
+    data = {
+        name: np.array(values, dtype=dtype)
+        for (name, dtype), values in zip(column_dtypes.items(), columns)
+    }
+    
+    # Convert ISO date strings to date objects
+    data[date_column] = np.array(
+        [d if isinstance(d, date) else date.fromisoformat(d[:10]) for d in data[date_column]],
+        dtype=object
+    )
+    
+    return pd.DataFrame(data)
 
 
 def _query_price_data(
@@ -124,11 +421,7 @@ def _query_price_data(
         DataFrame with price data
     """
     # Build query with optional date filters
-    base_query = """
-        SELECT ticker, date, open, high, low, close, adj_close, volume, source, as_of
-        FROM prices 
-        WHERE ticker = ?
-    """
+    base_query = _PRICE_QUERY
     params = [ticker]
     
     if start_date is not None:
@@ -141,14 +434,11 @@ def _query_price_data(
     
     base_query += " ORDER BY date ASC"
     
-    # Execute query
-    df = pd.read_sql_query(base_query, conn, params=params)
-    
-    # Convert date strings to date objects if needed
-    if not df.empty and 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date']).dt.date
+    # Execute query directly; pandas' read_sql path builds a row-wise
+    # object frame first, which dominates cost for long price histories
+    rows = conn.execute(base_query, params).fetchall()
     
-    return df
+    return _frame_from_rows(rows, _PRICE_COLUMNS, 'date')
 
 
 def _query_holdings_data(
@@ -169,32 +459,110 @@ def _query_holdings_data(
     """
     if quarter_end is not None:
         # Query specific quarter
-        query = """
-            SELECT cik, filer, ticker, name, cusip, value_usd, shares, as_of, source
-            FROM holdings_13f
-            WHERE ticker = ? AND as_of = ?
-            ORDER BY value_usd DESC
-        """
+        query = _HOLDINGS_QUARTER_QUERY
         params = [ticker, quarter_end]
     else:
         # Get most recent quarter for ticker
-        query = """
-            SELECT cik, filer, ticker, name, cusip, value_usd, shares, as_of, source
-            FROM holdings_13f
-            WHERE ticker = ? AND as_of = (
-                SELECT MAX(as_of) FROM holdings_13f WHERE ticker = ?
-            )
-            ORDER BY value_usd DESC
+        query = _HOLDINGS_LATEST_QUERY
+        params = [ticker]
+    
+    # A few hundred rows at most; skip read_sql_query and to_datetime and
+    # build the frame straight from the cursor like the price path
+    rows = conn.execute(query, params).fetchall()
+    
+    return _frame_from_rows(rows, _HOLDINGS_COLUMNS, 'as_of')
+
+
+def _query_prices_bulk(
+    conn: sqlite3.Connection,
+    tickers: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Query price data for many tickers with batched IN queries.
+    
+    Args:
+        conn: SQLite connection
+        tickers: Stock tickers
+        start_date: Optional start date filter
+        end_date: Optional end date filter
+        
+    Returns:
+        Dictionary mapping ticker to its price DataFrame (tickers without
+        rows are omitted)
+    """
+    frames = {}
+    unique_tickers = list(dict.fromkeys(tickers))
+    
+    for i in range(0, len(unique_tickers), _MAX_IN_PARAMS):
+        chunk = unique_tickers[i:i + _MAX_IN_PARAMS]
+        placeholders = ','.join('?' * len(chunk))
+        
+        query = f"""
+            SELECT ticker, date, open, high, low, close, adj_close, volume, source
+            FROM prices
+            WHERE ticker IN ({placeholders})
         """
-        params = [ticker, ticker]
+        params = list(chunk)
+        
+        if start_date is not None:
+            query += " AND date >= ?"
+            params.append(start_date)
+        
+        if end_date is not None:
+            query += " AND date <= ?"
+            params.append(end_date)
+        
+        query += " ORDER BY ticker, date ASC"
+        
+        rows = conn.execute(query, params).fetchall()
+        for ticker, ticker_rows in groupby(rows, key=itemgetter(0)):
+            frames[ticker] = _frame_from_rows(list(ticker_rows), _PRICE_COLUMNS, 'date')
     
-    df = pd.read_sql_query(query, conn, params=params)
+    return frames
+
+
+def _query_holdings_bulk(
+    conn: sqlite3.Connection,
+    tickers: List[str]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Query most recent quarter 13F holdings for many tickers at once.
+    
+    Args:
+        conn: SQLite connection
+        tickers: Stock tickers
+        
+    Returns:
+        Dictionary mapping ticker to its holdings DataFrame (tickers without
+        rows are omitted)
+    """
+    frames = {}
+    unique_tickers = list(dict.fromkeys(tickers))
     
-    # Convert date strings if needed
-    if not df.empty and 'as_of' in df.columns:
-        df['as_of'] = pd.to_datetime(df['as_of']).dt.date
+    for i in range(0, len(unique_tickers), _MAX_IN_PARAMS):
+        chunk = unique_tickers[i:i + _MAX_IN_PARAMS]
+        placeholders = ','.join('?' * len(chunk))
+        
+        # Window function picks each ticker's latest quarter in one scan
+        query = f"""
+            SELECT cik, filer, ticker, cusip, value_usd, shares, as_of, source
+            FROM (
+                SELECT cik, filer, ticker, cusip, value_usd, shares, as_of, source,
+                       MAX(as_of) OVER (PARTITION BY ticker) AS latest_as_of
+                FROM holdings_13f
+                WHERE ticker IN ({placeholders})
+            )
+            WHERE as_of = latest_as_of
+            ORDER BY ticker, value_usd DESC
+        """
+        
+        rows = conn.execute(query, chunk).fetchall()
+        for ticker, ticker_rows in groupby(rows, key=itemgetter(2)):
+            frames[ticker] = _frame_from_rows(list(ticker_rows), _HOLDINGS_COLUMNS, 'as_of')
     
-    return df
+    return frames
 
 
 def _count_calculated_metrics(metrics_json: Dict[str, Any]) -> int:
@@ -245,16 +613,26 @@ def batch_analyze_tickers(
     conn: sqlite3.Connection,
     tickers: List[str],
     output_dir: Path,
-    as_of_date: Optional[date] = None
+    as_of_date: Optional[date] = None,
+    max_workers: int = 1,
+    use_threads: bool = False,
+    parquet_root: Optional[Path] = None
 ) -> Dict[str, Any]:
     """
     Run analysis for multiple tickers.
     
+    Data is loaded once on the calling connection; only the per-ticker
+    metric composition and JSON write are fanned out to workers, so the
+    connection is never shared across processes.
+    
     Args:
         conn: SQLite connection
         tickers: List of ticker symbols
         output_dir: Directory to save JSON files
         as_of_date: Analysis date
+        max_workers: Number of parallel workers (1 runs serially)
+        use_threads: Use a thread pool instead of a process pool
+        parquet_root: Also append completed metrics to this Parquet dataset
         
     Returns:
         Summary of batch analysis results
@@ -264,23 +642,43 @@ def batch_analyze_tickers(
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    results = []
     start_time = datetime.now()
     
-    for ticker in tickers:
-        output_path = output_dir / f'{ticker}.json'
-        
-        result = analyze_ticker(
-            conn=conn,
-            ticker=ticker,
-            output_path=output_path,
-            as_of_date=as_of_date
+    # Two round-trips for the whole batch instead of two per ticker
+    price_frames = _query_prices_bulk(conn, tickers)
+    holdings_frames = _query_holdings_bulk(conn, tickers)
+    empty_prices = _frame_from_rows([], _PRICE_COLUMNS, 'date')
+    
+    jobs = [
+        (
+            ticker,
+            price_frames.get(ticker, empty_prices),
+            holdings_frames.get(ticker),
+            output_dir / f'{ticker}.json',
+            as_of_date
         )
-        
-        results.append(result)
+        for ticker in tickers
+    ]
+    
+    if max_workers > 1 and len(jobs) > 1:
+        executor_cls = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+        with executor_cls(max_workers=max_workers) as executor:
+            futures = [executor.submit(_analyze_frames, *job) for job in jobs]
+            # Collect in submission order so the summary is deterministic
+            results = [future.result() for future in futures]
+    else:
+        results = [_analyze_frames(*job) for job in jobs]
     
     # Calculate summary statistics
     completed = [r for r in results if r['status'] == 'completed']
+    
+    if parquet_root is not None and completed:
+        # Imported lazily so JSON-only runs don't pay for pyarrow
+        from analysis.sinks.parquet_sink import append_metrics
+        append_metrics(
+            parquet_root,
+            [_read_metrics_json(Path(r['output_path'])) for r in completed]
+        )
     failed = [r for r in results if r['status'] == 'failed']
     
     total_metrics = sum(r.get('metrics_calculated', 0) for r in completed)
@@ -1,22 +1,23 @@
 #!/usr/bin/env python3
 """
 CLI tool for analyzing individual tickers.
-Usage: python analysis/analyze_ticker.py TICKER [options]
+Usage: python -m analysis.analyze_ticker TICKER [options]
 """
 
 import sys
-import sqlite3
 import argparse
 import json
-from datetime import date, datetime
+from datetime import date
 from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+# Only needed when run as a plain script (python analysis/analyze_ticker.py)
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from analysis.analysis_job import analyze_ticker
-from storage.loaders import get_connection
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def main():
@@ -26,9 +27,9 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
-  python analysis/analyze_ticker.py AAPL
-  python analysis/analyze_ticker.py MSFT --as-of 2025-08-01
-  python analysis/analyze_ticker.py GOOGL --start 2025-01-01 --end 2025-08-01
+  python -m analysis.analyze_ticker AAPL
+  python -m analysis.analyze_ticker MSFT --as-of 2025-08-01
+  python -m analysis.analyze_ticker GOOGL --start 2025-01-01 --end 2025-08-01
         """
     )
     
@@ -37,7 +38,8 @@ Examples:
                        default='./data/research.db',
                        help='Path to SQLite database (default: ./data/research.db)')
     parser.add_argument('--output',
-                       help='Output JSON file path (default: ./data/processed/metrics/{TICKER}.json)')
+                       help='Output JSON file path (default: ./data/processed/metrics/{TICKER}.json); '
+                            'a <name>.hash input digest is written beside it')
     parser.add_argument('--as-of',
                        type=date.fromisoformat,
                        default=date.today(),
@@ -48,12 +50,18 @@ Examples:
     parser.add_argument('--end',
                        type=date.fromisoformat,
                        help='End date for price data filter (YYYY-MM-DD)')
+    parser.add_argument('--parquet-root',
+                       help='Also append metrics to this Parquet dataset (partitioned by as_of_date)')
     parser.add_argument('--quiet', '-q',
                        action='store_true',
                        help='Minimal output (just success/failure)')
     
     args = parser.parse_args()
     
+    # Deferred so --help and argument errors don't pay for pandas/numpy
+    from analysis.analysis_job import analyze_ticker
+    from storage.loaders import get_connection
+    
     # Set default output path
     if args.output is None:
         output_dir = Path('./data/processed/metrics')
@@ -69,16 +77,20 @@ Examples:
         sys.exit(1)
     
     if not args.quiet:
-        print(f"🔍 Analyzing {args.ticker}")
-        print(f"📊 Database: {args.db_path}")
-        print(f"📅 Analysis date: {args.as_of}")
+        # Build each block up front and emit it with a single write
+        header = [
+            f"🔍 Analyzing {args.ticker}",
+            f"📊 Database: {args.db_path}",
+            f"📅 Analysis date: {args.as_of}"
+        ]
         if args.start or args.end:
-            print(f"📈 Price window: {args.start or 'earliest'} to {args.end or 'latest'}")
-        print()
+            header.append(f"📈 Price window: {args.start or 'earliest'} to {args.end or 'latest'}")
+        header.append("")
+        print('\n'.join(header))
     
     # Connect to database
     try:
-        conn = sqlite3.connect(args.db_path)
+        conn = get_connection(args.db_path)
     except Exception as e:
         print(f"❌ Database connection failed: {e}", file=sys.stderr)
         sys.exit(1)
@@ -91,21 +103,29 @@ Examples:
             output_path=args.output,
             as_of_date=args.as_of,
             start_date=args.start,
-            end_date=args.end
+            end_date=args.end,
+            db_path=args.db_path
         )
         
         if result['status'] == 'completed':
+            if args.parquet_root:
+                from analysis.sinks.parquet_sink import append_metrics
+                append_metrics(Path(args.parquet_root), [_load_metrics(result['output_path'])])
+            
             if not args.quiet:
-                print("✅ Analysis completed successfully!")
-                print(f"📊 Metrics calculated: {result['metrics_calculated']}")
-                print(f"📈 Price data points: {result['price_data_points']}")
-                print(f"🏢 Holdings data points: {result['holdings_data_points']}")
-                print(f"⏱️  Duration: {result['duration_seconds']:.1f}s")
-                print(f"💾 Results saved to: {result['output_path']}")
-                print()
+                lines = [
+                    "✅ Analysis completed successfully!",
+                    f"📊 Metrics calculated: {result['metrics_calculated']}",
+                    f"📈 Price data points: {result['price_data_points']}",
+                    f"🏢 Holdings data points: {result['holdings_data_points']}",
+                    f"⏱️  Duration: {result['duration_seconds']:.1f}s",
+                    f"💾 Results saved to: {result['output_path']}",
+                    ""
+                ]
                 
-                # Show quick summary
-                _show_quick_summary(result['output_path'])
+                # Append quick summary
+                lines.extend(_quick_summary_lines(result['output_path']))
+                print('\n'.join(lines))
             else:
                 print(f"✅ {args.ticker} analysis complete: {result['output_path']}")
             
@@ -123,54 +143,64 @@ Examples:
         conn.close()
 
 
-def _show_quick_summary(output_path: str):
-    """Show quick summary of calculated metrics."""
+def _load_metrics(output_path: str) -> dict:
+    """Load a MetricsJSON file written by the analysis job."""
+    if orjson is not None:
+        return orjson.loads(Path(output_path).read_bytes())
+    with open(output_path, 'r') as f:
+        return json.load(f)
+
+
+def _quick_summary_lines(output_path: str) -> list:
+    """Build quick summary lines for the calculated metrics."""
+    lines = []
     try:
-        with open(output_path, 'r') as f:
-            metrics = json.load(f)
+        metrics = _load_metrics(output_path)
         
         ticker = metrics['ticker']
         
-        print(f"📋 Quick Summary for {ticker}:")
+        lines.append(f"📋 Quick Summary for {ticker}:")
         
         # Price metrics
         pm = metrics.get('price_metrics', {})
         if pm.get('current_price'):
             current = pm['current_price']
-            print(f"   Current Price: ${current['close']:.2f} ({current['date']})")
+            lines.append(f"   Current Price: ${current['close']:.2f} ({current['date']})")
         
         returns = pm.get('returns', {})
         if returns.get('1D') is not None:
             ret_1d = returns['1D'] * 100
             direction = "📈" if ret_1d > 0 else "📉" if ret_1d < 0 else "➡️"
-            print(f"   1D Return: {direction} {ret_1d:+.2f}%")
+            lines.append(f"   1D Return: {direction} {ret_1d:+.2f}%")
         
         if returns.get('1M') is not None:
             ret_1m = returns['1M'] * 100
             direction = "📈" if ret_1m > 0 else "📉" if ret_1m < 0 else "➡️"
-            print(f"   1M Return: {direction} {ret_1m:+.2f}%")
+            lines.append(f"   1M Return: {direction} {ret_1m:+.2f}%")
         
         volatility = pm.get('volatility', {})
         if volatility.get('21D_annualized') is not None:
             vol = volatility['21D_annualized'] * 100
-            print(f"   Volatility (21D): {vol:.1f}%")
+            lines.append(f"   Volatility (21D): {vol:.1f}%")
         
         # Institutional metrics
         im = metrics.get('institutional_metrics')
         if im:
             total_value = im.get('total_13f_value_usd', 0)
             if total_value > 0:
-                print(f"   13F Holdings: ${total_value/1e9:.1f}B ({im.get('total_13f_holders', 0)} institutions)")
+                lines.append(f"   13F Holdings: ${total_value/1e9:.1f}B ({im.get('total_13f_holders', 0)} institutions)")
             
             concentration = im.get('concentration', {})
             if concentration.get('cr1') is not None:
                 cr1_pct = concentration['cr1'] * 100
-                print(f"   Top Holder: {cr1_pct:.1f}% of 13F value")
+                lines.append(f"   Top Holder: {cr1_pct:.1f}% of 13F value")
         
-        print()
+        lines.append("")
         
     except Exception as e:
-        print(f"⚠️  Could not show summary: {e}")
+        lines.append(f"⚠️  Could not show summary: {e}")
+    
+    return lines
 
 
 if __name__ == '__main__':
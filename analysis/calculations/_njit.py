@@ -0,0 +1,90 @@
+"""
+Optional numba JIT support for calculation kernels.
+Falls back to a no-op decorator so kernels run as plain Python/NumPy
+when numba is not installed. When it is, numba (~300ms to import) is
+only loaded the first time a kernel is called, so importing the
+calculation modules stays cheap for CLI runs that never reach one.
+"""
+
+import functools
+import threading
+import types
+from importlib.util import find_spec
+
+NUMBA_AVAILABLE = find_spec('numba') is not None
+
+
+def prange(*args):
+    """range() stand-in for kernel loops; numba.prange is swapped in at compile time."""
+    return range(*args)
+
+
+_COMPILE_LOCK = threading.Lock()
+
+
+class _LazyKernel:
+    """
+    numba.njit(**options)(func), built on first call.
+    
+    Kernel bodies refer to prange and to other kernels through module
+    globals, which at import time hold the stand-in and _LazyKernel
+    wrappers. The function is rebuilt over a copy of its globals with
+    numba.prange and the callees' real dispatchers substituted, so
+    nopython mode sees only types it can compile.
+    """
+    
+    def __init__(self, func, options):
+        functools.update_wrapper(self, func)
+        self.py_func = func
+        self._options = options
+        self._dispatcher = None
+    
+    def __call__(self, *args):
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            dispatcher = self.dispatcher()
+        return dispatcher(*args)
+    
+    def dispatcher(self):
+        """The numba Dispatcher for this kernel, creating it if needed."""
+        with _COMPILE_LOCK:
+            if self._dispatcher is None:
+                self._dispatcher = self._build()
+        return self._dispatcher
+    
+    def _build(self):
+        import numba
+        
+        func = self.py_func
+        namespace = dict(func.__globals__)
+        for name in func.__code__.co_names:
+            value = namespace.get(name)
+            if value is prange:
+                namespace[name] = numba.prange
+            elif isinstance(value, _LazyKernel) and value is not self:
+                # Lock is already held; build callees inline
+                if value._dispatcher is None:
+                    value._dispatcher = value._build()
+                namespace[name] = value._dispatcher
+        
+        jit_func = types.FunctionType(
+            func.__code__, namespace, func.__name__, func.__defaults__, func.__closure__
+        )
+        functools.update_wrapper(jit_func, func)
+        return numba.njit(**self._options)(jit_func)
+
+
+def njit(*args, **kwargs):
+    """
+    numba.njit that defers importing numba until the kernel is first called.
+    
+    Supports the bare (@njit) and called (@njit(cache=True)) forms; without
+    numba the function is returned unchanged.
+    """
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return njit()(args[0])
+    
+    if not NUMBA_AVAILABLE:
+        return lambda func: func
+    
+    return lambda func: _LazyKernel(func, kwargs)
@@ -3,7 +3,16 @@
 Pure functions for institutional ownership concentration metrics.
 """
 
-from typing import Dict, Union
+import heapq
+import math
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from analysis.calculations._njit import njit, NUMBA_AVAILABLE
+
+
+# Below this many holders, array setup costs more than pure-Python top-k
+_SMALL_HOLDER_COUNT = 64
 
 
 class ConcentrationError(Exception):
@@ -11,6 +20,91 @@ class ConcentrationError(Exception):
     pass
 
 
+def _holder_values(value_by_holder: Dict[str, float]) -> np.ndarray:
+    """Load holder values into a validated float64 array."""
+    if not value_by_holder:
+        raise ConcentrationError("No holders provided")
+    
+    return _validated_values(np.fromiter(
+        value_by_holder.values(), dtype=np.float64, count=len(value_by_holder)
+    ))
+
+
+def _validated_values(values: np.ndarray) -> np.ndarray:
+    """Contiguous float64 view of holder values, rejecting empty/non-positive input."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    
+    if values.size == 0:
+        raise ConcentrationError("No holders provided")
+    
+    # Check for non-positive values; a min reduction avoids a boolean temp array
+    if values.min() <= 0:
+        raise ConcentrationError("Non-positive values not allowed")
+    
+    return values
+
+
+def _top_values(values: np.ndarray) -> np.ndarray:
+    """Largest min(10, n) values of a validated array, ascending."""
+    # Partial sort: only the top 10 holders need ordering, not the full list
+    k = min(10, values.size)
+    top = np.partition(values, values.size - k)[-k:]
+    top.sort()
+    return top
+
+
+def _ratios_from_top(top: np.ndarray, total_value: float) -> Dict[str, float]:
+    """CR1/CR5/CR10 from the ascending top-10 buffer and the total."""
+    return {
+        'cr1': float(top[-1] / total_value),
+        'cr5': float(top[-min(5, top.size):].sum() / total_value),
+        'cr10': float(top.sum() / total_value)
+    }
+
+
+@njit(cache=True)
+def _concentration_kernel(values: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Single-pass top-10 selection and argmax over validated values.
+    
+    Keeps the top 10 in a small ascending buffer (insertion), so no
+    partition copy of the full array. Totals, ratios and HHI are left to
+    the caller's NumPy reductions: a sequential sum here would round
+    differently from NumPy's pairwise sum and break parity with the
+    fallback path (ADR-0006).
+    """
+    top = np.zeros(10)
+    count = 0
+    max_idx = 0
+    
+    for i in range(values.size):
+        v = values[i]
+        if v > values[max_idx]:
+            max_idx = i
+        
+        if count < 10:
+            j = count
+            count += 1
+        elif v > top[0]:
+            # Drop the current smallest and shift the insertion point down
+            j = 0
+            while j < 9 and top[j + 1] < v:
+                top[j] = top[j + 1]
+                j += 1
+            top[j] = v
+            continue
+        else:
+            continue
+        
+        # Insert into the filled prefix keeping it ascending
+        while j > 0 and top[j - 1] > v:
+            top[j] = top[j - 1]
+            j -= 1
+        top[j] = v
+    
+    return top[:count], max_idx
+
+
 def concentration_ratios(value_by_holder: Dict[str, float]) -> Dict[str, float]:
     """
     Calculate concentration ratios (CR1, CR5, CR10).
@@ -26,29 +120,47 @@ def concentration_ratios(value_by_holder: Dict[str, float]) -> Dict[str, float]:
     Raises:
         ConcentrationError: If invalid data
     """
+    if len(value_by_holder) > _SMALL_HOLDER_COUNT:
+        return concentration_ratios_arr(_holder_values(value_by_holder))
+    
     if not value_by_holder:
         raise ConcentrationError("No holders provided")
     
-    # Check for non-positive values
-    if any(value <= 0 for value in value_by_holder.values()):
+    values = value_by_holder.values()
+    if any(value <= 0 for value in values):
         raise ConcentrationError("Non-positive values not allowed")
     
-    # Sort holders by value (descending)
-    sorted_holders = sorted(value_by_holder.items(), key=lambda x: x[1], reverse=True)
-    total_value = sum(value_by_holder.values())
-    
-    # Calculate concentration ratios
-    def cr_n(n: int) -> float:
-        top_n_value = sum(value for _, value in sorted_holders[:n])
-        return top_n_value / total_value
+    # O(n log 10) heap selection; fsum keeps the small sums exactly rounded
+    top = heapq.nlargest(10, values)
+    total_value = math.fsum(values)
     
     return {
-        'cr1': cr_n(1),
-        'cr5': cr_n(5), 
-        'cr10': cr_n(10)
+        'cr1': float(top[0] / total_value),
+        'cr5': float(math.fsum(top[:5]) / total_value),
+        'cr10': float(math.fsum(top) / total_value)
     }
 
 
+def concentration_ratios_arr(values: np.ndarray) -> Dict[str, float]:
+    """
+    Concentration ratios from an array of per-holder values.
+    
+    Same result as concentration_ratios, for callers that already hold
+    the values column (e.g. a 13F DataFrame) and can skip the dict.
+    
+    Args:
+        values: Position value per holder (any order)
+        
+    Returns:
+        Dictionary with cr1, cr5, cr10 as decimals (0.45 = 45%)
+        
+    Raises:
+        ConcentrationError: If invalid data
+    """
+    values = _validated_values(values)
+    return _ratios_from_top(_top_values(values), values.sum())
+
+
 def herfindahl_index(value_by_holder: Dict[str, float]) -> float:
     """
     Calculate Herfindahl-Hirschman Index (HHI).
@@ -64,21 +176,41 @@ def herfindahl_index(value_by_holder: Dict[str, float]) -> float:
     Raises:
         ConcentrationError: If invalid data
     """
-    if not value_by_holder:
-        raise ConcentrationError("No holders provided")
-    
-    if any(value <= 0 for value in value_by_holder.values()):
-        raise ConcentrationError("Non-positive values not allowed")
-    
-    total_value = sum(value_by_holder.values())
+    return herfindahl_index_arr(_holder_values(value_by_holder))
+
+
+def herfindahl_index_arr(values: np.ndarray) -> float:
+    """
+    Herfindahl-Hirschman Index from an array of per-holder values.
     
-    # Calculate sum of squared market shares
-    hhi = 0.0
-    for value in value_by_holder.values():
-        share = value / total_value
-        hhi += share ** 2
+    Args:
+        values: Position value per holder
+        
+    Returns:
+        HHI as decimal (0 = perfect competition, 1 = monopoly)
+        
+    Raises:
+        ConcentrationError: If invalid data
+    """
+    values = _validated_values(values)
+    shares = values / values.sum()
     
-    return hhi
+    # Sum of squared market shares
+    return float(np.dot(shares, shares))
+
+
+def _null_concentration_metrics() -> Dict[str, Union[float, int, None]]:
+    """Metrics returned when there is no usable holder data."""
+    return {
+        'cr1': None,
+        'cr5': None,
+        'cr10': None,
+        'hhi': None,
+        'total_value': 0.0,
+        'num_holders': 0,
+        'top_holder_name': None,
+        'top_holder_pct': None
+    }
 
 
 def calculate_concentration_metrics(
@@ -87,61 +219,180 @@ def calculate_concentration_metrics(
     """
     Calculate complete concentration metrics with error handling.
     
+    CR, HHI, total and top holder are all derived from a single values
+    array rather than re-iterating the holder dict for each metric.
+    
     Args:
         value_by_holder: Dictionary mapping holder names to position values
         
     Returns:
         Dictionary with all concentration metrics (or None if insufficient data)
     """
-    if not value_by_holder or all(v <= 0 for v in value_by_holder.values()):
-        return {
-            'cr1': None,
-            'cr5': None,
-            'cr10': None,
-            'hhi': None,
-            'total_value': 0.0,
-            'num_holders': 0,
-            'top_holder_name': None,
-            'top_holder_pct': None
-        }
+    if not value_by_holder:
+        return _null_concentration_metrics()
     
-    try:
-        # Calculate core metrics
-        cr_metrics = concentration_ratios(value_by_holder)
-        hhi = herfindahl_index(value_by_holder)
-        
-        # Additional metadata
-        total_value = sum(value_by_holder.values())
-        num_holders = len(value_by_holder)
-        
-        # Find top holder
-        top_holder = max(value_by_holder.items(), key=lambda x: x[1])
-        top_holder_name = top_holder[0]
-        top_holder_pct = top_holder[1] / total_value
+    if len(value_by_holder) == 1:
+        # A sole holder owns everything; skip the array setup entirely
+        (name, value), = value_by_holder.items()
+        value = float(value)
+        if value <= 0:
+            return _null_concentration_metrics()
         
         return {
-            'cr1': cr_metrics['cr1'],
-            'cr5': cr_metrics['cr5'],
-            'cr10': cr_metrics['cr10'],
-            'hhi': hhi,
-            'total_value': total_value,
-            'num_holders': num_holders,
-            'top_holder_name': top_holder_name,
-            'top_holder_pct': top_holder_pct
+            'cr1': 1.0,
+            'cr5': 1.0,
+            'cr10': 1.0,
+            'hhi': 1.0,
+            'total_value': value,
+            'num_holders': 1,
+            'top_holder_name': name,
+            'top_holder_pct': 1.0
         }
+    
+    values = np.fromiter(
+        value_by_holder.values(), dtype=np.float64, count=len(value_by_holder)
+    )
+    return calculate_concentration_metrics_arr(values, list(value_by_holder))
+
+
+def calculate_concentration_metrics_arr(
+    values: np.ndarray,
+    names: Optional[Sequence] = None
+) -> Dict[str, Union[float, int, None]]:
+    """
+    calculate_concentration_metrics over parallel values/names arrays.
+    
+    Args:
+        values: Position value per holder
+        names: Holder name for each value (top_holder_name is None without)
         
+    Returns:
+        Dictionary with all concentration metrics (or None if insufficient data)
+    """
+    try:
+        values = _validated_values(values)
     except ConcentrationError:
         # Return null metrics if calculation fails
-        return {
-            'cr1': None,
-            'cr5': None,
-            'cr10': None,
-            'hhi': None,
-            'total_value': 0.0,
-            'num_holders': 0,
-            'top_holder_name': None,
-            'top_holder_pct': None
-        }
+        return _null_concentration_metrics()
+    
+    total_value = float(values.sum())
+    
+    # Only the selection is accelerated; every reduction below is shared
+    # so both paths produce bit-identical metrics
+    if NUMBA_AVAILABLE:
+        top, top_idx = _concentration_kernel(values)
+    else:
+        top, top_idx = _top_values(values), values.argmax()
+    
+    top_idx = int(top_idx)
+    cr_metrics = _ratios_from_top(top, total_value)
+    shares = values / total_value
+    
+    return {
+        'cr1': cr_metrics['cr1'],
+        'cr5': cr_metrics['cr5'],
+        'cr10': cr_metrics['cr10'],
+        'hhi': float(np.dot(shares, shares)),
+        'total_value': total_value,
+        'num_holders': int(values.size),
+        'top_holder_name': names[top_idx] if names is not None else None,
+        'top_holder_pct': float(values[top_idx] / total_value)
+    }
+
+
+# Per-ticker result layout for calculate_concentration_metrics_batch; rows
+# without usable holders carry NaN ratios, zero totals and top_holder_idx -1
+CONCENTRATION_BATCH_DTYPE = np.dtype([
+    ('cr1', 'f8'),
+    ('cr5', 'f8'),
+    ('cr10', 'f8'),
+    ('hhi', 'f8'),
+    ('total_value', 'f8'),
+    ('num_holders', 'i8'),
+    ('top_holder_idx', 'i8'),
+    ('top_holder_pct', 'f8')
+])
+
+
+def _null_batch_rows(result: np.ndarray, rows) -> None:
+    """Write calculate_concentration_metrics' null metrics into batch rows."""
+    for field in ('cr1', 'cr5', 'cr10', 'hhi', 'top_holder_pct'):
+        result[field][rows] = np.nan
+    result['total_value'][rows] = 0.0
+    result['num_holders'][rows] = 0
+    result['top_holder_idx'][rows] = -1
+
+
+def calculate_concentration_metrics_batch(
+    values: np.ndarray,
+    mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Concentration metrics for many tickers at once from a 2D values grid.
+    
+    Row t holds ticker t's per-holder values; ragged holder lists are
+    padded and the padding excluded through mask. Every metric is a
+    reduction along axis 1, so thousands of tickers cost a handful of
+    NumPy calls instead of one calculate_concentration_metrics per row.
+    Results agree with the per-ticker functions up to float rounding.
+    
+    Args:
+        values: (tickers, holders) position values
+        mask: Same-shape boolean array marking real holders (default: all)
+        
+    Returns:
+        Structured array (CONCENTRATION_BATCH_DTYPE) with one record per
+        ticker; top_holder_idx is the column of the largest holder. Rows
+        with no holders or any non-positive holder value get null metrics
+        
+    Raises:
+        ConcentrationError: If values is not 2D or mask does not match it
+    """
+    values = np.asarray(values, dtype=np.float64)
+    
+    if values.ndim != 2:
+        raise ConcentrationError("Batch values must be a 2D (tickers, holders) array")
+    
+    if mask is None:
+        mask = np.ones(values.shape, dtype=bool)
+    else:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != values.shape:
+            raise ConcentrationError("Mask shape must match values shape")
+    
+    result = np.empty(values.shape[0], dtype=CONCENTRATION_BATCH_DTYPE)
+    if values.shape[1] == 0:
+        _null_batch_rows(result, slice(None))
+        return result
+    
+    # Padding becomes 0.0, which sorts below every valid (positive) value
+    # and adds nothing to the sums
+    held = np.where(mask, values, 0.0)
+    num_holders = mask.sum(axis=1)
+    invalid = (num_holders == 0) | (mask & (values <= 0)).any(axis=1)
+    
+    totals = held.sum(axis=1)
+    safe_totals = np.where(invalid, 1.0, totals)
+    
+    # Partial sort along each row: only the top 10 columns need ordering
+    k = min(10, held.shape[1])
+    top = np.partition(held, held.shape[1] - k, axis=1)[:, -k:]
+    top.sort(axis=1)
+    
+    shares = held / safe_totals[:, None]
+    
+    result['cr1'] = top[:, -1] / safe_totals
+    result['cr5'] = top[:, -min(5, k):].sum(axis=1) / safe_totals
+    result['cr10'] = top.sum(axis=1) / safe_totals
+    result['hhi'] = np.einsum('th,th->t', shares, shares)
+    result['total_value'] = totals
+    result['num_holders'] = num_holders
+    result['top_holder_idx'] = held.argmax(axis=1)
+    result['top_holder_pct'] = result['cr1']
+    
+    _null_batch_rows(result, invalid)
+    
+    return result
 
 
 def analyze_13f_holdings(holdings_list: list) -> Dict[str, Union[float, int, None]]:
@@ -161,12 +412,7 @@ def analyze_13f_holdings(holdings_list: list) -> Dict[str, Union[float, int, Non
     value_by_filer = {}
     for holding in holdings_list:
         filer = holding.get('filer', 'Unknown')
-        value = holding.get('value_usd', 0.0)
-        
-        if filer in value_by_filer:
-            value_by_filer[filer] += value
-        else:
-            value_by_filer[filer] = value
+        value_by_filer[filer] = value_by_filer.get(filer, 0.0) + holding.get('value_usd', 0.0)
     
     return calculate_concentration_metrics(value_by_filer)
 
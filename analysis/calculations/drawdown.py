@@ -5,7 +5,9 @@ Pure functions for maximum drawdown analysis.
 
 import numpy as np
 from datetime import date
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Sequence, Union, Optional, Tuple, Iterator
+
+from analysis.calculations._njit import njit, prange, NUMBA_AVAILABLE
 
 
 class DrawdownError(Exception):
@@ -13,9 +15,81 @@ class DrawdownError(Exception):
     pass
 
 
+def _drawdown_numpy(prices_array: np.ndarray) -> Tuple[float, int, int, int]:
+    """
+    Max drawdown, peak, trough and recovery indices via NumPy passes.
+    
+    Recovery is -1 when the price never exceeds the peak again.
+    """
+    # Track running maximum (peak)
+    running_max = np.maximum.accumulate(prices_array)
+    
+    # Calculate drawdown at each point
+    drawdowns = (prices_array / running_max) - 1
+    
+    # Find maximum drawdown (trough)
+    trough_idx = int(np.argmin(drawdowns))
+    max_drawdown_pct = float(drawdowns[trough_idx])
+    
+    # Find the peak that led to this drawdown: running_max is non-decreasing
+    # and holds the exact peak price, so the first index reaching it is a
+    # binary search rather than a scan of the prefix
+    peak_value = running_max[trough_idx]
+    peak_idx = int(np.searchsorted(running_max, peak_value, side='left'))
+    
+    # Special case: if max drawdown is 0 (constant prices), recovery is immediate
+    if abs(max_drawdown_pct) < 1e-10:  # Essentially zero drawdown
+        return max_drawdown_pct, peak_idx, trough_idx, peak_idx
+    
+    # Look for actual recovery: first price after trough that exceeds peak
+    above_peak = prices_array[trough_idx + 1:] > peak_value
+    if above_peak.any():
+        return max_drawdown_pct, peak_idx, trough_idx, trough_idx + 1 + int(np.argmax(above_peak))
+    
+    return max_drawdown_pct, peak_idx, trough_idx, -1
+
+
+@njit(cache=True)
+def _drawdown_kernel(prices_array: np.ndarray) -> Tuple[float, int, int, int]:
+    """
+    Single-pass equivalent of _drawdown_numpy (no intermediate arrays).
+    
+    Keeps the running max and the index where it was first reached; a
+    strictly lower drawdown moves the trough, so ties keep the earliest
+    trough just like argmin.
+    """
+    running_max = prices_array[0]
+    running_max_idx = 0
+    max_drawdown_pct = 0.0
+    peak_idx = 0
+    trough_idx = 0
+    
+    for i in range(1, prices_array.size):
+        price = prices_array[i]
+        if price > running_max:
+            running_max = price
+            running_max_idx = i
+        else:
+            drawdown = price / running_max - 1
+            if drawdown < max_drawdown_pct:
+                max_drawdown_pct = drawdown
+                peak_idx = running_max_idx
+                trough_idx = i
+    
+    if abs(max_drawdown_pct) < 1e-10:
+        return max_drawdown_pct, peak_idx, trough_idx, peak_idx
+    
+    peak_value = prices_array[peak_idx]
+    for i in range(trough_idx + 1, prices_array.size):
+        if prices_array[i] > peak_value:
+            return max_drawdown_pct, peak_idx, trough_idx, i
+    
+    return max_drawdown_pct, peak_idx, trough_idx, -1
+
+
 def drawdown_stats(
-    prices: List[float], 
-    dates: List[date]
+    prices: Union[Sequence[float], np.ndarray], 
+    dates: Union[Sequence[date], np.ndarray]
 ) -> Dict[str, Union[float, date, int, None]]:
     """
     Calculate maximum drawdown statistics for a price series.
@@ -44,54 +118,47 @@ def drawdown_stats(
     if len(prices) != len(dates):
         raise DrawdownError("Prices and dates must have same length")
     
-    if any(p <= 0 for p in prices):
-        raise DrawdownError("Zero or negative prices not allowed")
-    
-    prices_array = np.array(prices)
-    
-    # Track running maximum (peak)
-    running_max = np.maximum.accumulate(prices_array)
+    prices_array = np.ascontiguousarray(prices, dtype=np.float64)
     
-    # Calculate drawdown at each point
-    drawdowns = (prices_array / running_max) - 1
-    
-    # Find maximum drawdown
-    max_dd_idx = np.argmin(drawdowns)
-    max_drawdown_pct = float(drawdowns[max_dd_idx])
-    
-    # Find the peak that led to this drawdown
-    # Look backwards from max drawdown to find when running_max last increased
-    peak_idx = max_dd_idx
-    peak_value = running_max[max_dd_idx]
-    
-    # Find first occurrence of this peak value
-    for i in range(max_dd_idx + 1):
-        if abs(prices_array[i] - peak_value) < 1e-10:
-            peak_idx = i
-            break
-    
-    # Trough is at max drawdown index
-    trough_idx = max_dd_idx
+    if (prices_array <= 0).any():
+        raise DrawdownError("Zero or negative prices not allowed")
     
-    # Find recovery: first price after trough that exceeds peak
-    recovery_idx = None
+    return _drawdown_stats_arr(prices_array, dates)
+
+
+def _drawdown_stats_arr(
+    prices_array: np.ndarray,
+    dates: Union[Sequence[date], np.ndarray]
+) -> Dict[str, Union[float, date, int, None]]:
+    """drawdown_stats on a validated float64 array (no conversion or checks)."""
+    assert prices_array.dtype == np.float64 and prices_array.flags.c_contiguous
     
-    # Special case: if max drawdown is 0 (constant prices), recovery is immediate
-    if abs(max_drawdown_pct) < 1e-10:  # Essentially zero drawdown
-        recovery_idx = peak_idx  # Recovery at same point as peak
+    if NUMBA_AVAILABLE:
+        max_drawdown_pct, peak_idx, trough_idx, recovery_idx = _drawdown_kernel(prices_array)
     else:
-        # Look for actual recovery after trough
-        for i in range(trough_idx + 1, len(prices_array)):
-            if prices_array[i] > peak_value:
-                recovery_idx = i
-                break
+        max_drawdown_pct, peak_idx, trough_idx, recovery_idx = _drawdown_numpy(prices_array)
+    
+    return _drawdown_result(dates, max_drawdown_pct, peak_idx, trough_idx, recovery_idx)
+
+
+def _drawdown_result(
+    dates: Union[Sequence[date], np.ndarray],
+    max_drawdown_pct: float,
+    peak_idx: int,
+    trough_idx: int,
+    recovery_idx: int
+) -> Dict[str, Union[float, date, int, None]]:
+    """Build the drawdown_stats result dict from kernel indices (-1 = no recovery)."""
+    peak_idx = int(peak_idx)
+    trough_idx = int(trough_idx)
+    recovery_idx = int(recovery_idx) if recovery_idx >= 0 else None
     
     # Calculate time periods
     drawdown_days = trough_idx - peak_idx
     recovery_days = (recovery_idx - trough_idx) if recovery_idx is not None else None
     
     return {
-        'max_drawdown_pct': max_drawdown_pct,
+        'max_drawdown_pct': float(max_drawdown_pct),
         'peak_date': dates[peak_idx],
         'trough_date': dates[trough_idx],
         'recovery_date': dates[recovery_idx] if recovery_idx is not None else None,
@@ -100,13 +167,276 @@ def drawdown_stats(
     }
 
 
-def rolling_drawdown(
+@njit(parallel=True, cache=True)
+def _rolling_drawdown_kernel(
+    prices_array: np.ndarray,
+    window: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-window _drawdown_kernel results, windows spread across cores.
+    
+    Each window is independent and writes only its own slot, so the
+    outer loop is a prange. Indices are absolute; recovery is -1 when
+    the window never regains its peak. numba.set_num_threads() controls
+    the thread count.
+    """
+    n_windows = prices_array.size - window + 1
+    max_dd = np.empty(n_windows)
+    peak = np.empty(n_windows, dtype=np.int64)
+    trough = np.empty(n_windows, dtype=np.int64)
+    recovery = np.empty(n_windows, dtype=np.int64)
+    
+    for start in prange(n_windows):
+        dd, p, t, r = _drawdown_kernel(prices_array[start:start + window])
+        max_dd[start] = dd
+        peak[start] = start + p
+        trough[start] = start + t
+        recovery[start] = start + r if r >= 0 else -1
+    
+    return max_dd, peak, trough, recovery
+
+
+# Segment summary for the sliding-window aggregate:
+# (max, first max idx, min, first min idx, max drawdown, trough idx, peak idx)
+_Segment = Tuple[float, int, float, int, float, int, int]
+
+
+def _leaf_segment(price: float, idx: int) -> _Segment:
+    """Summary of a single-price segment (no drawdown)."""
+    return (price, idx, price, idx, 0.0, idx, idx)
+
+
+def _combine_segments(a: _Segment, b: _Segment, prices: np.ndarray) -> _Segment:
+    """
+    Combine an earlier segment a with the following segment b.
+    
+    A point j in b draws down from max(a.max, running max of b up to j),
+    so the worst drawdown in b is min(b.dd, b.min / a.max - 1). The
+    operation is associative, which is what lets the window slide with
+    each price pushed and popped once. Ties resolve to the earliest
+    index, matching drawdown_stats.
+    """
+    a_max, a_max_i, a_min, a_min_i, a_dd, a_trough, a_peak = a
+    b_max, b_max_i, b_min, b_min_i, b_dd, b_trough, b_peak = b
+    
+    if b_max > a_max:
+        max_value, max_i = b_max, b_max_i
+    else:
+        max_value, max_i = a_max, a_max_i
+    
+    if b_min < a_min:
+        min_value, min_i = b_min, b_min_i
+    else:
+        min_value, min_i = a_min, a_min_i
+    
+    cross_dd = b_min / a_max - 1
+    
+    if a_dd <= b_dd and a_dd <= cross_dd:
+        dd, trough, peak = a_dd, a_trough, a_peak
+    elif cross_dd < b_dd or (cross_dd == b_dd and b_min_i < b_trough):
+        # Trough in b measured against the earlier segment's peak
+        dd, trough, peak = cross_dd, b_min_i, a_max_i
+    else:
+        dd, trough = b_dd, b_trough
+        peak = a_max_i if a_max >= prices[b_peak] else b_peak
+    
+    return (max_value, max_i, min_value, min_i, dd, trough, peak)
+
+
+def _rolling_drawdown_segments(
+    prices_array: np.ndarray,
+    window: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Column arrays from _iter_rolling_segments (fallback for the kernel)."""
+    n_windows = prices_array.size - window + 1
+    max_dd = np.empty(n_windows)
+    peak = np.empty(n_windows, dtype=np.int64)
+    trough = np.empty(n_windows, dtype=np.int64)
+    recovery = np.empty(n_windows, dtype=np.int64)
+    
+    for slot, values in enumerate(_iter_rolling_segments(prices_array, window)):
+        max_dd[slot], peak[slot], trough[slot], recovery[slot] = values
+    
+    return max_dd, peak, trough, recovery
+
+
+def _iter_rolling_segments(
+    prices_array: np.ndarray,
+    window: int
+) -> Iterator[Tuple[float, int, int, int]]:
+    """
+    Pure-Python counterpart of _rolling_drawdown_kernel, O(N) overall.
+    
+    Yields (max_dd, peak, trough, recovery) per window. The window is a
+    two-stack queue of segment summaries, so each price is pushed and
+    popped once instead of re-scanning every window; the per-window
+    recovery date is a sparse-table lookup.
+    """
+    # front: suffix summaries of the oldest prices (top = oldest)
+    # back: newest prices, folded into back_summary as they arrive
+    front: List[_Segment] = []
+    back: List[int] = []
+    back_summary: Optional[_Segment] = None
+    table = _sparse_max_table(prices_array)
+    
+    for i in range(len(prices_array)):
+        back.append(i)
+        leaf = _leaf_segment(prices_array[i], i)
+        back_summary = leaf if back_summary is None else \
+            _combine_segments(back_summary, leaf, prices_array)
+        
+        if i < window - 1:
+            continue
+        
+        if i >= window:
+            # Evict the price that left the window
+            if not front:
+                summary = None
+                for j in reversed(back):
+                    leaf = _leaf_segment(prices_array[j], j)
+                    summary = leaf if summary is None else \
+                        _combine_segments(leaf, summary, prices_array)
+                    front.append(summary)
+                back = []
+                back_summary = None
+            front.pop()
+        
+        if front and back_summary is not None:
+            summary = _combine_segments(front[-1], back_summary, prices_array)
+        else:
+            summary = front[-1] if front else back_summary
+        
+        yield (
+            summary[4],
+            summary[6],
+            summary[5],
+            _window_recovery(prices_array, table, summary, i)
+        )
+
+
+def _sparse_max_table(prices_array: np.ndarray) -> List[List[float]]:
+    """
+    Sparse table for range-max queries: level k holds max(prices[i:i + 2**k]).
+    
+    O(N log N) to build; kept as Python lists because the queries below
+    index single elements, where list access is far cheaper than NumPy.
+    """
+    levels = [prices_array]
+    span = 1
+    while span * 2 <= prices_array.size:
+        prev = levels[-1]
+        levels.append(np.maximum(prev[:-span], prev[span:]))
+        span *= 2
+    
+    return [level.tolist() for level in levels]
+
+
+def _first_above(table: List[List[float]], lo: int, hi: int, value: float) -> int:
+    """
+    First index in [lo, hi] whose price exceeds value, or -1.
+    
+    Binary lifting: skip whole power-of-two blocks whose max is <= value,
+    largest first, so the search is O(log W) rather than a scan.
+    """
+    pos = lo
+    for k in range(len(table) - 1, -1, -1):
+        span = 1 << k
+        if pos + span - 1 <= hi and table[k][pos] <= value:
+            pos += span
+    
+    if pos <= hi and table[0][pos] > value:
+        return pos
+    
+    return -1
+
+
+def _window_recovery(
+    prices_array: np.ndarray,
+    table: List[List[float]],
+    summary: _Segment,
+    end_idx: int
+) -> int:
+    """First index after the trough (within the window) above the peak, or -1."""
+    trough_idx, peak_idx = summary[5], summary[6]
+    
+    if abs(summary[4]) < 1e-10:
+        return peak_idx
+    
+    return _first_above(table, trough_idx + 1, end_idx, table[0][peak_idx])
+
+
+# Per-window result layout for rolling_drawdown_array (one record per
+# window, indices into the input series; -1 marks "no recovery")
+ROLLING_DRAWDOWN_DTYPE = np.dtype([
+    ('max_drawdown_pct', 'f8'),
+    ('peak_idx', 'i8'),
+    ('trough_idx', 'i8'),
+    ('recovery_idx', 'i8'),
+    ('drawdown_days', 'i8'),
+    ('recovery_days', 'i8')
+])
+
+
+def rolling_drawdown_array(prices: List[float], window: int) -> np.ndarray:
+    """
+    Calculate rolling drawdown statistics as one structured array.
+    
+    Same numbers as rolling_drawdown, but stored column-wise
+    (ROLLING_DRAWDOWN_DTYPE) instead of one dict per window, so long
+    series stay compact and can be filtered/aggregated with NumPy.
+    Dates are left as indices into the input series.
+    
+    Args:
+        prices: List of prices in chronological order
+        window: Rolling window size
+        
+    Returns:
+        Structured array with one record per window; recovery_idx and
+        recovery_days are -1 when the window never regains its peak
+        
+    Raises:
+        DrawdownError: If insufficient data or invalid prices
+    """
+    if len(prices) < window:
+        raise DrawdownError(f"Insufficient data: need {window} prices, have {len(prices)}")
+    
+    if window < 2:
+        raise DrawdownError("Insufficient data: need at least 2 prices")
+    
+    prices_array = np.ascontiguousarray(prices, dtype=np.float64)
+    
+    if (prices_array <= 0).any():
+        raise DrawdownError("Zero or negative prices not allowed")
+    
+    if NUMBA_AVAILABLE:
+        max_dd, peak, trough, recovery = _rolling_drawdown_kernel(prices_array, window)
+    else:
+        max_dd, peak, trough, recovery = _rolling_drawdown_segments(prices_array, window)
+    
+    result = np.empty(max_dd.size, dtype=ROLLING_DRAWDOWN_DTYPE)
+    result['max_drawdown_pct'] = max_dd
+    result['peak_idx'] = peak
+    result['trough_idx'] = trough
+    result['recovery_idx'] = recovery
+    result['drawdown_days'] = trough - peak
+    result['recovery_days'] = np.where(recovery >= 0, recovery - trough, -1)
+    
+    return result
+
+
+def rolling_drawdown_iter(
     prices: List[float],
     dates: List[date], 
     window: int
-) -> List[Dict[str, Union[float, date, int, None]]]:
+) -> Iterator[Dict[str, Union[float, date, int, None]]]:
     """
-    Calculate rolling drawdown statistics over multiple windows.
+    Iterate rolling drawdown statistics one window at a time.
+    
+    Yields the same dicts as rolling_drawdown without holding them all,
+    for callers streaming long histories into storage. Inputs are
+    validated up front, before the first window is produced. With numba
+    the per-window numbers are computed eagerly into compact arrays;
+    without it, windows are computed as they are consumed.
     
     Args:
         prices: List of prices in chronological order
@@ -114,7 +444,7 @@ def rolling_drawdown(
         window: Rolling window size
         
     Returns:
-        List of drawdown statistics for each window
+        Iterator of drawdown statistics, one per window
         
     Raises:
         DrawdownError: If insufficient data
@@ -125,21 +455,61 @@ def rolling_drawdown(
     if len(prices) != len(dates):
         raise DrawdownError("Prices and dates must have same length")
     
-    rolling_stats = []
+    if window < 2:
+        raise DrawdownError("Insufficient data: need at least 2 prices")
     
-    for i in range(window - 1, len(prices)):
-        window_prices = prices[i - window + 1:i + 1]
-        window_dates = dates[i - window + 1:i + 1]
-        
-        dd_stats = drawdown_stats(window_prices, window_dates)
-        rolling_stats.append(dd_stats)
+    prices_array = np.ascontiguousarray(prices, dtype=np.float64)
+    
+    if (prices_array <= 0).any():
+        raise DrawdownError("Zero or negative prices not allowed")
     
-    return rolling_stats
+    if NUMBA_AVAILABLE:
+        # The kernel fills all windows up front into four NumPy columns
+        # (32 bytes/window); rows are read back by index so only the dict
+        # being yielded exists as Python objects
+        dd_col, peak_col, trough_col, rec_col = _rolling_drawdown_kernel(prices_array, window)
+        rows = (
+            (dd_col[i], peak_col[i], trough_col[i], rec_col[i])
+            for i in range(dd_col.size)
+        )
+    else:
+        rows = _iter_rolling_segments(prices_array, window)
+    
+    return (
+        _drawdown_result(dates, max_dd, peak_idx, trough_idx, recovery_idx)
+        for max_dd, peak_idx, trough_idx, recovery_idx in rows
+    )
 
 
-def calculate_drawdown_metrics(
+def rolling_drawdown(
     prices: List[float],
-    dates: List[date],
+    dates: List[date], 
+    window: int
+) -> List[Dict[str, Union[float, date, int, None]]]:
+    """
+    Calculate rolling drawdown statistics over multiple windows.
+    
+    Results match drawdown_stats applied to each window. Use
+    rolling_drawdown_iter to stream, or rolling_drawdown_array for the
+    compact column-wise form.
+    
+    Args:
+        prices: List of prices in chronological order
+        dates: Corresponding trading dates
+        window: Rolling window size
+        
+    Returns:
+        List of drawdown statistics for each window
+        
+    Raises:
+        DrawdownError: If insufficient data
+    """
+    return list(rolling_drawdown_iter(prices, dates, window))
+
+
+def calculate_drawdown_metrics(
+    prices: Union[Sequence[float], np.ndarray],
+    dates: Union[Sequence[date], np.ndarray],
     min_periods: int = 10
 ) -> Dict[str, Union[float, date, int, None]]:
     """
@@ -5,7 +5,8 @@ Pure functions for calculating simple returns over trading day windows.
 
 import numpy as np
 from datetime import date
-from typing import List, Dict, Union
+from functools import lru_cache
+from typing import List, Dict, Sequence, Union, Tuple
 
 
 class ReturnsError(Exception):
@@ -36,20 +37,26 @@ def window_ends(
     if not trading_dates:
         return {f"{w}D": 0 for w in windows}
     
-    total_days = len(trading_dates)
-    result = {}
+    counts = _window_ends_counts(len(trading_dates), tuple(windows))
     
-    for window in windows:
-        # Number of return calculations possible
-        # Need at least (window + 1) days to calculate window-day returns
-        # For k-day return, need k+1 prices: current + k periods back
-        if total_days >= window + 1:
-            possible_calculations = total_days - window
-        else:
-            possible_calculations = 0
-        result[f"{window}D"] = possible_calculations
+    return {f"{w}D": count for w, count in zip(windows, counts)}
+
+
+@lru_cache(maxsize=256)
+def _window_ends_counts(total_days: int, windows: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Possible return calculations per window for a series length.
     
-    return result
+    Depends only on (length, windows), so batch runs over many tickers
+    with the same history length reuse one cached tuple.
+    """
+    # Number of return calculations possible
+    # Need at least (window + 1) days to calculate window-day returns
+    # For k-day return, need k+1 prices: current + k periods back
+    return tuple(
+        total_days - window if total_days >= window + 1 else 0
+        for window in windows
+    )
 
 
 def simple_returns(prices: List[float], k: int) -> float:
@@ -77,15 +84,17 @@ def simple_returns(prices: List[float], k: int) -> float:
     if k <= 0:
         raise ReturnsError("Window size must be positive")
     
+    prices_array = np.asarray(prices, dtype=np.float64)
+    
     # Check for invalid prices
-    if any(p <= 0 for p in prices):
+    if (prices_array <= 0).any():
         raise ReturnsError("Zero or negative prices not allowed")
     
     # Calculate return from k periods ago to most recent
-    current_price = prices[-1]  # Most recent
-    past_price = prices[-1 - k]  # k periods ago
+    current_price = prices_array[-1]  # Most recent
+    past_price = prices_array[-1 - k]  # k periods ago
     
-    return (current_price / past_price) - 1
+    return float(current_price / past_price - 1)
 
 
 def simple_returns_vectorized(prices: List[float], k: int) -> np.ndarray:
@@ -113,34 +122,27 @@ def simple_returns_vectorized(prices: List[float], k: int) -> np.ndarray:
     if len(prices) < k + 1:
         return np.array([])
     
+    prices_array = np.asarray(prices, dtype=np.float64)
+    
     # Check for invalid prices
-    if any(p <= 0 for p in prices):
+    if (prices_array <= 0).any():
         raise ReturnsError("Zero or negative prices not allowed")
     
-    prices_array = np.array(prices)
-    
-    # Calculate returns for all possible windows
+    # Calculate returns for all possible windows in one array divide
     # For k-period return, we can calculate from index k to end
-    returns = []
-    for i in range(k, len(prices)):
-        current_price = prices_array[i]
-        past_price = prices_array[i - k]
-        ret = (current_price / past_price) - 1
-        returns.append(ret)
-    
-    return np.array(returns)
+    return prices_array[k:] / prices_array[:len(prices_array) - k] - 1.0
 
 
 def calculate_period_returns(
-    prices: List[float], 
-    trading_dates: List[date],
+    prices: Union[Sequence[float], np.ndarray], 
+    trading_dates: Union[Sequence[date], np.ndarray],
     windows: List[int] = [1, 5, 21, 63, 126, 252]
 ) -> Dict[str, Union[float, None]]:
     """
     Calculate returns for multiple periods, returning most recent for each.
     
     Args:
-        prices: List of prices in chronological order
+        prices: Prices in chronological order (list or float64 array)
         trading_dates: Corresponding trading dates
         windows: Window sizes to calculate
         
@@ -153,22 +155,31 @@ def calculate_period_returns(
     if len(prices) < 2:
         return {f"{w}D": None for w in windows}
     
-    # Check data availability
-    window_availability = window_ends(trading_dates, windows)
+    # Convert and validate once for all windows; invalid prices null
+    # every window, as a per-window simple_returns call would
+    prices_array = np.ascontiguousarray(prices, dtype=np.float64)
+    if (prices_array <= 0).any():
+        return {f"{w}D": None for w in windows}
     
-    results = {}
-    for window in windows:
-        window_name = f"{window}D"
-        
-        if window_availability[window_name] > 0:
-            # Sufficient data - calculate return
-            try:
-                ret = simple_returns(prices, window)
-                results[window_name] = ret
-            except ReturnsError:
-                results[window_name] = None
-        else:
-            # Insufficient data
-            results[window_name] = None
-    
-    return results
+    return _period_returns_arr(prices_array, windows)
+
+
+def _period_returns_arr(
+    prices_array: np.ndarray,
+    windows: List[int]
+) -> Dict[str, Union[float, None]]:
+    """Most recent k-day returns from a validated float64 array (no copies)."""
+    assert prices_array.dtype == np.float64 and prices_array.flags.c_contiguous
+    
+    # Check data availability (cached per series length)
+    window_availability = _window_ends_counts(prices_array.size, tuple(windows))
+    
+    # Most recent k-day return for each window by direct indexing
+    current_price = prices_array[-1]
+    return {
+        f"{window}D": (
+            float(current_price / prices_array[-1 - window] - 1)
+            if available > 0 and window > 0 else None
+        )
+        for window, available in zip(windows, window_availability)
+    }
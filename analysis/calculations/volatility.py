@@ -4,8 +4,9 @@ Pure functions for log returns and realized volatility calculations.
 """
 
 import numpy as np
+import numpy.typing as npt
 import math
-from typing import List, Union
+from typing import List, Sequence, Union
 
 
 class VolatilityError(Exception):
@@ -13,7 +14,29 @@ class VolatilityError(Exception):
     pass
 
 
-def log_returns(prices: List[float]) -> np.ndarray:
+# √annualize for the usual periodicities (daily, weekly, monthly, ...)
+_ANNUALIZE_SQRT = {n: math.sqrt(n) for n in (1, 4, 12, 52, 252, 365)}
+
+
+def _annualize_factor(annualize: int) -> float:
+    """√annualize, from the lookup table when it is a common value."""
+    factor = _ANNUALIZE_SQRT.get(annualize)
+    return factor if factor is not None else math.sqrt(annualize)
+
+
+def _check_finite(log_ret: np.ndarray) -> None:
+    """Reject NaN/Inf with one isfinite pass; classify only on failure."""
+    if not np.isfinite(log_ret).all():
+        if np.isnan(log_ret).any():
+            raise VolatilityError("NaN values not allowed in log returns")
+        
+        raise VolatilityError("Infinite values not allowed in log returns")
+
+
+def log_returns(
+    prices: Union[Sequence[float], np.ndarray],
+    dtype: npt.DTypeLike = np.float64
+) -> np.ndarray:
     """
     Calculate log returns from price series.
     
@@ -21,6 +44,8 @@ def log_returns(prices: List[float]) -> np.ndarray:
     
     Args:
         prices: List of prices in chronological order
+        dtype: Output dtype; np.float32 halves memory for long series
+            (~7 significant digits, ample for daily returns)
         
     Returns:
         Numpy array of log returns (length = len(prices) - 1)
@@ -31,23 +56,31 @@ def log_returns(prices: List[float]) -> np.ndarray:
     if len(prices) < 2:
         raise VolatilityError("Insufficient data: need at least 2 prices")
     
+    # Convert to numpy first so validation is a single array reduction
+    price_array = np.ascontiguousarray(prices, dtype=np.float64)
+    
     # Check for invalid prices
-    if any(p <= 0 for p in prices):
+    if (price_array <= 0).any():
         raise VolatilityError("Zero or negative prices not allowed")
     
-    # Convert to numpy for efficient calculation
-    price_array = np.array(prices)
-    
-    # Calculate log returns: ln(P_t / P_{t-1})
-    log_ret = np.diff(np.log(price_array))
+    # The ratio is formed in float64 so float32 only rounds the result
+    return _log_returns_arr(price_array).astype(dtype, copy=False)
+
+
+def _log_returns_arr(price_array: np.ndarray) -> np.ndarray:
+    """Log returns of a validated float64 price array."""
+    assert price_array.dtype == np.float64 and price_array.flags.c_contiguous
     
-    return log_ret
+    # Calculate log returns: ln(P_t / P_{t-1}) as one divide and one log,
+    # rather than logging every price and differencing (extra N-wide temp)
+    return np.log(price_array[1:] / price_array[:-1])
 
 
 def realized_vol(
     log_ret: np.ndarray, 
     window: int, 
-    annualize: int = 252
+    annualize: int = 252,
+    dtype: npt.DTypeLike = np.float64
 ) -> float:
     """
     Calculate realized volatility from log returns.
@@ -58,6 +91,8 @@ def realized_vol(
         log_ret: Array of log returns
         window: Number of returns to use (from end of series)
         annualize: Annualization factor (252 for daily to annual)
+        dtype: Working dtype for the returns buffer (np.float32 allowed);
+            the variance is always accumulated in float64
         
     Returns:
         Annualized volatility as decimal (0.25 = 25%)
@@ -72,20 +107,16 @@ def realized_vol(
         raise VolatilityError("Window must be > 1 for standard deviation")
     
     # Check for NaN or infinite values
-    if np.any(np.isnan(log_ret)):
-        raise VolatilityError("NaN values not allowed in log returns")
-    
-    if np.any(np.isinf(log_ret)):
-        raise VolatilityError("Infinite values not allowed in log returns")
+    _check_finite(log_ret)
     
     # Take the most recent 'window' returns
-    recent_returns = log_ret[-window:]
+    recent_returns = np.asarray(log_ret[-window:], dtype=dtype)
     
     # Calculate sample standard deviation (ddof=1)
-    std_dev = np.std(recent_returns, ddof=1)
+    std_dev = np.std(recent_returns, ddof=1, dtype=np.float64)
     
     # Annualize
-    annualized_vol = std_dev * math.sqrt(annualize)
+    annualized_vol = std_dev * _annualize_factor(annualize)
     
     return float(annualized_vol)
 
@@ -93,7 +124,8 @@ def realized_vol(
 def rolling_volatility(
     log_ret: np.ndarray, 
     window: int, 
-    annualize: int = 252
+    annualize: int = 252,
+    dtype: npt.DTypeLike = np.float64
 ) -> np.ndarray:
     """
     Calculate rolling volatility over all possible windows.
@@ -102,6 +134,8 @@ def rolling_volatility(
         log_ret: Array of log returns
         window: Rolling window size
         annualize: Annualization factor
+        dtype: Working/output dtype (np.float32 allowed); the rolling
+            sums are always accumulated in float64
         
     Returns:
         Array of rolling volatilities
@@ -113,26 +147,27 @@ def rolling_volatility(
         raise VolatilityError(f"Insufficient data: need {window} returns, have {len(log_ret)}")
     
     # Check for invalid values
-    if np.any(np.isnan(log_ret)):
-        raise VolatilityError("NaN values not allowed in log returns")
+    _check_finite(log_ret)
     
-    if np.any(np.isinf(log_ret)):
-        raise VolatilityError("Infinite values not allowed in log returns")
+    # Rolling sums of x and x² from prefix sums: O(N) regardless of window.
+    # Variance is shift-invariant, so centre on the series mean first to
+    # keep S2 - S1²/W from cancelling catastrophically.
+    x = np.asarray(log_ret, dtype=dtype)
+    x = x - x.mean(dtype=np.float64).astype(dtype)
     
-    # Calculate rolling standard deviation
-    rolling_vols = []
+    csum = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    csum2 = np.concatenate(([0.0], np.cumsum(x * x, dtype=np.float64)))
     
-    for i in range(window - 1, len(log_ret)):
-        window_returns = log_ret[i - window + 1:i + 1]
-        std_dev = np.std(window_returns, ddof=1)
-        annualized_vol = std_dev * math.sqrt(annualize)
-        rolling_vols.append(annualized_vol)
+    s1 = csum[window:] - csum[:-window]
+    s2 = csum2[window:] - csum2[:-window]
+    var = (s2 - s1 * s1 / window) / (window - 1)
     
-    return np.array(rolling_vols)
+    vols = np.sqrt(np.maximum(var, 0.0)) * _annualize_factor(annualize)
+    return vols.astype(dtype, copy=False)
 
 
 def calculate_volatility_metrics(
-    prices: List[float],
+    prices: Union[Sequence[float], np.ndarray],
     windows: List[int] = [21, 63, 252]
 ) -> dict:
     """
@@ -151,22 +186,46 @@ def calculate_volatility_metrics(
     try:
         # Calculate log returns
         log_ret = log_returns(prices)
-        
-        results = {}
-        for window in windows:
-            window_name = f"{window}D_annualized"
-            
-            if len(log_ret) >= window:
-                try:
-                    vol = realized_vol(log_ret, window=window, annualize=252)
-                    results[window_name] = vol
-                except VolatilityError:
-                    results[window_name] = None
-            else:
-                results[window_name] = None
-        
-        return results
-        
     except VolatilityError:
         # If log returns calculation fails, return all None
         return {f"{w}D_annualized": None for w in windows}
+    
+    # Same fail-closed policy as realized_vol: NaN/Inf anywhere nulls all
+    try:
+        _check_finite(log_ret)
+    except VolatilityError:
+        return {f"{w}D_annualized": None for w in windows}
+    
+    return _volatility_metrics_arr(log_ret, windows)
+
+
+def _volatility_metrics_arr(log_ret: np.ndarray, windows: List[int]) -> dict:
+    """Trailing-window annualized vols from finite float64 log returns."""
+    assert log_ret.dtype == np.float64 and log_ret.flags.c_contiguous
+    
+    usable = [w for w in windows if 1 < w <= len(log_ret)]
+    if not usable:
+        return {f"{w}D_annualized": None for w in windows}
+    
+    # Every window is a suffix of the series, so one cumulative pass over
+    # the reversed tail gives each window's sums at index W-1 (no prefix
+    # differencing). Centre on the tail mean to avoid cancellation.
+    tail = log_ret[::-1][:max(usable)]
+    tail = tail - tail.mean()
+    c1 = np.cumsum(tail)
+    c2 = np.cumsum(tail * tail)
+    
+    annualize_factor = _ANNUALIZE_SQRT[252]
+    results = {}
+    for window in windows:
+        window_name = f"{window}D_annualized"
+        
+        if 1 < window <= len(log_ret):
+            s1 = c1[window - 1]
+            s2 = c2[window - 1]
+            var = (s2 - s1 * s1 / window) / (window - 1)
+            results[window_name] = float(math.sqrt(max(var, 0.0)) * annualize_factor)
+        else:
+            results[window_name] = None
+    
+    return results
@@ -0,0 +1,44 @@
+"""
+Date column helpers shared by guardrails and the metrics aggregator.
+Reduce pandas date columns to datetime64[D] without boxing Python dates.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+def latest_day(dates: pd.Series) -> Optional[np.datetime64]:
+    """
+    Most recent date in a column as datetime64[D], skipping missing values.
+    
+    Works on int64 day counts instead of boxing Python date objects;
+    datetime64 columns and date objects are not re-parsed.
+    
+    Args:
+        dates: Column of dates, datetime64 values or ISO date strings
+        
+    Returns:
+        Latest day, or None if the column has no usable dates
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates) and \
+            pd.api.types.infer_dtype(dates, skipna=True) != 'date':
+        dates = pd.to_datetime(dates)
+    
+    days = dates.to_numpy(dtype='datetime64[D]')
+    days = days[~np.isnat(days)]
+    return days.max() if days.size else None
+
+
+def days_between(start: np.datetime64, end: np.datetime64) -> int:
+    """
+    Whole days from start to end.
+    
+    Args:
+        start: Earlier day (datetime64[D])
+        end: Later day (datetime64[D])
+        
+    Returns:
+        Number of days (negative if end precedes start)
+    """
+    return int((end - start).astype(np.int64))
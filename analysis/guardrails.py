@@ -5,9 +5,14 @@ Implements Stop-and-Ask triggers for data quality issues.
 
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from datetime import date, timedelta
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional, Tuple
 
+from analysis.calculations._njit import njit, NUMBA_AVAILABLE
+from analysis.dates import latest_day, days_between
+
 
 class DataQualityError(Exception):
     """Raised when data quality issues require user intervention."""
@@ -19,6 +24,21 @@ class DataQualityWarning(UserWarning):
     pass
 
 
+# Minimum trading days required for each window (k-day return needs k + 1)
+_MIN_DAYS_REQUIRED = MappingProxyType({
+    '1D': 2,
+    '1W': 6,     # 5 + 1
+    '1M': 22,    # 21 + 1
+    '3M': 64,    # 63 + 1
+    '6M': 127,   # 126 + 1
+    '1Y': 253    # 252 + 1
+})
+
+# Below these, 1Y analysis stops and 6M analysis warns
+_CRITICAL_1Y_MIN_DAYS = 150
+_WARN_6M_MIN_DAYS = 90
+
+
 def validate_sufficient_data_for_metrics(
     price_df: pd.DataFrame,
     requested_windows: List[str]
@@ -40,41 +60,32 @@ def validate_sufficient_data_for_metrics(
         raise DataQualityError("No price data available for analysis")
     
     trading_days = len(price_df)
+    requested = frozenset(requested_windows)
     
-    # Minimum trading days required for each window
-    min_days_required = {
-        '1D': 2,
-        '1W': 6,     # 5 + 1
-        '1M': 22,    # 21 + 1
-        '3M': 64,    # 63 + 1
-        '6M': 127,   # 126 + 1
-        '1Y': 253    # 252 + 1
-    }
-    
-    available_windows = []
-    insufficient_windows = []
+    # Known windows this history is too short for; unknown windows need no data
+    too_short = frozenset(
+        window for window, required in _MIN_DAYS_REQUIRED.items()
+        if trading_days < required
+    )
     
-    for window in requested_windows:
-        required = min_days_required.get(window, 0)
-        if trading_days >= required:
-            available_windows.append(window)
-        else:
-            insufficient_windows.append(window)
+    # Partition preserving the requested order
+    available_windows = [w for w in requested_windows if w not in too_short]
+    insufficient_windows = [w for w in requested_windows if w in too_short]
     
     # Critical check: If requesting 1Y but have < 150 days, stop and ask
-    if '1Y' in requested_windows and trading_days < 150:
+    if '1Y' in requested and trading_days < _CRITICAL_1Y_MIN_DAYS:
         raise DataQualityError(
             f"Insufficient data for 1Y analysis: have {trading_days} trading days, "
-            f"need at least 150 for meaningful annual metrics. "
+            f"need at least {_CRITICAL_1Y_MIN_DAYS} for meaningful annual metrics. "
             f"Consider using shorter windows or gathering more historical data."
         )
     
     # Warning: If requesting 6M but have < 90 days
-    if '6M' in requested_windows and trading_days < 90:
+    if '6M' in requested and trading_days < _WARN_6M_MIN_DAYS:
         import warnings
         warnings.warn(
             f"Limited data for 6M analysis: have {trading_days} trading days, "
-            f"recommend at least 90 for reliable metrics.",
+            f"recommend at least {_WARN_6M_MIN_DAYS} for reliable metrics.",
             DataQualityWarning
         )
     
@@ -99,30 +110,34 @@ def detect_conflicting_13f_rows(holdings_df: pd.DataFrame) -> List[Dict[str, Any
     if holdings_df.empty:
         return conflicts
     
-    # Group by primary key (cik, cusip, as_of)
-    pk_groups = holdings_df.groupby(['cik', 'cusip', 'as_of'])
-    
-    for (cik, cusip, as_of), group in pk_groups:
-        if len(group) > 1:
-            # Multiple rows with same primary key
-            values = group['value_usd'].tolist()
-            shares = group['shares'].tolist()
-            
-            # Check if values are significantly different
-            if len(set(values)) > 1:  # Different values
-                value_range = max(values) - min(values)
-                avg_value = sum(values) / len(values)
-                
-                if value_range / avg_value > 0.1:  # >10% difference
-                    conflict = {
-                        'type': 'value_conflict',
-                        'cik': cik,
-                        'cusip': cusip,
-                        'as_of': as_of,
-                        'values': values,
-                        'variance_pct': (value_range / avg_value) * 100
-                    }
-                    conflicts.append(conflict)
+    # Per primary key (cik, cusip, as_of) value spread in one Cython agg
+    pk_columns = ['cik', 'cusip', 'as_of']
+    pk_stats = holdings_df.groupby(pk_columns)['value_usd'].agg(['min', 'max', 'mean', 'size'])
+    value_range = pk_stats['max'] - pk_stats['min']
+    variance = value_range / pk_stats['mean']
+    
+    # Multiple rows with same primary key and significantly different values
+    is_conflict = (pk_stats['size'] > 1) & (value_range > 0) & (variance > 0.1)  # >10% difference
+    conflict_variance = variance[is_conflict]
+    
+    if not conflict_variance.empty:
+        # Only the (few) conflicting groups get their values materialized
+        in_conflict = pd.MultiIndex.from_frame(holdings_df[pk_columns]).isin(conflict_variance.index)
+        conflict_values = {
+            key: group.tolist()
+            for key, group in holdings_df[in_conflict].groupby(pk_columns)['value_usd']
+        }
+        
+        for (cik, cusip, as_of), group_variance in conflict_variance.items():
+            conflict = {
+                'type': 'value_conflict',
+                'cik': cik,
+                'cusip': cusip,
+                'as_of': as_of,
+                'values': conflict_values[(cik, cusip, as_of)],
+                'variance_pct': group_variance * 100
+            }
+            conflicts.append(conflict)
     
     # Critical: If >5% of holdings have conflicts, stop and ask
     if holdings_df.shape[0] > 0:
@@ -147,55 +162,133 @@ def validate_numeric_inputs(metrics_dict: Dict[str, Any]) -> None:
     Raises:
         DataQualityError: If NaN or infinite values found
     """
-    def check_value(value, path: str):
-        if value is None:
-            return  # None is acceptable for missing data
-        
-        if isinstance(value, (int, float)):
-            if np.isnan(value):
-                raise DataQualityError(f"NaN value found in {path}")
-            if np.isinf(value):
-                raise DataQualityError(f"Infinite value found in {path}")
-            
-            # Reasonable bounds checks
-            if path.endswith('_pct') or 'return' in path.lower():
-                if abs(value) > 10.0:  # >1000% return/drawdown seems unrealistic
-                    raise DataQualityError(f"Unrealistic percentage in {path}: {value}")
-    
-    # Check price metrics
-    pm = metrics_dict.get('price_metrics', {})
+    leaves = _metric_leaves(metrics_dict)
     
-    # Check returns
-    returns = pm.get('returns', {})
-    for window, value in returns.items():
-        check_value(value, f'returns.{window}')
+    # Common case: everything passes one batched finite/bounds check
+    if _leaves_pass(leaves):
+        return
     
-    # Check volatility
-    volatility = pm.get('volatility', {})
-    for window, value in volatility.items():
-        check_value(value, f'volatility.{window}')
+    # Something failed: re-scan in order so the error names the first offending path
+    for path, value in leaves:
+        _check_leaf(path, value)
+
+
+# price_metrics sections holding one value per window
+_PRICE_METRIC_GROUPS = ('returns', 'volatility')
+
+
+def _metric_leaves(metrics_dict: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Flatten the validated MetricsJSON values into (path, value) pairs, in check order."""
+    pm = metrics_dict.get('price_metrics', {})
     
-    # Check drawdown
-    drawdown = pm.get('drawdown', {})
-    check_value(drawdown.get('max_drawdown_pct'), 'drawdown.max_drawdown_pct')
+    leaves = [
+        (f'{section}.{window}', value)
+        for section in _PRICE_METRIC_GROUPS
+        for window, value in pm.get(section, {}).items()
+    ]
+    leaves.append(('drawdown.max_drawdown_pct', pm.get('drawdown', {}).get('max_drawdown_pct')))
     
-    # Check institutional metrics
     im = metrics_dict.get('institutional_metrics')
     if im:
-        concentration = im.get('concentration', {})
-        for metric, value in concentration.items():
-            check_value(value, f'concentration.{metric}')
-            
-            # Concentration ratios should be 0-1
-            if value is not None and not (0 <= value <= 1):
-                raise DataQualityError(f"Concentration ratio {metric} out of bounds: {value}")
+        leaves.extend(
+            (f'concentration.{metric}', value)
+            for metric, value in im.get('concentration', {}).items()
+        )
+    
+    return leaves
+
+
+def _is_percentage_path(path: str) -> bool:
+    """Paths holding returns/drawdowns, bounded to ±1000%."""
+    return path.endswith('_pct') or 'return' in path.lower()
+
+
+def _leaves_pass(leaves: List[Tuple[str, Any]]) -> bool:
+    """Batched finite/bounds check; False means re-scan for the exact error."""
+    numeric = []
+    for path, value in leaves:
+        if isinstance(value, (int, float)):
+            numeric.append((path, value))
+        elif value is not None and path.startswith('concentration.'):
+            return False  # Non-numeric ratio: let the bounds check report it
+    
+    values = np.fromiter((value for _, value in numeric), dtype=np.float64, count=len(numeric))
+    if not np.isfinite(values).all():
+        return False
+    
+    is_pct = np.fromiter((_is_percentage_path(path) for path, _ in numeric), dtype=bool, count=len(numeric))
+    is_ratio = np.fromiter((path.startswith('concentration.') for path, _ in numeric), dtype=bool, count=len(numeric))
+    
+    ratios = values[is_ratio]
+    return not (
+        (np.abs(values[is_pct]) > 10.0).any() or
+        ((ratios < 0) | (ratios > 1)).any()
+    )
+
+
+def _check_leaf(path: str, value: Any) -> None:
+    """Validate one metric value, raising DataQualityError with its path."""
+    if value is None:
+        return  # None is acceptable for missing data
+    
+    if isinstance(value, (int, float)):
+        if np.isnan(value):
+            raise DataQualityError(f"NaN value found in {path}")
+        if np.isinf(value):
+            raise DataQualityError(f"Infinite value found in {path}")
+        
+        # Reasonable bounds checks
+        if _is_percentage_path(path):
+            if abs(value) > 10.0:  # >1000% return/drawdown seems unrealistic
+                raise DataQualityError(f"Unrealistic percentage in {path}: {value}")
+    
+    # Concentration ratios should be 0-1
+    if path.startswith('concentration.') and not (0 <= value <= 1):
+        metric = path[len('concentration.'):]
+        raise DataQualityError(f"Concentration ratio {metric} out of bounds: {value}")
+
+
+@dataclass(frozen=True)
+class PriceSummary:
+    """Columns of a price frame extracted once and shared by the price checks."""
+    # Spelled out because dataclass(slots=True) needs Python 3.10
+    __slots__ = ('latest_date', 'opens', 'highs', 'lows', 'closes', 'volumes')
+    
+    latest_date: Optional[np.datetime64]  # datetime64[D]
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+
+
+def summarize_prices(price_df: pd.DataFrame) -> PriceSummary:
+    """
+    Parse dates and pull OHLCV arrays from a price frame in one place.
+    
+    Args:
+        price_df: Price data DataFrame
+        
+    Returns:
+        PriceSummary for check_data_freshness/validate_price_data_integrity
+    """
+    latest_date = latest_day(price_df['date']) if not price_df.empty else None
+    return PriceSummary(
+        latest_date=latest_date,
+        opens=price_df['open'].to_numpy(dtype=np.float64),
+        highs=price_df['high'].to_numpy(dtype=np.float64),
+        lows=price_df['low'].to_numpy(dtype=np.float64),
+        closes=price_df['close'].to_numpy(dtype=np.float64),
+        volumes=price_df['volume'].to_numpy(dtype=np.float64)
+    )
 
 
 def check_data_freshness(
     price_df: pd.DataFrame,
     holdings_df: Optional[pd.DataFrame],
     max_price_age_days: int = 7,
-    max_13f_age_days: int = 120
+    max_13f_age_days: int = 120,
+    price_summary: Optional[PriceSummary] = None
 ) -> List[str]:
     """
     Check data freshness and warn about stale data.
@@ -205,17 +298,21 @@ def check_data_freshness(
         holdings_df: Holdings data DataFrame (optional)
         max_price_age_days: Maximum acceptable age for price data
         max_13f_age_days: Maximum acceptable age for 13F data
+        price_summary: summarize_prices(price_df), to reuse parsed dates
         
     Returns:
         List of freshness warnings
     """
     warnings = []
-    today = date.today()
+    today = np.datetime64(date.today(), 'D')
     
-    # Check price data freshness
+    # Check price data freshness (ages are datetime64[D] day differences)
     if not price_df.empty:
-        latest_price_date = pd.to_datetime(price_df['date']).max().date()
-        price_age = (today - latest_price_date).days
+        if price_summary is not None:
+            latest_price_date = price_summary.latest_date
+        else:
+            latest_price_date = latest_day(price_df['date'])
+        price_age = days_between(latest_price_date, today)
         
         if price_age > max_price_age_days:
             warnings.append(
@@ -225,8 +322,8 @@ def check_data_freshness(
     
     # Check 13F data freshness
     if holdings_df is not None and not holdings_df.empty:
-        latest_13f_date = pd.to_datetime(holdings_df['as_of']).max().date()
-        f13_age = (today - latest_13f_date).days
+        latest_13f_date = latest_day(holdings_df['as_of'])
+        f13_age = days_between(latest_13f_date, today)
         
         if f13_age > max_13f_age_days:
             warnings.append(
@@ -237,12 +334,16 @@ def check_data_freshness(
     return warnings
 
 
-def validate_price_data_integrity(price_df: pd.DataFrame) -> List[str]:
+def validate_price_data_integrity(
+    price_df: pd.DataFrame,
+    price_summary: Optional[PriceSummary] = None
+) -> List[str]:
     """
     Validate price data integrity and detect anomalies.
     
     Args:
         price_df: Price data DataFrame
+        price_summary: summarize_prices(price_df), to reuse extracted columns
         
     Returns:
         List of integrity warnings
@@ -252,39 +353,115 @@ def validate_price_data_integrity(price_df: pd.DataFrame) -> List[str]:
     if price_df.empty:
         return warnings
     
-    # Check for large price gaps (>20% daily moves)
-    if len(price_df) > 1:
-        closes = price_df['close'].tolist()
-        for i in range(1, len(closes)):
-            daily_change = abs((closes[i] / closes[i-1]) - 1)
-            if daily_change > 0.20:  # >20% daily move
-                date_str = price_df.iloc[i]['date']
-                warnings.append(
-                    f"Large price movement on {date_str}: "
-                    f"{daily_change:.1%} change (${closes[i-1]:.2f} → ${closes[i]:.2f})"
-                )
+    # OHLCV columns come out of the frame once (summarize_prices); the date
+    # Series is looked up once and only indexed for flagged rows
+    if price_summary is None:
+        price_summary = summarize_prices(price_df)
+    closes = price_summary.closes
+    date_col = price_df['date']
+    
+    # One fused pass when compiled; otherwise a few NumPy array passes
+    scan = _integrity_kernel if NUMBA_AVAILABLE else _integrity_numpy
+    large_moves, zero_volume, invalid_prices = scan(
+        price_summary.opens, price_summary.highs, price_summary.lows,
+        closes, price_summary.volumes
+    )
+    
+    # Check for large price gaps (>20% daily moves); only the (rare) hits
+    # are formatted
+    for i in large_moves:
+        daily_change = abs((closes[i] / closes[i-1]) - 1)
+        date_str = date_col.iat[i]
+        warnings.append(
+            f"Large price movement on {date_str}: "
+            f"{daily_change:.1%} change (${closes[i-1]:.2f} → ${closes[i]:.2f})"
+        )
     
     # Check for zero volume days
-    zero_volume_days = price_df[price_df['volume'] == 0]
-    if not zero_volume_days.empty:
-        dates = zero_volume_days['date'].tolist()
+    if len(zero_volume):
+        dates = date_col.iloc[zero_volume].tolist()
         warnings.append(f"Zero volume detected on {len(dates)} days: {dates}")
     
     # Check for price consistency (high >= low, etc.)
-    invalid_prices = price_df[
-        (price_df['high'] < price_df['low']) |
-        (price_df['high'] < price_df['open']) |
-        (price_df['high'] < price_df['close']) |
-        (price_df['low'] > price_df['open']) |
-        (price_df['low'] > price_df['close'])
-    ]
-    
-    if not invalid_prices.empty:
-        warnings.append(f"Price logic violations found on {len(invalid_prices)} days")
+    if invalid_prices:
+        warnings.append(f"Price logic violations found on {invalid_prices} days")
     
     return warnings
 
 
+def _integrity_numpy(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    NumPy counterpart of _integrity_kernel.
+    
+    Returns:
+        Tuple of (large move indices, zero-volume indices, OHLC violation count)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_changes = np.abs(closes[1:] / closes[:-1] - 1.0)
+    large_moves = np.flatnonzero(daily_changes > 0.20) + 1  # >20% daily move
+    
+    zero_volume = np.flatnonzero(volumes == 0)
+    
+    # High must be at least max(low, open, close) and low at most
+    # min(open, close); fmax/fmin skip NaN like the single comparisons
+    invalid_prices = np.count_nonzero(
+        (highs < np.fmax(lows, np.fmax(opens, closes))) |
+        (lows > np.fmin(opens, closes))
+    )
+    
+    return large_moves, zero_volume, int(invalid_prices)
+
+
+@njit(cache=True, error_model='numpy')
+def _integrity_kernel(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Single pass over OHLCV rows for validate_price_data_integrity.
+    
+    Each row is loaded once for all three checks; error_model='numpy'
+    makes a zero close give inf like the NumPy path instead of raising.
+    
+    Returns:
+        Tuple of (large move indices, zero-volume indices, OHLC violation count)
+    """
+    n = closes.size
+    large_moves = np.empty(n, dtype=np.int64)
+    zero_volume = np.empty(n, dtype=np.int64)
+    n_moves = 0
+    n_zero = 0
+    invalid_prices = 0
+    
+    for i in range(n):
+        o = opens[i]
+        h = highs[i]
+        lo = lows[i]
+        c = closes[i]
+        
+        if i > 0 and abs(c / closes[i - 1] - 1.0) > 0.20:
+            large_moves[n_moves] = i
+            n_moves += 1
+        
+        if volumes[i] == 0:
+            zero_volume[n_zero] = i
+            n_zero += 1
+        
+        if h < lo or h < o or h < c or lo > o or lo > c:
+            invalid_prices += 1
+    
+    return large_moves[:n_moves], zero_volume[:n_zero], invalid_prices
+
+
 def run_all_guardrails(
     ticker: str,
     price_df: pd.DataFrame,
@@ -351,13 +528,14 @@ def run_all_guardrails(
         validate_numeric_inputs(metrics_dict)
         guardrail_results['data_quality_checks']['numeric_validation'] = 'passed'
         
-        # 4. Freshness check
-        freshness_warnings = check_data_freshness(price_df, holdings_df)
+        # 4. Freshness check (dates parsed and columns extracted once for 4 and 5)
+        price_summary = summarize_prices(price_df)
+        freshness_warnings = check_data_freshness(price_df, holdings_df, price_summary=price_summary)
         guardrail_results['data_quality_checks']['freshness_check'] = freshness_warnings
         guardrail_results['warnings'].extend(freshness_warnings)
         
         # 5. Price integrity check
-        integrity_warnings = validate_price_data_integrity(price_df)
+        integrity_warnings = validate_price_data_integrity(price_df, price_summary)
         guardrail_results['data_quality_checks']['price_integrity'] = integrity_warnings
         guardrail_results['warnings'].extend(integrity_warnings)
         
@@ -419,6 +597,21 @@ def _generate_recommendations(
     return recommendations
 
 
+# Data quality report layout; sections are pre-joined blocks (see _report_section)
+_REPORT_TEMPLATE = (
+    "📊 Data Quality Report for {ticker}\n"
+    "Generated: {timestamp}\n"
+    + "=" * 50 + "\n"
+    "\n"
+    "{sections}"
+    "{status}"
+)
+
+_STATUS_CRITICAL = "🚨 OVERALL STATUS: CRITICAL ISSUES FOUND\n   Manual review required before proceeding."
+_STATUS_WARNINGS = "⚠️  OVERALL STATUS: WARNINGS PRESENT\n   Proceed with caution and note limitations."
+_STATUS_ACCEPTABLE = "✅ OVERALL STATUS: DATA QUALITY ACCEPTABLE\n   Safe to proceed with analysis."
+
+
 def create_data_quality_report(guardrail_results: Dict[str, Any]) -> str:
     """
     Create human-readable data quality report.
@@ -429,62 +622,52 @@ def create_data_quality_report(guardrail_results: Dict[str, Any]) -> str:
     Returns:
         Formatted text report
     """
-    ticker = guardrail_results['ticker']
-    timestamp = guardrail_results['timestamp']
-    
-    report = [
-        f"📊 Data Quality Report for {ticker}",
-        f"Generated: {timestamp}",
-        "=" * 50,
-        ""
-    ]
-    
     # Errors
     errors = guardrail_results.get('errors', [])
-    if errors:
-        report.append("🚨 CRITICAL ISSUES:")
-        for error in errors:
-            report.append(f"   • {error}")
-        report.append("")
     
     # Warnings
     warnings = guardrail_results.get('warnings', [])
-    if warnings:
-        report.append("⚠️  WARNINGS:")
-        for warning in warnings:
-            report.append(f"   • {warning}")
-        report.append("")
     
     # Data availability
+    availability = []
     data_check = guardrail_results['data_quality_checks']['sufficient_data']
     if data_check:
         available = data_check['available_windows']
         insufficient = data_check['insufficient_windows']
         
-        report.append("📈 METRIC AVAILABILITY:")
         if available:
-            report.append(f"   ✅ Available: {', '.join(available)}")
+            availability.append(f"   ✅ Available: {', '.join(available)}")
         if insufficient:
-            report.append(f"   ❌ Insufficient data: {', '.join(insufficient)}")
-        report.append("")
+            availability.append(f"   ❌ Insufficient data: {', '.join(insufficient)}")
     
     # Recommendations
     recommendations = guardrail_results.get('recommendations', [])
-    if recommendations:
-        report.append("💡 RECOMMENDATIONS:")
-        for rec in recommendations:
-            report.append(f"   • {rec}")
-        report.append("")
+    
+    sections = "".join([
+        _report_section("🚨 CRITICAL ISSUES:", [f"   • {error}" for error in errors], bool(errors)),
+        _report_section("⚠️  WARNINGS:", [f"   • {warning}" for warning in warnings], bool(warnings)),
+        _report_section("📈 METRIC AVAILABILITY:", availability, bool(data_check)),
+        _report_section("💡 RECOMMENDATIONS:", [f"   • {rec}" for rec in recommendations], bool(recommendations))
+    ])
     
     # Overall status
     if errors:
-        report.append("🚨 OVERALL STATUS: CRITICAL ISSUES FOUND")
-        report.append("   Manual review required before proceeding.")
+        status = _STATUS_CRITICAL
     elif warnings:
-        report.append("⚠️  OVERALL STATUS: WARNINGS PRESENT")
-        report.append("   Proceed with caution and note limitations.")
+        status = _STATUS_WARNINGS
     else:
-        report.append("✅ OVERALL STATUS: DATA QUALITY ACCEPTABLE")
-        report.append("   Safe to proceed with analysis.")
-    
-    return "\n".join(report)
+        status = _STATUS_ACCEPTABLE
+    
+    return _REPORT_TEMPLATE.format(
+        ticker=guardrail_results['ticker'],
+        timestamp=guardrail_results['timestamp'],
+        sections=sections,
+        status=status
+    )
+
+
+def _report_section(title: str, lines: List[str], shown: bool) -> str:
+    """One report section followed by a blank line, or "" when not shown."""
+    if not shown:
+        return ""
+    return "\n".join([title, *lines]) + "\n\n"
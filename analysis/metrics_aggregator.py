@@ -3,15 +3,21 @@ Metrics aggregator - composes all financial calculations into MetricsJSON.
 Pure function that combines price analysis, volatility, drawdown, and 13F concentration.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import date, datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 
 # Import all calculation modules
 from analysis.calculations.returns import calculate_period_returns
 from analysis.calculations.volatility import calculate_volatility_metrics
 from analysis.calculations.drawdown import calculate_drawdown_metrics
-from analysis.calculations.concentration import analyze_13f_holdings
+from analysis.calculations.concentration import calculate_concentration_metrics_arr
+from analysis.dates import latest_day, days_between
+
+
+# Bump when metric definitions change so cached MetricsJSON is invalidated
+CALCULATION_VERSION = "1.0.0"
 
 
 class MetricsAggregatorError(Exception):
@@ -23,7 +29,8 @@ def compose_metrics(
     price_df: pd.DataFrame,
     holdings_df: Optional[pd.DataFrame],
     ticker: str,
-    as_of_date: date
+    as_of_date: date,
+    prices_by_ticker: Optional[Dict[str, pd.DataFrame]] = None
 ) -> Dict[str, Any]:
     """
     Compose all financial metrics into standardized JSON format.
@@ -33,6 +40,8 @@ def compose_metrics(
         holdings_df: DataFrame with 13F holdings for ticker (optional)
         ticker: Stock ticker symbol
         as_of_date: Date for which metrics are calculated
+        prices_by_ticker: Output of group_prices_by_ticker(price_df), so a
+            batch over many tickers splits price_df once (optional)
         
     Returns:
         Complete MetricsJSON dictionary
@@ -43,23 +52,35 @@ def compose_metrics(
     if price_df.empty:
         raise MetricsAggregatorError("Empty price data provided")
     
-    if ticker not in price_df['ticker'].values:
-        raise MetricsAggregatorError(f"Ticker {ticker} not found in price data")
-    
-    # Filter data for the specific ticker
-    ticker_prices = price_df[price_df['ticker'] == ticker].copy()
-    ticker_prices = ticker_prices.sort_values('date').reset_index(drop=True)
+    if prices_by_ticker is not None:
+        # Pre-split frames are already date-sorted
+        if ticker not in prices_by_ticker:
+            raise MetricsAggregatorError(f"Ticker {ticker} not found in price data")
+        ticker_prices = prices_by_ticker[ticker]
+    else:
+        ticker_mask = price_df['ticker'].to_numpy() == ticker
+        if not ticker_mask.any():
+            raise MetricsAggregatorError(f"Ticker {ticker} not found in price data")
+        
+        # Filter data for the specific ticker (read-only below, so no copy);
+        # ingested prices are usually in date order already
+        ticker_prices = price_df.loc[ticker_mask]
+        if not ticker_prices['date'].is_monotonic_increasing:
+            ticker_prices = ticker_prices.sort_values('date', kind='mergesort')
     
     if ticker_prices.empty:
         raise MetricsAggregatorError(f"No price data for ticker {ticker}")
     
-    # Extract price and date series
-    prices = ticker_prices['close'].tolist()
-    dates = ticker_prices['date'].tolist()
+    # Extract price and date series as arrays (no per-row Python lists);
+    # the calculation modules take the float64 closes without copying
+    prices = ticker_prices['close'].to_numpy(dtype=np.float64)
+    dates_col = ticker_prices['date']
     
-    # Convert date strings to date objects if needed
-    if isinstance(dates[0], str):
-        dates = [date.fromisoformat(d) if isinstance(d, str) else d for d in dates]
+    # Convert date strings to date objects if needed, in one vectorized parse
+    if isinstance(dates_col.iat[0], str):
+        dates = pd.to_datetime(dates_col).dt.date.to_numpy()
+    else:
+        dates = dates_col.to_numpy(dtype=object)
     
     # Calculate data period info
     data_period = {
@@ -68,23 +89,29 @@ def compose_metrics(
         'trading_days': len(dates)
     }
     
+    # Collect 13F rows for the ticker (if 13F data available); kept as a
+    # frame so top holders and filer totals are column operations
+    ticker_holdings = None
+    if holdings_df is not None and not holdings_df.empty:
+        ticker_holdings = holdings_df[holdings_df['ticker'].to_numpy() == ticker]
+        if ticker_holdings.empty:
+            ticker_holdings = None
+    
     # Calculate price metrics
     price_metrics = _calculate_price_metrics(prices, dates)
     
-    # Calculate institutional metrics (if 13F data available)
+    # Calculate institutional metrics
     institutional_metrics = None
-    if holdings_df is not None and not holdings_df.empty:
-        ticker_holdings = holdings_df[holdings_df['ticker'] == ticker]
-        if not ticker_holdings.empty:
-            institutional_metrics = _calculate_institutional_metrics(ticker_holdings.to_dict('records'))
+    if ticker_holdings is not None:
+        institutional_metrics = _calculate_institutional_metrics(ticker_holdings)
     
-    # Calculate data quality metrics
-    data_quality = _calculate_data_quality_metrics(ticker_prices, holdings_df, ticker)
+    # Calculate data quality metrics (reusing the filtered 13F rows)
+    data_quality = _calculate_data_quality_metrics(ticker_prices, ticker_holdings)
     
     # Generate metadata
     metadata = {
         'calculated_at': datetime.now().isoformat(),
-        'calculation_version': '1.0.0',
+        'calculation_version': CALCULATION_VERSION,
         'data_sources': _determine_data_sources(ticker_prices, holdings_df)
     }
     
@@ -99,10 +126,38 @@ def compose_metrics(
     }
 
 
-def _calculate_price_metrics(prices: List[float], dates: List[date]) -> Dict[str, Any]:
+def group_prices_by_ticker(price_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Split a multi-ticker price frame into date-sorted per-ticker frames.
+    
+    One sort and groupby for the whole frame; pass the result to
+    compose_metrics(prices_by_ticker=...) to avoid a full-frame mask and
+    sort per ticker.
+    
+    Args:
+        price_df: DataFrame with price data for any number of tickers
+        
+    Returns:
+        Dictionary mapping ticker to its price rows in date order
+    """
+    ordered = price_df.sort_values(['ticker', 'date'], kind='mergesort')
+    return {
+        ticker: group.reset_index(drop=True)
+        for ticker, group in ordered.groupby('ticker', sort=False)
+    }
+
+
+def _calculate_price_metrics(
+    prices: Union[List[float], np.ndarray],
+    dates: Union[List[date], np.ndarray]
+) -> Dict[str, Any]:
     """Calculate all price-based metrics."""
+    # Convert once; the calculation modules' asarray calls then reuse
+    # this buffer instead of each copying the list again
+    prices_array = np.ascontiguousarray(prices, dtype=np.float64)
+    
     # Returns calculation
-    returns = calculate_period_returns(prices, dates, windows=[1, 5, 21, 63, 126, 252])
+    returns = calculate_period_returns(prices_array, dates, windows=[1, 5, 21, 63, 126, 252])
     
     # Map to standard names
     returns_formatted = {
@@ -115,14 +170,14 @@ def _calculate_price_metrics(prices: List[float], dates: List[date]) -> Dict[str
     }
     
     # Volatility calculation
-    volatility = calculate_volatility_metrics(prices, windows=[21, 63, 252])
+    volatility = calculate_volatility_metrics(prices_array, windows=[21, 63, 252])
     
     # Drawdown calculation
-    drawdown = calculate_drawdown_metrics(prices, dates, min_periods=10)
+    drawdown = calculate_drawdown_metrics(prices_array, dates, min_periods=10)
     
     # Current price info
     current_price = {
-        'close': prices[-1],
+        'close': float(prices_array[-1]),
         'date': dates[-1].isoformat()
     }
     
@@ -141,43 +196,64 @@ def _calculate_price_metrics(prices: List[float], dates: List[date]) -> Dict[str
     }
 
 
-def _calculate_institutional_metrics(holdings_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _value_by_filer(holdings: pd.DataFrame) -> pd.Series:
+    """Total value_usd per filer (first-seen order), as analyze_13f_holdings aggregates."""
+    filers = holdings['filer'] if 'filer' in holdings.columns else pd.Series('Unknown', index=holdings.index)
+    values = holdings['value_usd'] if 'value_usd' in holdings.columns else pd.Series(0.0, index=holdings.index)
+    return values.groupby(filers, sort=False, dropna=False).sum()
+
+
+def _filer_concentration(holdings: pd.DataFrame) -> Dict[str, Any]:
+    """Concentration metrics straight from the per-filer totals (no dict round trip)."""
+    by_filer = _value_by_filer(holdings)
+    return calculate_concentration_metrics_arr(
+        by_filer.to_numpy(dtype=np.float64), by_filer.index.tolist()
+    )
+
+
+def _calculate_institutional_metrics(
+    holdings: Union[List[Dict[str, Any]], pd.DataFrame]
+) -> Optional[Dict[str, Any]]:
     """Calculate 13F-based institutional metrics."""
-    if not holdings_list:
+    if isinstance(holdings, pd.DataFrame):
+        holdings_df = holdings
+    else:
+        if not holdings:
+            return None
+        holdings_df = pd.DataFrame(holdings)
+    
+    if holdings_df.empty:
         return None
     
     # Get concentration metrics
-    concentration_metrics = analyze_13f_holdings(holdings_list)
+    concentration_metrics = _filer_concentration(holdings_df)
     
-    # Build top holders list
-    top_holders = []
-    sorted_holdings = sorted(holdings_list, key=lambda x: x.get('value_usd', 0), reverse=True)
+    # Build top holders list: partial sort for the top 10, ties in row order
+    top = pd.DataFrame({
+        'filer': holdings_df['filer'] if 'filer' in holdings_df.columns else 'Unknown',
+        'value_usd': holdings_df['value_usd'] if 'value_usd' in holdings_df.columns else 0.0,
+        'shares': holdings_df['shares'] if 'shares' in holdings_df.columns else 0.0
+    }, index=holdings_df.index)
     
-    total_value = sum(h.get('value_usd', 0) for h in holdings_list)
+    total_value = top['value_usd'].sum()
     
-    for i, holding in enumerate(sorted_holdings[:10]):  # Top 10
-        top_holders.append({
-            'rank': i + 1,
-            'filer': holding.get('filer', 'Unknown'),
-            'value_usd': holding.get('value_usd', 0.0),
-            'shares': holding.get('shares', 0.0),
-            'pct_of_13f_total': (holding.get('value_usd', 0.0) / total_value) if total_value > 0 else 0.0
-        })
+    top = top.nlargest(10, 'value_usd', keep='first').reset_index(drop=True)  # Top 10
+    top.insert(0, 'rank', np.arange(1, len(top) + 1))
+    top['pct_of_13f_total'] = top['value_usd'] / total_value if total_value > 0 else 0.0
+    top_holders = top.to_dict('records')
     
     # Get quarter info from first holding
     quarter_end = None
     filing_lag_days = None
-    if holdings_list:
-        first_holding = holdings_list[0]
-        if 'as_of' in first_holding:
-            quarter_end = first_holding['as_of']
-            if isinstance(quarter_end, str):
-                quarter_end_date = date.fromisoformat(quarter_end)
-            else:
-                quarter_end_date = quarter_end
-            
-            # Calculate filing lag (rough estimate)
-            filing_lag_days = (date.today() - quarter_end_date).days
+    if 'as_of' in holdings_df.columns:
+        quarter_end = holdings_df['as_of'].iat[0]
+        if isinstance(quarter_end, str):
+            quarter_end_date = date.fromisoformat(quarter_end)
+        else:
+            quarter_end_date = quarter_end
+        
+        # Calculate filing lag (rough estimate)
+        filing_lag_days = (date.today() - quarter_end_date).days
     
     return {
         'total_13f_value_usd': concentration_metrics.get('total_value', 0.0),
@@ -196,15 +272,13 @@ def _calculate_institutional_metrics(holdings_list: List[Dict[str, Any]]) -> Dic
 
 def _calculate_data_quality_metrics(
     price_df: pd.DataFrame, 
-    holdings_df: Optional[pd.DataFrame],
-    ticker: str
+    ticker_holdings: Optional[pd.DataFrame]
 ) -> Dict[str, Any]:
-    """Calculate data quality and coverage metrics."""
+    """Calculate data quality and coverage metrics from one ticker's rows."""
     # Price data quality
     if not price_df.empty:
-        dates = pd.to_datetime(price_df['date'])
-        date_range = (dates.max() - dates.min()).days
-        actual_days = len(dates)
+        date_range = _date_span_days(price_df['date'])
+        actual_days = len(price_df)
         
         # Estimate expected trading days (rough: 5/7 of calendar days)
         expected_trading_days = max(1, int(date_range * 5 / 7))
@@ -218,14 +292,11 @@ def _calculate_data_quality_metrics(
     latest_13f_quarter = None
     age_days = None
     
-    if holdings_df is not None and not holdings_df.empty:
-        ticker_holdings = holdings_df[holdings_df['ticker'] == ticker]
-        if not ticker_holdings.empty:
-            # Get most recent quarter
-            as_of_dates = pd.to_datetime(ticker_holdings['as_of'])
-            latest_quarter = as_of_dates.max()
-            latest_13f_quarter = latest_quarter.strftime('%Y-%m-%d')
-            age_days = (datetime.now().date() - latest_quarter.date()).days
+    if ticker_holdings is not None and not ticker_holdings.empty:
+        # Get most recent quarter
+        latest_quarter = latest_day(ticker_holdings['as_of'])
+        latest_13f_quarter = str(latest_quarter)  # YYYY-MM-DD
+        age_days = days_between(latest_quarter, np.datetime64(date.today(), 'D'))
     
     return {
         'price_coverage_pct': coverage_pct,
@@ -235,19 +306,35 @@ def _calculate_data_quality_metrics(
     }
 
 
+def _date_span_days(dates: pd.Series) -> int:
+    """
+    Calendar days between the first and last date in a column.
+    
+    datetime64 columns and columns of date objects are reduced as-is;
+    only strings (or mixed values) go through pd.to_datetime.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates) and \
+            pd.api.types.infer_dtype(dates, skipna=True) != 'date':
+        dates = pd.to_datetime(dates)
+    
+    return (dates.max() - dates.min()).days
+
+
 def _determine_data_sources(
     price_df: pd.DataFrame, 
     holdings_df: Optional[pd.DataFrame]
 ) -> List[str]:
-    """Determine which data sources were used."""
+    """Determine which data sources were used (first-seen order)."""
     sources = []
     
     if not price_df.empty and 'source' in price_df.columns:
-        price_sources = price_df['source'].unique()
-        sources.extend(price_sources)
+        sources.append(np.asarray(price_df['source'].unique(), dtype=object))
     
     if holdings_df is not None and not holdings_df.empty and 'source' in holdings_df.columns:
-        holdings_sources = holdings_df['source'].unique() 
-        sources.extend(holdings_sources)
+        sources.append(np.asarray(holdings_df['source'].unique(), dtype=object))
+    
+    if not sources:
+        return []
     
-    return list(set(sources))  # Remove duplicates
+    # One hash-based unique over the (few) per-frame sources removes duplicates
+    return pd.unique(np.concatenate(sources)).tolist()
@@ -4,15 +4,161 @@ CLI tool for displaying calculated metrics.
 Usage: python analysis/show_metrics.py TICKER [options]
 """
 
+import os
 import sys
+import mmap
 import json
-import argparse
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import List, Union
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the stdlib parser/encoder when orjson isn't installed
+    orjson = None
+
+
+# (MetricsJSON key, label) rows of the summary tables
+_RETURN_PERIODS = (
+    ('1D', '1 Day'), ('1W', '1 Week'), ('1M', '1 Month'),
+    ('3M', '3 Month'), ('6M', '6 Month'), ('1Y', '1 Year')
+)
+_VOL_PERIODS = (
+    ('21D_annualized', '21 Day'), ('63D_annualized', '3 Month'), ('252D_annualized', '1 Year')
+)
+
+# Section icons and return direction markers; directions are indexed by
+# (ret > 0) + 2 * (ret < 0): flat, up, down
+_EMOJI_ICONS = {
+    'title': "📊 ", 'price': "💰 ", 'returns': "📈 ", 'volatility': "📊 ",
+    'drawdown': "📉 ", 'holdings': "🏢 ", 'quality': "📋 ",
+    'error': "❌ ", 'folder': "📁 ", 'hint': "💡 ",
+    'directions': ("➡️", "📈", "📉")
+}
+# --no-emoji / NO_COLOR output for terminals without emoji or UTF-8
+_ASCII_ICONS = {
+    'title': "", 'price': "", 'returns': "", 'volatility': "",
+    'drawdown': "", 'holdings': "", 'quality': "",
+    'error': "Error: ", 'folder': "", 'hint': "",
+    'directions': ("-", "^", "v")
+}
+
+
+_FORMATS = ('summary', 'full', 'json')
+
+# Metrics files larger than this are parsed from an mmap instead of a copy
+_MMAP_MIN_BYTES = 64 * 1024
+_DEFAULT_METRICS_DIR = './data/processed/metrics'
 
 
 def main():
     """Main CLI entry point."""
+    args = _parse_args(sys.argv[1:])
+    use_emoji = not args.no_emoji and not os.environ.get('NO_COLOR')
+    icons = _EMOJI_ICONS if use_emoji else _ASCII_ICONS
+    
+    # Legacy console encodings can't encode the emoji; switch the streams
+    # to UTF-8 once instead of failing mid-report. ASCII output leaves the
+    # terminal's own encoding alone.
+    if use_emoji:
+        for stream in (sys.stdout, sys.stderr):
+            encoding = getattr(stream, 'encoding', None) or ''
+            if encoding.lower().replace('-', '') != 'utf8' and hasattr(stream, 'reconfigure'):
+                stream.reconfigure(encoding='utf-8', errors='replace')
+    
+    metrics_dir = Path(args.metrics_dir)
+    
+    # Many tickers in one process: pay interpreter and import startup once
+    if args.batch is not None or args.ticker == '-':
+        tickers = _read_tickers(args.batch if args.batch is not None else '-')
+        sys.exit(_show_batch(tickers, metrics_dir, args.format, use_emoji))
+    
+    # Find metrics file
+    metrics_file = metrics_dir / f'{args.ticker}.json'
+    
+    # Load metrics; a missing file surfaces from the read itself rather
+    # than a separate exists() check
+    try:
+        metrics = load_metrics(metrics_file)
+    except FileNotFoundError:
+        print(f"{icons['error']}No metrics found for {args.ticker}", file=sys.stderr)
+        print(f"{icons['folder']}Looked in: {metrics_file}", file=sys.stderr)
+        print(
+            f"{icons['hint']}Run analysis first: python -m analysis.analyze_ticker {args.ticker}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+    except Exception as e:
+        print(f"{icons['error']}Failed to load metrics: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    _display_metrics(metrics, args.format, use_emoji)
+
+
+def _display_metrics(metrics: dict, output_format: str, use_emoji: bool = True):
+    """Display one ticker's metrics in the requested format."""
+    if output_format == 'json':
+        _write_metrics(metrics)
+    elif output_format == 'full':
+        _display_full_metrics(metrics)
+    else:  # summary
+        _display_summary_metrics(metrics, use_emoji=use_emoji)
+
+
+def _read_tickers(source: str) -> List[str]:
+    """Whitespace-separated tickers from a file, or stdin when source is '-'."""
+    if source == '-':
+        return sys.stdin.read().split()
+    return Path(source).read_text().split()
+
+
+def _show_batch(
+    tickers: List[str],
+    metrics_dir: Path,
+    output_format: str,
+    use_emoji: bool = True
+) -> int:
+    """
+    Display metrics for each ticker in order, reusing cached parses.
+    
+    Args:
+        tickers: Tickers to show (repeats are shown again from the cache)
+        metrics_dir: Directory containing <TICKER>.json files
+        output_format: 'summary', 'full' or 'json'
+        use_emoji: Emoji icons in summaries and error messages
+        
+    Returns:
+        Exit code: 0 if every ticker was shown, 1 otherwise
+    """
+    icons = _EMOJI_ICONS if use_emoji else _ASCII_ICONS
+    exit_code = 0
+    
+    for i, ticker in enumerate(tickers):
+        try:
+            metrics = load_metrics(metrics_dir / f'{ticker}.json')
+        except FileNotFoundError:
+            print(f"{icons['error']}No metrics found for {ticker}", file=sys.stderr)
+            exit_code = 1
+            continue
+        except Exception as e:
+            print(f"{icons['error']}Failed to load metrics for {ticker}: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        
+        if i and output_format == 'summary':
+            sys.stdout.write("\n")
+        _display_metrics(metrics, output_format, use_emoji)
+    
+    return exit_code
+
+
+def _build_parser():
+    """Full argparse parser, only built for --help and malformed arguments."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Display calculated metrics for a ticker',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -20,125 +166,247 @@ def main():
 Examples:
   python analysis/show_metrics.py AAPL
   python analysis/show_metrics.py MSFT --metrics-dir ./custom/metrics/
+  python analysis/show_metrics.py --batch tickers.txt
         """
     )
     
-    parser.add_argument('ticker', help='Stock ticker symbol (e.g., AAPL)')
+    parser.add_argument('ticker', nargs='?',
+                       help="Stock ticker symbol (e.g., AAPL); '-' reads tickers from stdin")
     parser.add_argument('--metrics-dir',
-                       default='./data/processed/metrics',
+                       default=_DEFAULT_METRICS_DIR,
                        help='Directory containing metrics JSON files')
     parser.add_argument('--format',
-                       choices=['summary', 'full', 'json'],
+                       choices=list(_FORMATS),
                        default='summary',
                        help='Output format (default: summary)')
+    parser.add_argument('--no-emoji',
+                       action='store_true',
+                       help='Plain ASCII output (also when NO_COLOR is set)')
+    parser.add_argument('--batch',
+                       metavar='FILE',
+                       help="Show every ticker listed in FILE ('-' for stdin)")
+    
+    return parser
+
+
+def _parse_args(argv: List[str]) -> SimpleNamespace:
+    """
+    Parse the usual invocations without importing argparse.
     
-    args = parser.parse_args()
+    Anything else (help, abbreviated or =-joined options, bad values) is
+    handed to the argparse parser, so usage and error output are unchanged.
     
-    # Find metrics file
-    metrics_dir = Path(args.metrics_dir)
-    metrics_file = metrics_dir / f'{args.ticker}.json'
+    Args:
+        argv: Command-line arguments without the program name
+        
+    Returns:
+        Namespace with ticker, metrics_dir, format, no_emoji and batch
+    """
+    args = SimpleNamespace(
+        ticker=None, metrics_dir=_DEFAULT_METRICS_DIR, format='summary',
+        no_emoji=False, batch=None
+    )
     
-    if not metrics_file.exists():
-        print(f"❌ No metrics found for {args.ticker}", file=sys.stderr)
-        print(f"📁 Looked in: {metrics_file}", file=sys.stderr)
-        print(f"💡 Run analysis first: python analysis/analyze_ticker.py {args.ticker}", file=sys.stderr)
-        sys.exit(1)
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        value = argv[i + 1] if i + 1 < len(argv) else None
+        has_value = value is not None and not value.startswith('-')
+        
+        if arg == '--metrics-dir' and has_value:
+            args.metrics_dir = value
+            i += 2
+        elif arg == '--format' and has_value and value in _FORMATS:
+            args.format = value
+            i += 2
+        elif arg == '--batch' and (has_value or value == '-'):
+            args.batch = value
+            i += 2
+        elif arg == '--no-emoji':
+            args.no_emoji = True
+            i += 1
+        elif (arg == '-' or not arg.startswith('-')) and args.ticker is None:
+            args.ticker = arg
+            i += 1
+        else:
+            return _parse_with_argparse(argv)
     
-    # Load metrics
-    try:
+    if args.ticker is None and args.batch is None:
+        return _parse_with_argparse(argv)
+    
+    return args
+
+
+def _parse_with_argparse(argv: List[str]):
+    """Parse with the full parser; a ticker or --batch is required."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.ticker is None and args.batch is None:
+        parser.error("the following arguments are required: ticker (or --batch FILE)")
+    
+    return args
+
+
+def load_metrics(metrics_file: Union[str, Path]) -> dict:
+    """
+    Load a MetricsJSON file, reusing the parsed dict while it is unchanged.
+    
+    Parses are cached per (path, mtime, size), so repeated loads in one
+    process (batch reports, dashboards) skip the JSON parse until the
+    analyzer rewrites the file. The returned dict is shared; don't mutate it.
+    
+    Args:
+        metrics_file: Path to <TICKER>.json
+        
+    Returns:
+        Parsed MetricsJSON dictionary
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+        OSError: If the file cannot be read
+    """
+    metrics_file = Path(metrics_file)
+    stat = metrics_file.stat()
+    return _load_metrics_cached(str(metrics_file), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _load_metrics_cached(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse once per file version; mtime_ns/size only key the cache."""
+    return _load_metrics(Path(path))
+
+
+def _load_metrics(metrics_file: Path) -> dict:
+    """
+    Parse a MetricsJSON file (orjson when available).
+    
+    Files above _MMAP_MIN_BYTES are parsed straight from a read-only memory
+    map, skipping the copy into a bytes object; below that the mmap setup
+    costs more than the copy.
+    """
+    if orjson is None:
         with open(metrics_file, 'r') as f:
-            metrics = json.load(f)
-    except Exception as e:
-        print(f"❌ Failed to load metrics: {e}", file=sys.stderr)
-        sys.exit(1)
+            return json.load(f)
     
-    # Display based on format
-    if args.format == 'json':
-        print(json.dumps(metrics, indent=2))
-    elif args.format == 'full':
-        _display_full_metrics(metrics)
-    else:  # summary
-        _display_summary_metrics(metrics)
+    with open(metrics_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= _MMAP_MIN_BYTES:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
 
 
-def _display_summary_metrics(metrics: dict):
-    """Display concise summary of key metrics."""
+def _write_metrics(metrics: dict, default=None):
+    """
+    Write metrics to stdout as indented JSON without building a str copy.
+    
+    orjson's bytes go straight to the binary buffer when stdout has one;
+    the stdlib fallback streams json.dump into the text stream.
+    """
+    if orjson is not None:
+        data = orjson.dumps(
+            metrics,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE,
+            default=default
+        )
+        buffer = getattr(sys.stdout, 'buffer', None)
+        if buffer is not None:
+            sys.stdout.flush()  # keep ordering with earlier text writes
+            buffer.write(data)
+            buffer.flush()
+        else:
+            sys.stdout.write(data.decode())
+        return
+    json.dump(metrics, sys.stdout, indent=2, default=default)
+    sys.stdout.write("\n")
+
+
+def _display_summary_metrics(metrics: dict, use_emoji: bool = True):
+    """Display concise summary of key metrics (ASCII markers if use_emoji is False)."""
+    icons = _EMOJI_ICONS if use_emoji else _ASCII_ICONS
+    directions = icons['directions']
     ticker = metrics['ticker']
     as_of = metrics['as_of_date']
     
-    print(f"📊 {ticker} Financial Metrics (as of {as_of})")
-    print("=" * 50)
+    # Build the whole report, then write it once
+    lines = []
+    append = lines.append
+    
+    append(f"{icons['title']}{ticker} Financial Metrics (as of {as_of})")
+    append("=" * 50)
     
     # Current price
     pm = metrics.get('price_metrics', {})
     current = pm.get('current_price', {})
     if current:
-        print(f"💰 Current Price: ${current['close']:.2f} ({current['date']})")
+        append(f"{icons['price']}Current Price: ${current['close']:.2f} ({current['date']})")
     
     # Returns
     returns = pm.get('returns', {})
-    print("\n📈 Returns:")
-    for period, label in [('1D', '1 Day'), ('1W', '1 Week'), ('1M', '1 Month'), ('3M', '3 Month'), ('6M', '6 Month'), ('1Y', '1 Year')]:
-        if returns.get(period) is not None:
-            ret_pct = returns[period] * 100
-            direction = "📈" if ret_pct > 0 else "📉" if ret_pct < 0 else "➡️"
-            print(f"   {label:8}: {direction} {ret_pct:+6.2f}%")
-        else:
-            print(f"   {label:8}: Not available")
+    append(f"\n{icons['returns']}Returns:")
+    get = returns.get
+    lines.extend([
+        f"   {label:8}: {directions[(ret > 0) + 2 * (ret < 0)]} {ret * 100:+6.2f}%"
+        if (ret := get(period)) is not None else f"   {label:8}: Not available"
+        for period, label in _RETURN_PERIODS
+    ])
     
     # Volatility
     volatility = pm.get('volatility', {})
-    print("\n📊 Volatility (Annualized):")
-    for period, label in [('21D_annualized', '21 Day'), ('63D_annualized', '3 Month'), ('252D_annualized', '1 Year')]:
-        if volatility.get(period) is not None:
-            vol_pct = volatility[period] * 100
-            print(f"   {label:8}: {vol_pct:6.1f}%")
-        else:
-            print(f"   {label:8}: Not available")
+    append(f"\n{icons['volatility']}Volatility (Annualized):")
+    get = volatility.get
+    lines.extend([
+        f"   {label:8}: {vol * 100:6.1f}%"
+        if (vol := get(period)) is not None else f"   {label:8}: Not available"
+        for period, label in _VOL_PERIODS
+    ])
     
     # Drawdown
     drawdown = pm.get('drawdown', {})
     if drawdown.get('max_drawdown_pct') is not None:
         dd_pct = abs(drawdown['max_drawdown_pct'] * 100)
-        print(f"\n📉 Max Drawdown: -{dd_pct:.1f}%")
+        append(f"\n{icons['drawdown']}Max Drawdown: -{dd_pct:.1f}%")
         if drawdown.get('peak_date') and drawdown.get('trough_date'):
-            print(f"   Period: {drawdown['peak_date']} to {drawdown['trough_date']}")
+            append(f"   Period: {drawdown['peak_date']} to {drawdown['trough_date']}")
         if drawdown.get('recovery_date'):
-            print(f"   Recovered: {drawdown['recovery_date']}")
+            append(f"   Recovered: {drawdown['recovery_date']}")
         else:
-            print("   Recovery: Not yet recovered")
+            append("   Recovery: Not yet recovered")
     
     # Institutional metrics
     im = metrics.get('institutional_metrics')
     if im:
-        print(f"\n🏢 Institutional Holdings:")
+        append(f"\n{icons['holdings']}Institutional Holdings:")
         total_value = im.get('total_13f_value_usd', 0)
         if total_value > 0:
-            print(f"   Total 13F Value: ${total_value/1e9:.1f}B")
-            print(f"   Number of Holders: {im.get('total_13f_holders', 0)}")
+            append(f"   Total 13F Value: ${total_value/1e9:.1f}B")
+            append(f"   Number of Holders: {im.get('total_13f_holders', 0)}")
             
             concentration = im.get('concentration', {})
             if concentration.get('cr1') is not None:
                 cr1_pct = concentration['cr1'] * 100
                 cr5_pct = concentration.get('cr5', 0) * 100
-                print(f"   Top 1 Holder: {cr1_pct:.1f}%")
-                print(f"   Top 5 Holders: {cr5_pct:.1f}%")
+                append(f"   Top 1 Holder: {cr1_pct:.1f}%")
+                append(f"   Top 5 Holders: {cr5_pct:.1f}%")
     else:
-        print("\n🏢 Institutional Holdings: No 13F data available")
+        append(f"\n{icons['holdings']}Institutional Holdings: No 13F data available")
     
     # Data quality
     dq = metrics.get('data_quality', {})
-    print(f"\n📋 Data Quality:")
+    append(f"\n{icons['quality']}Data Quality:")
     if dq.get('price_coverage_pct') is not None:
-        print(f"   Price Coverage: {dq['price_coverage_pct']:.1f}%")
+        append(f"   Price Coverage: {dq['price_coverage_pct']:.1f}%")
     if dq.get('latest_13f_quarter'):
         age_days = dq.get('13f_data_age_days', 0)
-        print(f"   Latest 13F: {dq['latest_13f_quarter']} ({age_days} days ago)")
+        append(f"   Latest 13F: {dq['latest_13f_quarter']} ({age_days} days ago)")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _display_full_metrics(metrics: dict):
     """Display complete metrics in detailed format."""
-    print(json.dumps(metrics, indent=2, default=str))
+    _write_metrics(metrics, default=str)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,3 @@
+"""
+Output sinks for calculated metrics beyond per-ticker MetricsJSON files.
+"""
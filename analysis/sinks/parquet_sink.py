@@ -0,0 +1,119 @@
+"""
+Parquet sink for MetricsJSON - one row per ticker, partitioned by as_of_date.
+Lets dashboards scan many tickers with a single columnar read instead of
+opening and parsing one JSON file per ticker.
+"""
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+# Flattened column -> path into MetricsJSON
+METRIC_COLUMNS = {
+    'returns_1d': ('price_metrics', 'returns', '1D'),
+    'returns_1w': ('price_metrics', 'returns', '1W'),
+    'returns_1m': ('price_metrics', 'returns', '1M'),
+    'returns_3m': ('price_metrics', 'returns', '3M'),
+    'returns_6m': ('price_metrics', 'returns', '6M'),
+    'returns_1y': ('price_metrics', 'returns', '1Y'),
+    'vol_21d_annualized': ('price_metrics', 'volatility', '21D_annualized'),
+    'vol_63d_annualized': ('price_metrics', 'volatility', '63D_annualized'),
+    'vol_252d_annualized': ('price_metrics', 'volatility', '252D_annualized'),
+    'max_drawdown_pct': ('price_metrics', 'drawdown', 'max_drawdown_pct'),
+    'close': ('price_metrics', 'current_price', 'close'),
+    'cr1': ('institutional_metrics', 'concentration', 'cr1'),
+    'cr5': ('institutional_metrics', 'concentration', 'cr5'),
+    'cr10': ('institutional_metrics', 'concentration', 'cr10'),
+    'hhi': ('institutional_metrics', 'concentration', 'hhi'),
+    'total_13f_value_usd': ('institutional_metrics', 'total_13f_value_usd'),
+}
+
+SCHEMA = pa.schema(
+    [('ticker', pa.string())]
+    + [(name, pa.float64()) for name in METRIC_COLUMNS]
+    + [('as_of_date', pa.string())]
+)
+
+
+def flatten_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a MetricsJSON dictionary into one Parquet row.
+    
+    Args:
+        metrics: Complete MetricsJSON dictionary
+        
+    Returns:
+        Dictionary keyed by SCHEMA column names (missing metrics are None)
+    """
+    row = {'ticker': metrics['ticker'], 'as_of_date': metrics['as_of_date']}
+    
+    for column, path in METRIC_COLUMNS.items():
+        value = metrics
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        row[column] = value
+    
+    return row
+
+
+def append_metrics(root_path: Path, metrics_list: List[Dict[str, Any]]) -> int:
+    """
+    Write MetricsJSON rows to a Parquet dataset partitioned by as_of_date.
+    
+    Each (as_of_date, ticker) row lives in its own <ticker>-0.parquet file,
+    so rerunning a ticker for the same date replaces its row instead of
+    adding a second one. Other tickers and dates are left untouched.
+    
+    Args:
+        root_path: Dataset root directory
+        metrics_list: MetricsJSON dictionaries to write (later duplicates win)
+        
+    Returns:
+        Number of rows written
+    """
+    latest = {}
+    for metrics in metrics_list:
+        row = flatten_metrics(metrics)
+        latest[(row['as_of_date'], row['ticker'])] = row
+    
+    for (_, ticker), row in latest.items():
+        pq.write_to_dataset(
+            pa.Table.from_pylist([row], schema=SCHEMA),
+            root_path=str(root_path),
+            partition_cols=['as_of_date'],
+            basename_template=f'{ticker}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore'
+        )
+    
+    return len(latest)
+
+
+def read_metrics(
+    root_path: Path,
+    as_of_date: Optional[str] = None,
+    columns: Optional[List[str]] = None
+) -> pa.Table:
+    """
+    Read metrics rows from the Parquet dataset.
+    
+    Args:
+        root_path: Dataset root directory
+        as_of_date: Optional ISO date to select a single partition
+        columns: Optional column subset (e.g. ['ticker', 'cr1', 'hhi'])
+        
+    Returns:
+        Arrow table of matching rows
+    """
+    filters = [('as_of_date', '=', as_of_date)] if as_of_date is not None else None
+    
+    return pq.read_table(
+        str(root_path),
+        columns=columns,
+        filters=filters,
+        partitioning=ds.partitioning(
+            pa.schema([('as_of_date', pa.string())]), flavor='hive'
+        )
+    )
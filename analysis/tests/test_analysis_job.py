@@ -14,17 +14,22 @@ from pathlib import Path
 # Import analysis job (will be created next)
 from analysis.analysis_job import (
     analyze_ticker,
+    batch_analyze_tickers,
     AnalysisJobError,
     _query_price_data,
-    _query_holdings_data
+    _query_holdings_data,
+    _query_prices_bulk,
+    _query_holdings_bulk,
+    _write_metrics_json,
+    _HOLDINGS_LATEST_QUERY
 )
+import numpy as np
 from storage.loaders import init_database, upsert_prices, upsert_13f
 
 
-@pytest.fixture
-def temp_db_with_data():
-    """Create temporary database with test data."""
-    # Create temp database
+@pytest.fixture(scope="module")
+def seeded_db():
+    """Seed the test rows once per module into an in-memory database."""
     conn = sqlite3.connect(':memory:')
     init_database(conn)
     
@@ -73,6 +78,19 @@ def temp_db_with_data():
     ]
     upsert_13f(conn, holdings_data)
     
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def temp_db_with_data(seeded_db):
+    """Create temporary database with test data."""
+    # Page-level copy of the seeded database; tests that insert rows
+    # only change their own copy
+    conn = sqlite3.connect(':memory:')
+    seeded_db.backup(conn)
+    conn.execute("PRAGMA foreign_keys = ON")
+    
     return conn
 
 
@@ -179,6 +197,26 @@ class TestAnalysisJob:
         dates = df['date'].tolist()
         assert dates == sorted(dates)
     
+    def test_query_price_data_typed_columns(self, temp_db_with_data):
+        """Test price columns come back as numeric dtypes and date objects."""
+        df = _query_price_data(temp_db_with_data, 'AAPL')
+
+        assert df['close'].dtype == 'float64'
+        assert df['volume'].dtype == 'int64'
+        assert df['date'].iloc[0] == date(2025, 8, 1)
+    
+    def test_query_frames_skip_unused_columns(self, temp_db_with_data):
+        """Test only columns used downstream are read from SQLite."""
+        prices = _query_price_data(temp_db_with_data, 'AAPL')
+        holdings = _query_holdings_data(temp_db_with_data, 'AAPL')
+        
+        assert 'as_of' not in prices.columns
+        assert 'name' not in holdings.columns
+        assert list(_query_prices_bulk(temp_db_with_data, ['AAPL'])['AAPL'].columns) == \
+            list(prices.columns)
+        assert list(_query_holdings_bulk(temp_db_with_data, ['AAPL'])['AAPL'].columns) == \
+            list(holdings.columns)
+
     def test_query_holdings_data(self, temp_db_with_data):
         """Test 13F holdings data querying function."""
         df = _query_holdings_data(temp_db_with_data, 'AAPL')
@@ -188,6 +226,27 @@ class TestAnalysisJob:
         assert all(df['ticker'] == 'AAPL')
         assert 'value_usd' in df.columns
         assert 'filer' in df.columns
+        assert df['value_usd'].dtype == 'float64'
+        assert set(df['as_of']) == {date(2024, 9, 30)}
+    
+    def test_query_holdings_data_latest_quarter_uses_index(self, temp_db_with_data):
+        """Test latest-quarter lookup seeks the (ticker, as_of) index and skips older quarters."""
+        upsert_13f(temp_db_with_data, [{
+            'cik': '0000102909', 'filer': 'VANGUARD GROUP INC',
+            'ticker': 'AAPL', 'name': 'APPLE INC', 'cusip': '037833100',
+            'value_usd': 1000.0, 'shares': 10.0,
+            'as_of': date(2024, 6, 30), 'source': 'sec_edgar',
+            'ingested_at': datetime(2025, 1, 15, 10, 0, 0)
+        }])
+        
+        df = _query_holdings_data(temp_db_with_data, 'AAPL')
+        plan = temp_db_with_data.execute(
+            'EXPLAIN QUERY PLAN ' + _HOLDINGS_LATEST_QUERY, ['AAPL']
+        ).fetchall()
+        
+        assert set(df['as_of']) == {date(2024, 9, 30)}
+        assert df['value_usd'].tolist() == [50000000000.0, 30000000000.0]
+        assert any('idx_13f_ticker_as_of' in row[-1] for row in plan)
     
     def test_query_price_data_no_results(self, temp_db_with_data):
         """Test price querying with no results."""
@@ -196,6 +255,114 @@ class TestAnalysisJob:
         assert df.empty
         assert 'ticker' in df.columns  # Should have expected columns
     
+    def test_write_metrics_json_handles_dates_and_numpy(self, tmp_path):
+        """Test metrics writeout serializes dates and NumPy scalars."""
+        output_path = tmp_path / 'AAPL.json'
+        
+        _write_metrics_json(
+            {'as_of_date': date(2025, 8, 5), 'close': np.float64(223.55), 'days': np.int64(3)},
+            output_path
+        )
+        
+        with open(output_path, 'r') as f:
+            written = json.load(f)
+        
+        assert written == {'as_of_date': '2025-08-05', 'close': 223.55, 'days': 3}
+    
+    def test_write_metrics_json_replaces_atomically(self, tmp_path):
+        """Test a failed write leaves the previous file intact and no temp file."""
+        output_path = tmp_path / 'AAPL.json'
+        _write_metrics_json({'ticker': 'AAPL'}, output_path)
+        
+        class Unserializable:
+            def __str__(self):
+                raise ValueError("cannot serialize")
+        
+        with pytest.raises((TypeError, ValueError)):
+            _write_metrics_json({'ticker': 'AAPL', 'bad': Unserializable()}, output_path)
+        
+        with open(output_path, 'r') as f:
+            assert json.load(f) == {'ticker': 'AAPL'}
+        assert [p.name for p in tmp_path.iterdir()] == ['AAPL.json']
+    
+    def test_write_metrics_json_concurrent_writers_same_path(self, tmp_path):
+        """Test threads writing one target each use their own temp file."""
+        from concurrent.futures import ThreadPoolExecutor
+        output_path = tmp_path / 'AAPL.json'
+        
+        def write(i):
+            for _ in range(25):
+                _write_metrics_json({'ticker': 'AAPL', 'writer': i}, output_path)
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(write, range(4)))
+        
+        with open(output_path, 'r') as f:
+            assert json.load(f)['writer'] in range(4)
+        assert [p.name for p in tmp_path.iterdir()] == ['AAPL.json']
+    
+    def test_analyze_ticker_reuses_output_when_inputs_unchanged(self, temp_db_with_data):
+        """Test unchanged inputs skip recomposition; changed rows invalidate it."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / 'AAPL.json'
+            
+            analyze_ticker(temp_db_with_data, 'AAPL', output_path, date(2025, 8, 5))
+            with open(output_path, 'r') as f:
+                first = json.load(f)
+            
+            result = analyze_ticker(temp_db_with_data, 'AAPL', output_path, date(2025, 8, 5))
+            with open(output_path, 'r') as f:
+                cached = json.load(f)
+            
+            assert result['status'] == 'completed'
+            assert result['metrics_calculated'] > 0
+            assert output_path.with_suffix('.hash').exists()
+            assert cached['metadata']['calculated_at'] == first['metadata']['calculated_at']
+            
+            # New price row changes the digest
+            upsert_prices(temp_db_with_data, [{
+                'ticker': 'AAPL', 'date': date(2025, 8, 6),
+                'open': 223.0, 'high': 225.0, 'low': 222.0, 'close': 224.10, 'adj_close': 223.85,
+                'volume': 40000000, 'source': 'yfinance', 'as_of': date(2025, 8, 6),
+                'ingested_at': datetime(2025, 8, 7, 9, 0, 0)
+            }])
+            analyze_ticker(temp_db_with_data, 'AAPL', output_path, date(2025, 8, 5))
+            with open(output_path, 'r') as f:
+                refreshed = json.load(f)
+            
+            assert refreshed['data_period']['trading_days'] == 4
+    
+    def test_analyze_ticker_crash_before_digest_does_not_reuse_stale_pair(
+        self, temp_db_with_data, tmp_path, monkeypatch
+    ):
+        """Test a run dying after the JSON write cannot pair new output with an old digest."""
+        import analysis.analysis_job as analysis_job
+        output_path = tmp_path / 'AAPL.json'
+        
+        # Run 1 records the digest for the 3-day inputs
+        analyze_ticker(temp_db_with_data, 'AAPL', output_path, date(2025, 8, 5))
+        
+        # Run 2 on 4-day inputs writes its JSON, then dies before the digest
+        upsert_prices(temp_db_with_data, [{
+            'ticker': 'AAPL', 'date': date(2025, 8, 6),
+            'open': 223.0, 'high': 225.0, 'low': 222.0, 'close': 224.10, 'adj_close': 223.85,
+            'volume': 40000000, 'source': 'yfinance', 'as_of': date(2025, 8, 6),
+            'ingested_at': datetime(2025, 8, 7, 9, 0, 0)
+        }])
+        def crash(*args):
+            raise OSError("disk full")
+        monkeypatch.setattr(analysis_job, '_write_digest', crash)
+        assert analyze_ticker(temp_db_with_data, 'AAPL', output_path, date(2025, 8, 5))['status'] == 'failed'
+        monkeypatch.undo()
+        assert not output_path.with_suffix('.hash').exists()
+        
+        # Run 3 on the original inputs must recompose rather than reuse run 2's JSON
+        temp_db_with_data.execute("DELETE FROM prices WHERE date = '2025-08-06'")
+        analyze_ticker(temp_db_with_data, 'AAPL', output_path, date(2025, 8, 5))
+        with open(output_path, 'r') as f:
+            assert json.load(f)['data_period']['trading_days'] == 3
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['AAPL.hash', 'AAPL.json']
+    
     def test_analyze_ticker_output_directory_creation(self, temp_db_with_data):
         """Test that output directory is created if it doesn't exist."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -235,3 +402,153 @@ class TestAnalysisJob:
             
             # Should be identical (deterministic)
             assert metrics1 == metrics2
+
+
+class TestBatchAnalysis:
+    """Tests for batched multi-ticker analysis."""
+
+    def test_query_prices_bulk_groups_by_ticker(self, temp_db_with_data):
+        """Test bulk price query returns one frame per ticker with data."""
+        frames = _query_prices_bulk(temp_db_with_data, ['AAPL', 'NONEXISTENT'])
+
+        assert set(frames) == {'AAPL'}
+        single = _query_price_data(temp_db_with_data, 'AAPL')
+        assert frames['AAPL'].equals(single)
+
+    def test_query_holdings_bulk_latest_quarter_only(self, temp_db_with_data):
+        """Test bulk holdings query keeps only each ticker's latest quarter."""
+        older = [{
+            'cik': '0000102909', 'filer': 'VANGUARD GROUP INC',
+            'ticker': 'AAPL', 'name': 'APPLE INC', 'cusip': '037833100',
+            'value_usd': 1000.0, 'shares': 10.0,
+            'as_of': date(2024, 6, 30), 'source': 'sec_edgar',
+            'ingested_at': datetime(2025, 1, 15, 10, 0, 0)
+        }]
+        upsert_13f(temp_db_with_data, older)
+
+        frames = _query_holdings_bulk(temp_db_with_data, ['AAPL'])
+
+        assert len(frames['AAPL']) == 2
+        assert set(frames['AAPL']['as_of']) == {date(2024, 9, 30)}
+        assert frames['AAPL']['value_usd'].tolist() == \
+            _query_holdings_data(temp_db_with_data, 'AAPL')['value_usd'].tolist()
+
+    def test_batch_analyze_tickers_matches_single_runs(self, temp_db_with_data):
+        """Test batch output equals per-ticker analyze_ticker output."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_dir = Path(temp_dir) / 'batch'
+            single_path = Path(temp_dir) / 'single' / 'AAPL.json'
+
+            summary = batch_analyze_tickers(
+                temp_db_with_data, ['AAPL', 'INVALID'], batch_dir, date(2025, 8, 5)
+            )
+            analyze_ticker(temp_db_with_data, 'AAPL', single_path, date(2025, 8, 5))
+
+            assert summary['completed'] == 1
+            assert summary['failed'] == 1
+
+            with open(batch_dir / 'AAPL.json', 'r') as f:
+                batch_metrics = json.load(f)
+            with open(single_path, 'r') as f:
+                single_metrics = json.load(f)
+
+            del batch_metrics['metadata']['calculated_at']
+            del single_metrics['metadata']['calculated_at']
+            assert batch_metrics == single_metrics
+
+    @pytest.mark.parametrize('use_threads', [True, False])
+    def test_batch_analyze_tickers_parallel_matches_serial(self, temp_db_with_data, use_threads):
+        """Test pooled batch runs produce the same results, in ticker order."""
+        msft_price = [{
+            'ticker': 'MSFT', 'date': date(2025, 8, 1),
+            'open': 300.0, 'high': 305.0, 'low': 298.0, 'close': 302.0, 'adj_close': 301.50,
+            'volume': 20000000, 'source': 'yfinance', 'as_of': date(2025, 8, 1),
+            'ingested_at': datetime(2025, 8, 2, 9, 0, 0)
+        }]
+        upsert_prices(temp_db_with_data, msft_price)
+        tickers = ['MSFT', 'AAPL', 'INVALID']
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            serial = batch_analyze_tickers(
+                temp_db_with_data, tickers, Path(temp_dir) / 'serial', date(2025, 8, 5)
+            )
+            pooled = batch_analyze_tickers(
+                temp_db_with_data, tickers, Path(temp_dir) / 'pooled', date(2025, 8, 5),
+                max_workers=2, use_threads=use_threads
+            )
+
+            assert [r['ticker'] for r in pooled['results']] == tickers
+            assert [r['status'] for r in pooled['results']] == \
+                [r['status'] for r in serial['results']]
+            assert pooled['total_metrics_calculated'] == serial['total_metrics_calculated']
+
+    def test_batch_analyze_tickers_duplicate_ticker_parallel(self, temp_db_with_data, tmp_path):
+        """Test a ticker listed twice completes both times under a worker pool."""
+        summary = batch_analyze_tickers(
+            temp_db_with_data, ['AAPL', 'AAPL'], tmp_path, date(2025, 8, 5),
+            max_workers=2, use_threads=True
+        )
+
+        assert [r['status'] for r in summary['results']] == ['completed', 'completed']
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['AAPL.hash', 'AAPL.json']
+
+    def test_batch_analyze_tickers_parquet_root(self, temp_db_with_data, tmp_path):
+        """Test batch runs can also append completed metrics to Parquet."""
+        from analysis.sinks.parquet_sink import read_metrics
+
+        batch_analyze_tickers(
+            temp_db_with_data, ['AAPL', 'INVALID'], tmp_path / 'json', date(2025, 8, 5),
+            parquet_root=tmp_path / 'parquet'
+        )
+
+        table = read_metrics(tmp_path / 'parquet', as_of_date='2025-08-05')
+        assert table.column('ticker').to_pylist() == ['AAPL']
+
+
+class TestConcurrentQueries:
+    """Tests for overlapping price/holdings reads on a database file."""
+
+    def test_analyze_ticker_db_path_matches_serial(self, temp_db_with_data, tmp_path):
+        """Test concurrent read-only queries give the same output as serial ones."""
+        db_path = tmp_path / 'research.db'
+        file_conn = sqlite3.connect(str(db_path))
+        temp_db_with_data.backup(file_conn)
+
+        serial_path = tmp_path / 'serial' / 'AAPL.json'
+        concurrent_path = tmp_path / 'concurrent' / 'AAPL.json'
+
+        analyze_ticker(file_conn, 'AAPL', serial_path, date(2025, 8, 5))
+        result = analyze_ticker(
+            file_conn, 'AAPL', concurrent_path, date(2025, 8, 5), db_path=str(db_path)
+        )
+        file_conn.close()
+
+        assert result['status'] == 'completed'
+        assert result['holdings_data_points'] == 2
+
+        with open(serial_path, 'r') as f:
+            serial = json.load(f)
+        with open(concurrent_path, 'r') as f:
+            concurrent = json.load(f)
+
+        del serial['metadata']['calculated_at']
+        del concurrent['metadata']['calculated_at']
+        assert serial == concurrent
+
+    @pytest.mark.parametrize('dir_name', ['a#b', 'with space', 'pct%20dir', 'q?mark'])
+    def test_analyze_ticker_db_path_special_characters(self, temp_db_with_data, tmp_path, dir_name):
+        """Test the read-only URI keeps '#', '%', '?' and spaces inside the path."""
+        db_path = tmp_path / dir_name / 'research.db'
+        db_path.parent.mkdir()
+        file_conn = sqlite3.connect(str(db_path))
+        temp_db_with_data.backup(file_conn)
+
+        result = analyze_ticker(
+            file_conn, 'AAPL', tmp_path / 'out' / 'AAPL.json', date(2025, 8, 5),
+            db_path=str(db_path)
+        )
+        file_conn.close()
+
+        assert result['status'] == 'completed', result.get('error_message')
+        assert result['holdings_data_points'] == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted([dir_name, 'out'])
@@ -1,95 +1,131 @@
 """
-Tests for CLI entry points - subprocess calls in temp workspace.
-Tests actual command execution with seeded DB.
+Tests for CLI entry points against a seeded DB in a temp workspace.
+Most cases call main() in-process; one subprocess smoke test per CLI
+covers real script/module invocation.
 """
 
 import pytest
 import subprocess
 import sqlite3
+import io
 import json
-import tempfile
 import sys
 from datetime import date, datetime
 from pathlib import Path
 
 # Test utilities
 from storage.loaders import init_database, upsert_prices, upsert_13f
+from analysis import show_metrics
+from analysis import analyze_ticker as analyze_ticker_cli
 
 
-@pytest.fixture
-def temp_workspace():
-    """Create temporary workspace with database and test data."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        workspace = Path(temp_dir)
-        
-        # Create database with test data
-        db_path = workspace / 'research.db'
-        conn = sqlite3.connect(str(db_path))
-        init_database(conn)
-        
-        # Insert test price data for AAPL
-        price_data = [
-            {
-                'ticker': 'AAPL', 'date': date(2025, 8, 1),
-                'open': 220.50, 'high': 222.30, 'low': 219.80, 'close': 221.75, 'adj_close': 221.50,
-                'volume': 45000000, 'source': 'yfinance', 'as_of': date(2025, 8, 1),
-                'ingested_at': datetime(2025, 8, 2, 9, 0, 0)
-            },
-            {
-                'ticker': 'AAPL', 'date': date(2025, 8, 4),
-                'open': 221.80, 'high': 223.45, 'low': 221.20, 'close': 222.90, 'adj_close': 222.65,
-                'volume': 38000000, 'source': 'yfinance', 'as_of': date(2025, 8, 4),
-                'ingested_at': datetime(2025, 8, 5, 9, 0, 0)
-            },
-            {
-                'ticker': 'AAPL', 'date': date(2025, 8, 5),
-                'open': 222.95, 'high': 224.10, 'low': 222.40, 'close': 223.55, 'adj_close': 223.30,
-                'volume': 42000000, 'source': 'yfinance', 'as_of': date(2025, 8, 5),
-                'ingested_at': datetime(2025, 8, 6, 9, 0, 0)
-            }
-        ]
-        upsert_prices(conn, price_data)
-        
-        # Insert test 13F data
-        holdings_data = [
-            {
-                'cik': '0001067983', 'filer': 'BERKSHIRE HATHAWAY INC',
-                'ticker': 'AAPL', 'name': 'APPLE INC', 'cusip': '037833100',
-                'value_usd': 50000000000.0, 'shares': 250000000.0,
-                'as_of': date(2024, 9, 30), 'source': 'sec_edgar',
-                'ingested_at': datetime(2025, 1, 15, 10, 0, 0)
-            }
-        ]
-        upsert_13f(conn, holdings_data)
-        
-        conn.close()
-        
-        yield workspace
+def run_cli(module, monkeypatch, *argv):
+    """Run a CLI module's main() in-process and return its exit code."""
+    monkeypatch.setattr(sys, 'argv', [f'{module.__name__}.py', *argv])
+    try:
+        module.main()
+    except SystemExit as exc:
+        return exc.code or 0
+    return 0
+
+
+@pytest.fixture(scope="module")
+def temp_workspace(tmp_path_factory):
+    """
+    Create a workspace with a seeded database, built once per module.
+    
+    Tests treat it as read-only and write their outputs under tmp_path.
+    """
+    workspace = tmp_path_factory.mktemp('workspace')
+    
+    # Create database with test data
+    conn = sqlite3.connect(str(workspace / 'research.db'))
+    init_database(conn)
+    
+    # Insert test price data for AAPL
+    price_data = [
+        {
+            'ticker': 'AAPL', 'date': date(2025, 8, 1),
+            'open': 220.50, 'high': 222.30, 'low': 219.80, 'close': 221.75, 'adj_close': 221.50,
+            'volume': 45000000, 'source': 'yfinance', 'as_of': date(2025, 8, 1),
+            'ingested_at': datetime(2025, 8, 2, 9, 0, 0)
+        },
+        {
+            'ticker': 'AAPL', 'date': date(2025, 8, 4),
+            'open': 221.80, 'high': 223.45, 'low': 221.20, 'close': 222.90, 'adj_close': 222.65,
+            'volume': 38000000, 'source': 'yfinance', 'as_of': date(2025, 8, 4),
+            'ingested_at': datetime(2025, 8, 5, 9, 0, 0)
+        },
+        {
+            'ticker': 'AAPL', 'date': date(2025, 8, 5),
+            'open': 222.95, 'high': 224.10, 'low': 222.40, 'close': 223.55, 'adj_close': 223.30,
+            'volume': 42000000, 'source': 'yfinance', 'as_of': date(2025, 8, 5),
+            'ingested_at': datetime(2025, 8, 6, 9, 0, 0)
+        }
+    ]
+    upsert_prices(conn, price_data)
+    
+    # Insert test 13F data
+    holdings_data = [
+        {
+            'cik': '0001067983', 'filer': 'BERKSHIRE HATHAWAY INC',
+            'ticker': 'AAPL', 'name': 'APPLE INC', 'cusip': '037833100',
+            'value_usd': 50000000000.0, 'shares': 250000000.0,
+            'as_of': date(2024, 9, 30), 'source': 'sec_edgar',
+            'ingested_at': datetime(2025, 1, 15, 10, 0, 0)
+        }
+    ]
+    upsert_13f(conn, holdings_data)
+    
+    conn.close()
+    
+    return workspace
+
+
+@pytest.fixture(scope="module")
+def metrics_dir(tmp_path_factory):
+    """Write the AAPL MetricsJSON used by the show_metrics tests once per module."""
+    metrics_dir = tmp_path_factory.mktemp('metrics')
+    test_metrics = {
+        'ticker': 'AAPL',
+        'as_of_date': '2025-08-05',
+        'price_metrics': {
+            'returns': {'1D': 0.0234, '1W': 0.0456, '1M': 0.0891},
+            'volatility': {'21D_annualized': 0.2845},
+            'current_price': {'close': 223.55, 'date': '2025-08-05'}
+        },
+        'institutional_metrics': {
+            'total_13f_value_usd': 80000000000.0,
+            'concentration': {'cr1': 0.625, 'cr5': 1.0, 'hhi': 0.4525}
+        }
+    }
+    
+    with open(metrics_dir / 'AAPL.json', 'w') as f:
+        json.dump(test_metrics, f)
+    
+    return metrics_dir
 
 
 class TestAnalyzeTickerCLI:
     """Tests for analyze_ticker CLI command."""
     
-    def test_analyze_ticker_cli_success(self, temp_workspace):
+    def test_analyze_ticker_cli_success(self, temp_workspace, tmp_path, monkeypatch, capsys):
         """Test successful CLI execution."""
         db_path = temp_workspace / 'research.db'
-        output_path = temp_workspace / 'AAPL_metrics.json'
-        
-        # Get the project root to find the CLI script
-        project_root = Path(__file__).parent.parent.parent
-        cli_script = project_root / 'analysis' / 'analyze_ticker.py'
+        output_path = tmp_path / 'AAPL_metrics.json'
         
         # Run CLI command
-        result = subprocess.run([
-            sys.executable, str(cli_script),
+        code = run_cli(
+            analyze_ticker_cli, monkeypatch,
             'AAPL',
             '--db-path', str(db_path),
             '--output', str(output_path),
             '--as-of', '2025-08-05'
-        ], capture_output=True, text=True, cwd=str(project_root))
+        )
+        captured = capsys.readouterr()
         
         # Should succeed
-        assert result.returncode == 0, f"CLI failed: {result.stderr}"
+        assert code == 0, f"CLI failed: {captured.err}"
         
         # Output file should exist
         assert output_path.exists()
@@ -102,103 +138,105 @@ class TestAnalyzeTickerCLI:
         assert 'price_metrics' in metrics
         assert 'institutional_metrics' in metrics
     
-    def test_analyze_ticker_cli_no_data(self, temp_workspace):
+    def test_analyze_ticker_cli_no_data(self, temp_workspace, tmp_path, monkeypatch, capsys):
         """Test CLI with ticker that has no data."""
         db_path = temp_workspace / 'research.db'
-        output_path = temp_workspace / 'INVALID_metrics.json'
+        output_path = tmp_path / 'INVALID_metrics.json'
         
-        project_root = Path(__file__).parent.parent.parent
-        cli_script = project_root / 'analysis' / 'analyze_ticker.py'
-        
-        result = subprocess.run([
-            sys.executable, str(cli_script),
+        code = run_cli(
+            analyze_ticker_cli, monkeypatch,
             'INVALID',  # No data for this ticker
             '--db-path', str(db_path),
             '--output', str(output_path)
-        ], capture_output=True, text=True, cwd=str(project_root))
+        )
         
         # Should fail gracefully
-        assert result.returncode != 0
-        assert 'No price data' in result.stderr
+        assert code != 0
+        assert 'No price data' in capsys.readouterr().err
         
         # Output file should not exist
         assert not output_path.exists()
     
-    def test_analyze_ticker_cli_default_paths(self, temp_workspace):
+    def test_analyze_ticker_cli_default_paths(self, temp_workspace, tmp_path, monkeypatch):
         """Test CLI with default paths."""
         # Copy database to expected default location
-        default_db = temp_workspace / 'data' / 'research.db'
+        default_db = tmp_path / 'data' / 'research.db'
         default_db.parent.mkdir(exist_ok=True)
         
         source_db = temp_workspace / 'research.db'
         import shutil
         shutil.copy2(source_db, default_db)
         
-        project_root = Path(__file__).parent.parent.parent
-        cli_script = project_root / 'analysis' / 'analyze_ticker.py'
-        
-        result = subprocess.run([
-            sys.executable, str(cli_script),
-            'AAPL'  # Just ticker, use defaults
-        ], capture_output=True, text=True, cwd=str(temp_workspace))
+        monkeypatch.chdir(tmp_path)
+        code = run_cli(analyze_ticker_cli, monkeypatch, 'AAPL')  # Just ticker, use defaults
         
         # Should succeed with defaults
-        assert result.returncode == 0
+        assert code == 0
         
         # Default output should exist
-        default_output = temp_workspace / 'data' / 'processed' / 'metrics' / 'AAPL.json'
+        default_output = tmp_path / 'data' / 'processed' / 'metrics' / 'AAPL.json'
         assert default_output.exists()
-
-
-class TestShowMetricsCLI:
-    """Tests for show_metrics CLI command."""
     
-    def test_show_metrics_cli_success(self, temp_workspace):
-        """Test show_metrics CLI with existing metrics file."""
-        # Create a metrics file first
-        metrics_dir = temp_workspace / 'data' / 'processed' / 'metrics'
-        metrics_dir.mkdir(parents=True)
-        
-        metrics_file = metrics_dir / 'AAPL.json'
-        test_metrics = {
-            'ticker': 'AAPL',
-            'as_of_date': '2025-08-05',
-            'price_metrics': {
-                'returns': {'1D': 0.0234, '1W': 0.0456, '1M': 0.0891},
-                'volatility': {'21D_annualized': 0.2845},
-                'current_price': {'close': 223.55, 'date': '2025-08-05'}
-            },
-            'institutional_metrics': {
-                'total_13f_value_usd': 80000000000.0,
-                'concentration': {'cr1': 0.625, 'cr5': 1.0, 'hhi': 0.4525}
-            }
-        }
-        
-        with open(metrics_file, 'w') as f:
-            json.dump(test_metrics, f)
-        
+    def test_analyze_ticker_module_entry_point(self, temp_workspace, tmp_path):
+        """Test python -m invocation works without the script path hack."""
+        db_path = temp_workspace / 'research.db'
+        output_path = tmp_path / 'AAPL_metrics.json'
         project_root = Path(__file__).parent.parent.parent
-        cli_script = project_root / 'analysis' / 'show_metrics.py'
         
         result = subprocess.run([
-            sys.executable, str(cli_script),
+            sys.executable, '-m', 'analysis.analyze_ticker',
             'AAPL',
-            '--metrics-dir', str(metrics_dir)
+            '--db-path', str(db_path),
+            '--output', str(output_path),
+            '--as-of', '2025-08-05',
+            '--quiet'
         ], capture_output=True, text=True, cwd=str(project_root))
         
+        assert result.returncode == 0, f"CLI failed: {result.stderr}"
+        assert output_path.exists()
+    
+    def test_analyze_ticker_help_skips_analysis_imports(self):
+        """Test --help exits before pandas and the analysis job are imported."""
+        project_root = Path(__file__).parent.parent.parent
+        probe = (
+            "import runpy, sys\n"
+            "sys.argv = ['analyze_ticker', '--help']\n"
+            "try:\n"
+            "    runpy.run_module('analysis.analyze_ticker', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print('pandas' in sys.modules, 'analysis.analysis_job' in sys.modules)\n"
+        )
+        
+        result = subprocess.run(
+            [sys.executable, '-c', probe],
+            capture_output=True, text=True, cwd=str(project_root)
+        )
+        
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == 'False False'
+
+
+class TestShowMetricsCLI:
+    """Tests for show_metrics CLI command."""
+    
+    def test_show_metrics_cli_success(self, metrics_dir, monkeypatch, capsys):
+        """Test show_metrics CLI with existing metrics file."""
+        code = run_cli(show_metrics, monkeypatch, 'AAPL', '--metrics-dir', str(metrics_dir))
+        
         # Should succeed and show metrics
-        assert result.returncode == 0
+        assert code == 0
         
         # Output should contain key metrics
-        output = result.stdout
+        output = capsys.readouterr().out
         assert 'AAPL' in output
         assert '2.34%' in output  # 1D return
         assert '28.45%' in output  # Volatility
         assert '$223.55' in output  # Current price
     
-    def test_show_metrics_cli_no_file(self, temp_workspace):
+    def test_show_metrics_cli_no_file(self, tmp_path):
         """Test show_metrics CLI with no metrics file."""
-        metrics_dir = temp_workspace / 'data' / 'processed' / 'metrics'
+        metrics_dir = tmp_path / 'data' / 'processed' / 'metrics'
         
         project_root = Path(__file__).parent.parent.parent
         cli_script = project_root / 'analysis' / 'show_metrics.py'
@@ -212,3 +250,178 @@ class TestShowMetricsCLI:
         # Should fail gracefully
         assert result.returncode != 0
         assert 'No metrics found' in result.stderr
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_show_metrics_json_round_trip(self, tmp_path, monkeypatch, use_orjson):
+        """Test load gives the same metrics with orjson and the stdlib fallback."""
+        if not use_orjson:
+            monkeypatch.setattr(show_metrics, 'orjson', None)
+        elif show_metrics.orjson is None:
+            pytest.skip("orjson not installed")
+        
+        metrics = {'ticker': 'AAPL', 'price_metrics': {'returns': {'1D': 0.0234, '1W': None}}}
+        metrics_file = tmp_path / 'AAPL.json'
+        metrics_file.write_text(json.dumps(metrics))
+        
+        loaded = show_metrics._load_metrics(metrics_file)
+        
+        assert loaded == metrics
+    
+    def test_load_metrics_cached_until_file_changes(self, tmp_path):
+        """Test repeated loads reuse the parse and a rewrite invalidates it."""
+        metrics_file = tmp_path / 'AAPL.json'
+        metrics_file.write_text(json.dumps({'ticker': 'AAPL', 'as_of_date': '2025-08-05'}))
+        
+        first = show_metrics.load_metrics(metrics_file)
+        assert show_metrics.load_metrics(str(metrics_file)) is first
+        
+        metrics_file.write_text(json.dumps({'ticker': 'AAPL', 'as_of_date': '2025-08-06T00:00'}))
+        
+        assert show_metrics.load_metrics(metrics_file)['as_of_date'] == '2025-08-06T00:00'
+    
+    def test_summary_return_and_volatility_rows(self, capsys):
+        """Test direction markers and missing periods in the summary tables."""
+        show_metrics._display_summary_metrics({
+            'ticker': 'AAPL',
+            'as_of_date': '2025-08-05',
+            'price_metrics': {
+                'returns': {'1D': 0.0234, '1W': -0.01, '1M': 0.0},
+                'volatility': {'21D_annualized': 0.2845}
+            }
+        })
+        output = capsys.readouterr().out
+        
+        assert '1 Day   : 📈  +2.34%' in output
+        assert '1 Week  : 📉  -1.00%' in output
+        assert '1 Month : ➡️  +0.00%' in output
+        assert '1 Year  : Not available' in output
+        assert '21 Day  :   28.4%' in output
+        assert output.endswith('📋 Data Quality:\n')
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_write_metrics_streams_json(self, monkeypatch, capsys, use_orjson):
+        """Test full/json output matches the string encoder and ends with a newline."""
+        if not use_orjson:
+            monkeypatch.setattr(show_metrics, 'orjson', None)
+        elif show_metrics.orjson is None:
+            pytest.skip("orjson not installed")
+        
+        metrics = {'ticker': 'AAPL', 'as_of': date(2025, 8, 5), 'returns': {'1D': 0.0234}}
+        
+        show_metrics._write_metrics(metrics, default=str)
+        
+        assert capsys.readouterr().out == json.dumps(metrics, indent=2, default=str) + '\n'
+    
+    def test_show_metrics_missing_file_in_process(self, tmp_path, monkeypatch, capsys):
+        """Test a missing metrics file exits with the friendly message."""
+        code = run_cli(show_metrics, monkeypatch, 'NONEXISTENT', '--metrics-dir', str(tmp_path))
+        
+        assert code == 1
+        assert 'No metrics found for NONEXISTENT' in capsys.readouterr().err
+    
+    @pytest.mark.parametrize("argv, env", [(['--no-emoji'], {}), ([], {'NO_COLOR': '1'})])
+    def test_show_metrics_ascii_summary(self, metrics_dir, monkeypatch, capsys, argv, env):
+        """Test --no-emoji and NO_COLOR give a plain ASCII summary."""
+        monkeypatch.delenv('NO_COLOR', raising=False)
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        
+        code = run_cli(show_metrics, monkeypatch, 'AAPL', '--metrics-dir', str(metrics_dir), *argv)
+        output = capsys.readouterr().out
+        
+        assert code == 0
+        assert output.isascii()
+        assert 'AAPL Financial Metrics (as of 2025-08-05)' in output
+        assert '1 Day   : ^  +2.34%' in output
+    
+    def test_show_metrics_ascii_errors_keep_stream_encoding(self, tmp_path, monkeypatch):
+        """Test --no-emoji errors are ASCII and an ASCII console isn't switched to UTF-8."""
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding='ascii')
+        stderr = io.TextIOWrapper(io.BytesIO(), encoding='ascii')
+        monkeypatch.setattr(sys, 'stdout', stdout)
+        monkeypatch.setattr(sys, 'stderr', stderr)
+        
+        code = run_cli(show_metrics, monkeypatch, 'NONEXISTENT', '--metrics-dir', str(tmp_path), '--no-emoji')
+        stderr.flush()
+        err = stderr.buffer.getvalue().decode('ascii')
+        
+        assert code == 1
+        assert stdout.encoding == stderr.encoding == 'ascii'
+        assert 'Error: No metrics found for NONEXISTENT' in err
+        assert 'Run analysis first: python -m analysis.analyze_ticker NONEXISTENT' in err
+    
+    def test_batch_ascii_errors(self, metrics_dir, monkeypatch, capsys):
+        """Test batch-mode load errors honour NO_COLOR."""
+        monkeypatch.setenv('NO_COLOR', '1')
+        monkeypatch.setattr(sys, 'stdin', io.StringIO("MSFT\n"))
+        
+        code = run_cli(show_metrics, monkeypatch, '-', '--metrics-dir', str(metrics_dir))
+        err = capsys.readouterr().err
+        
+        assert code == 1
+        assert err.isascii()
+        assert 'Error: No metrics found for MSFT' in err
+    
+    @pytest.mark.parametrize("argv", [
+        ['AAPL'],
+        ['AAPL', '--metrics-dir', './custom/metrics', '--format', 'json'],
+        ['--format', 'full', 'MSFT', '--no-emoji'],
+        ['AAPL', '--metrics-dir=./custom/metrics', '--form', 'json'],
+    ])
+    def test_parse_args_matches_argparse(self, argv):
+        """Test the argparse-free fast path agrees with the full parser."""
+        expected = vars(show_metrics._build_parser().parse_args(argv))
+        
+        assert vars(show_metrics._parse_args(argv)) == expected
+    
+    @pytest.mark.parametrize("argv", [['--help'], [], ['AAPL', '--format', 'xml']])
+    def test_parse_args_falls_back_for_help_and_errors(self, argv, capsys):
+        """Test help and invalid arguments still go through argparse."""
+        with pytest.raises(SystemExit) as exc:
+            show_metrics._parse_args(argv)
+        
+        captured = capsys.readouterr()
+        
+        assert exc.value.code == (0 if argv == ['--help'] else 2)
+        assert 'usage: ' in captured.out + captured.err
+    
+    @pytest.mark.parametrize("size_threshold", [0, 1 << 20])
+    def test_load_metrics_mmap_and_read_paths(self, tmp_path, monkeypatch, size_threshold):
+        """Test large (mmap) and small (read) files parse to the same dict."""
+        if show_metrics.orjson is None:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(show_metrics, '_MMAP_MIN_BYTES', size_threshold)
+        
+        metrics = {'ticker': 'AAPL', 'series': [round(i * 0.01, 2) for i in range(1000)]}
+        metrics_file = tmp_path / 'AAPL.json'
+        metrics_file.write_text(json.dumps(metrics))
+        
+        assert show_metrics._load_metrics(metrics_file) == metrics
+    
+    def test_batch_mode(self, metrics_dir, monkeypatch, capsys):
+        """Test '-' reads tickers from stdin and shows each one in order."""
+        monkeypatch.setattr(sys, 'stdin', io.StringIO("AAPL\nAAPL\nMSFT\n"))
+        
+        code = run_cli(show_metrics, monkeypatch, '-', '--metrics-dir', str(metrics_dir))
+        captured = capsys.readouterr()
+        
+        assert code == 1  # MSFT has no metrics file
+        assert captured.out.count('AAPL Financial Metrics (as of 2025-08-05)') == 2
+        assert 'No metrics found for MSFT' in captured.err
+    
+    def test_batch_file_json(self, metrics_dir, tmp_path, monkeypatch, capsys):
+        """Test --batch FILE emits one JSON document per listed ticker."""
+        batch_file = tmp_path / 'tickers.txt'
+        batch_file.write_text("AAPL AAPL\n")
+        
+        code = run_cli(
+            show_metrics, monkeypatch,
+            '--batch', str(batch_file), '--metrics-dir', str(metrics_dir), '--format', 'json'
+        )
+        output = capsys.readouterr().out
+        
+        assert code == 0
+        decoder = json.JSONDecoder()
+        first, end = decoder.raw_decode(output)
+        second, _ = decoder.raw_decode(output[end:].lstrip())
+        assert first['ticker'] == second['ticker'] == 'AAPL'
@@ -5,14 +5,23 @@ Uses tiny dict fixtures where concentration ratios are easy to verify by hand.
 
 import pytest
 import math
+import numpy as np
 
 # Import concentration utilities (will be created next)
 from analysis.calculations.concentration import (
     concentration_ratios,
     herfindahl_index,
     calculate_concentration_metrics,
-    ConcentrationError
+    analyze_13f_holdings,
+    ConcentrationError,
+    _concentration_kernel,
+    concentration_ratios_arr,
+    herfindahl_index_arr,
+    calculate_concentration_metrics_arr,
+    calculate_concentration_metrics_batch,
+    CONCENTRATION_BATCH_DTYPE
 )
+from analysis.calculations import concentration
 
 
 class TestConcentrationRatios:
@@ -86,7 +95,35 @@ class TestConcentrationRatios:
         
         # CR10: (40 + 4*9)/96 = 76/96 ≈ 0.7917
         assert abs(result['cr10'] - (76.0/96.0)) < 1e-6
-    
+
+    def test_concentration_ratios_unsorted_input_matches_full_sort(self):
+        """Test that partial sort picks the same top holders as a full sort."""
+        # 50 holders inserted in scrambled order
+        values = [float((i * 37) % 50 + 1) for i in range(50)]
+        value_by_holder = {f'Holder {i}': v for i, v in enumerate(values)}
+
+        result = concentration_ratios(value_by_holder)
+
+        ranked = sorted(values, reverse=True)
+        total = sum(values)
+        assert abs(result['cr1'] - ranked[0] / total) < 1e-9
+        assert abs(result['cr5'] - sum(ranked[:5]) / total) < 1e-9
+        assert abs(result['cr10'] - sum(ranked[:10]) / total) < 1e-9
+
+    @pytest.mark.parametrize('size', [3, 64, 65, 200])
+    def test_concentration_ratios_small_and_array_paths_agree(self, size):
+        """Test the heap path (<= 64 holders) and the array path give the same ratios."""
+        rng = np.random.default_rng(size)
+        values = rng.uniform(1.0, 1e9, size)
+        value_by_holder = {f'Holder {i}': v for i, v in enumerate(values)}
+
+        result = concentration_ratios(value_by_holder)
+        expected = concentration_ratios_arr(values)
+
+        for key in ('cr1', 'cr5', 'cr10'):
+            assert type(result[key]) is float
+            assert math.isclose(result[key], expected[key], rel_tol=1e-12)
+
     def test_concentration_ratios_empty_dict(self):
         """Test with empty holders dictionary."""
         with pytest.raises(ConcentrationError, match="No holders provided"):
@@ -223,3 +260,156 @@ class TestConcentrationIntegration:
         
         # CR ratios should be monotonically increasing
         assert result['cr1'] <= result['cr5'] <= result['cr10']
+
+    def test_calculate_concentration_metrics_top_holder(self):
+        """Test top holder name and share come from the same pass as CR/HHI."""
+        value_by_holder = {'Fund A': 25.0, 'Fund B': 60.0, 'Fund C': 15.0}
+
+        result = calculate_concentration_metrics(value_by_holder)
+
+        assert result['top_holder_name'] == 'Fund B'
+        assert abs(result['top_holder_pct'] - 0.6) < 1e-9
+        assert abs(result['top_holder_pct'] - result['cr1']) < 1e-12
+
+    def test_calculate_concentration_metrics_mixed_non_positive(self):
+        """Test that any non-positive value yields null metrics."""
+        result = calculate_concentration_metrics({'Fund A': 10.0, 'Fund B': 0.0})
+
+        assert result['cr1'] is None
+        assert result['hhi'] is None
+        assert result['num_holders'] == 0
+    
+    def test_calculate_concentration_metrics_single_holder_fast_path(self):
+        """Test the singleton shortcut matches the array path and validates."""
+        result = calculate_concentration_metrics({'Fund A': 250})
+        
+        assert result == calculate_concentration_metrics_arr(np.array([250.0]), ['Fund A'])
+        assert isinstance(result['total_value'], float)
+        assert calculate_concentration_metrics({'Fund A': 0.0})['cr1'] is None
+        assert calculate_concentration_metrics({'Fund A': -5.0})['num_holders'] == 0
+
+
+class TestAnalyze13FHoldings:
+    """Tests for per-ticker 13F holdings aggregation."""
+    
+    def test_analyze_13f_holdings_sums_rows_per_filer(self):
+        """Test multiple rows from the same filer are aggregated."""
+        holdings_list = [
+            {'filer': 'Fund A', 'value_usd': 30.0},
+            {'filer': 'Fund B', 'value_usd': 40.0},
+            {'filer': 'Fund A', 'value_usd': 30.0},
+        ]
+        
+        result = analyze_13f_holdings(holdings_list)
+        
+        assert result['num_holders'] == 2
+        assert result['top_holder_name'] == 'Fund A'
+        assert abs(result['cr1'] - 0.6) < 1e-9
+    
+    def test_analyze_13f_holdings_empty_list(self):
+        """Test empty holdings return null metrics."""
+        result = analyze_13f_holdings([])
+        
+        assert result['cr1'] is None
+        assert result['num_holders'] == 0
+
+
+class TestConcentrationKernel:
+    """Tests for the single-pass (optionally JIT-compiled) kernel."""
+    
+    @pytest.mark.parametrize('size', [1, 4, 10, 11, 250])
+    def test_concentration_kernel_matches_numpy(self, size):
+        """Test the kernel's top buffer and argmax equal the NumPy selection."""
+        rng = np.random.default_rng(size)
+        values = rng.uniform(1.0, 1000.0, size)
+        values[size // 2] = values.max()  # force a tie for the top holder
+        
+        top, top_idx = _concentration_kernel(values)
+        
+        ranked = np.sort(values)
+        np.testing.assert_array_equal(top, ranked[-min(10, size):])
+        assert top_idx == int(values.argmax())
+    
+    def test_calculate_concentration_metrics_numpy_fallback(self, monkeypatch):
+        """Test the non-JIT path gives bit-identical metrics to the kernel path."""
+        rng = np.random.default_rng(7)
+        for size in (2, 5, 11, 30, 500):
+            values = rng.uniform(1.0, 1e9, size)
+            names = [f'Fund {i}' for i in range(size)]
+            
+            monkeypatch.setattr(concentration, 'NUMBA_AVAILABLE', True)
+            kernel_result = calculate_concentration_metrics_arr(values, names)
+            monkeypatch.setattr(concentration, 'NUMBA_AVAILABLE', False)
+            numpy_result = calculate_concentration_metrics_arr(values, names)
+            
+            assert numpy_result == kernel_result
+            assert kernel_result['top_holder_pct'] == kernel_result['cr1']
+    
+    def test_array_entrypoints_match_dict_api(self):
+        """Test the values-array functions give the dict functions' results."""
+        value_by_holder = {f'Fund {i}': float(i * 7 % 13 + 1) for i in range(30)}
+        values = np.array(list(value_by_holder.values()))
+        names = np.array(list(value_by_holder), dtype=object)
+        
+        assert concentration_ratios_arr(values) == concentration_ratios(value_by_holder)
+        assert herfindahl_index_arr(values) == herfindahl_index(value_by_holder)
+        assert calculate_concentration_metrics_arr(values, names) == \
+            calculate_concentration_metrics(value_by_holder)
+        assert calculate_concentration_metrics_arr(values)['top_holder_name'] is None
+    
+    def test_array_entrypoints_validate(self):
+        """Test empty and non-positive arrays raise or give null metrics."""
+        with pytest.raises(ConcentrationError, match="No holders"):
+            concentration_ratios_arr(np.array([]))
+        with pytest.raises(ConcentrationError, match="Non-positive"):
+            herfindahl_index_arr(np.array([5.0, -1.0]))
+        
+        assert calculate_concentration_metrics_arr(np.array([]))['cr1'] is None
+
+
+class TestConcentrationBatch:
+    """Tests for the 2D (tickers x holders) batch entrypoint."""
+    
+    def test_batch_matches_per_ticker_metrics(self):
+        """Test each batch row agrees with calculate_concentration_metrics_arr."""
+        rng = np.random.default_rng(3)
+        sizes = [1, 4, 10, 11, 25]
+        values = np.zeros((len(sizes), max(sizes)))
+        mask = np.zeros(values.shape, dtype=bool)
+        for row, size in enumerate(sizes):
+            values[row, :size] = rng.uniform(1.0, 1e6, size)
+            mask[row, :size] = True
+        
+        batch = calculate_concentration_metrics_batch(values, mask)
+        
+        assert batch.dtype == CONCENTRATION_BATCH_DTYPE
+        for row, size in enumerate(sizes):
+            single = calculate_concentration_metrics_arr(values[row, :size])
+            record = batch[row]
+            for key in ('cr1', 'cr5', 'cr10', 'hhi', 'total_value', 'top_holder_pct'):
+                assert math.isclose(record[key], single[key], rel_tol=1e-12)
+            assert record['num_holders'] == size
+            assert record['top_holder_idx'] == int(values[row, :size].argmax())
+    
+    def test_batch_null_rows(self):
+        """Test empty and non-positive rows get null metrics like the dict API."""
+        values = np.array([[5.0, 3.0], [0.0, 0.0], [4.0, -1.0]])
+        mask = np.array([[True, True], [False, False], [True, True]])
+        
+        batch = calculate_concentration_metrics_batch(values, mask)
+        
+        assert batch['cr1'][0] == 0.625
+        for row in (1, 2):
+            assert np.isnan(batch['cr1'][row]) and np.isnan(batch['hhi'][row])
+            assert batch['total_value'][row] == 0.0
+            assert batch['num_holders'][row] == 0
+            assert batch['top_holder_idx'][row] == -1
+    
+    def test_batch_validates_shapes(self):
+        """Test non-2D values and mismatched masks raise ConcentrationError."""
+        with pytest.raises(ConcentrationError, match="2D"):
+            calculate_concentration_metrics_batch(np.array([1.0, 2.0]))
+        with pytest.raises(ConcentrationError, match="Mask shape"):
+            calculate_concentration_metrics_batch(np.ones((2, 3)), np.ones((2, 2), dtype=bool))
+        
+        assert calculate_concentration_metrics_batch(np.empty((3, 0)))['num_holders'].tolist() == [0, 0, 0]
@@ -0,0 +1,39 @@
+"""
+Tests for shared date column helpers.
+Covers date objects, ISO strings and datetime64 columns with missing values.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from analysis.dates import latest_day, days_between
+
+
+class TestLatestDay:
+    """Tests for latest_day."""
+    
+    def test_latest_day_date_objects_and_strings(self):
+        """Test date objects and ISO strings reduce to the same datetime64[D]."""
+        as_dates = pd.Series([date(2024, 6, 30), date(2024, 9, 30), None])
+        as_strings = pd.Series(['2024-06-30', '2024-09-30', None])
+        
+        assert latest_day(as_dates) == np.datetime64('2024-09-30', 'D')
+        assert latest_day(as_strings) == np.datetime64('2024-09-30', 'D')
+    
+    def test_latest_day_all_missing(self):
+        """Test a column without usable dates gives None."""
+        assert latest_day(pd.Series([pd.NaT, pd.NaT])) is None
+
+
+class TestDaysBetween:
+    """Tests for days_between."""
+    
+    def test_days_between_is_signed_int(self):
+        """Test whole-day differences come back as Python ints, signed."""
+        start = np.datetime64('2025-08-01', 'D')
+        end = np.datetime64('2025-08-11', 'D')
+        
+        assert days_between(start, end) == 10
+        assert days_between(end, start) == -10
+        assert type(days_between(start, end)) is int
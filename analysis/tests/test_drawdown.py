@@ -11,8 +11,17 @@ from datetime import date, timedelta
 from analysis.calculations.drawdown import (
     drawdown_stats,
     rolling_drawdown,
-    DrawdownError
+    rolling_drawdown_array,
+    rolling_drawdown_iter,
+    ROLLING_DRAWDOWN_DTYPE,
+    DrawdownError,
+    _drawdown_kernel,
+    _drawdown_numpy,
+    _sparse_max_table,
+    _first_above,
+    _drawdown_stats_arr
 )
+from analysis.calculations import drawdown
 
 
 class TestDrawdownStats:
@@ -118,6 +127,17 @@ class TestDrawdownStats:
         with pytest.raises(DrawdownError, match="Prices and dates.*same length"):
             drawdown_stats(prices, dates)
     
+    def test_drawdown_stats_day_counts_are_plain_ints(self):
+        """Test peak/trough/recovery offsets come back as Python ints."""
+        prices = [100.0, 120.0, 120.0, 90.0, 121.0]
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(5)]
+        
+        result = drawdown_stats(prices, dates)
+        
+        assert result['peak_date'] == dates[1]  # first of the tied peaks
+        assert type(result['drawdown_days']) is int and result['drawdown_days'] == 2
+        assert type(result['recovery_days']) is int and result['recovery_days'] == 1
+    
     def test_drawdown_stats_invalid_prices(self):
         """Test with invalid prices."""
         prices = [100.0, 0.0, 110.0]  # Zero price
@@ -319,6 +339,105 @@ class TestRollingDrawdown:
         # Should be same as drawdown_stats for full series
         full_stats = drawdown_stats(prices, dates)
         assert abs(rolling_dd[0]['max_drawdown_pct'] - full_stats['max_drawdown_pct']) < 1e-6
+    
+    @pytest.mark.parametrize('use_numba', [True, False])
+    @pytest.mark.parametrize('series', ['random_walk', 'repeated_levels', 'constant'])
+    @pytest.mark.parametrize('window', [2, 5, 21])
+    def test_rolling_drawdown_matches_per_window_stats(
+        self, series, window, use_numba, monkeypatch
+    ):
+        """Test kernel and sliding-pass windows equal drawdown_stats on each slice."""
+        monkeypatch.setattr(drawdown, 'NUMBA_AVAILABLE', use_numba and drawdown.NUMBA_AVAILABLE)
+        rng = np.random.default_rng(window)
+        if series == 'random_walk':
+            prices = list(100 * np.exp(np.cumsum(rng.normal(0, 0.03, 60))))
+        elif series == 'repeated_levels':
+            prices = [float(p) for p in rng.integers(1, 6, 60)]
+        else:
+            prices = [100.0] * 60
+        dates = [date(2025, 1, 1) + timedelta(days=i) for i in range(60)]
+        
+        rolling_dd = rolling_drawdown(prices, dates, window=window)
+        
+        expected = [
+            drawdown_stats(prices[i - window + 1:i + 1], dates[i - window + 1:i + 1])
+            for i in range(window - 1, len(prices))
+        ]
+        assert rolling_dd == expected
+    
+    def test_rolling_drawdown_array_matches_dicts(self):
+        """Test structured-array output carries the same numbers as the dict view."""
+        prices = [100.0, 120.0, 90.0, 110.0, 80.0, 100.0, 130.0, 95.0]
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(8)]
+        
+        windows = rolling_drawdown_array(prices, window=4)
+        rolling_dd = rolling_drawdown(prices, dates, window=4)
+        
+        assert windows.dtype == ROLLING_DRAWDOWN_DTYPE
+        assert len(windows) == len(rolling_dd) == 5
+        for record, stats in zip(windows, rolling_dd):
+            assert record['max_drawdown_pct'] == stats['max_drawdown_pct']
+            assert dates[record['peak_idx']] == stats['peak_date']
+            assert dates[record['trough_idx']] == stats['trough_date']
+            assert record['drawdown_days'] == stats['drawdown_days']
+            if stats['recovery_date'] is None:
+                assert record['recovery_idx'] == -1 and record['recovery_days'] == -1
+            else:
+                assert dates[record['recovery_idx']] == stats['recovery_date']
+                assert record['recovery_days'] == stats['recovery_days']
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_rolling_drawdown_iter_streams_same_results(self, monkeypatch, use_numba):
+        """Test the generator yields exactly the rolling_drawdown entries."""
+        monkeypatch.setattr(drawdown, "NUMBA_AVAILABLE", use_numba)
+        prices = [100.0, 120.0, 90.0, 110.0, 80.0, 100.0, 130.0, 95.0]
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(8)]
+        
+        stream = rolling_drawdown_iter(prices, dates, window=4)
+        
+        assert iter(stream) is stream
+        assert list(stream) == rolling_drawdown(prices, dates, window=4)
+    
+    @pytest.mark.skipif(not drawdown.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_rolling_drawdown_iter_kernel_path_keeps_columns_compact(self):
+        """Test the numba path holds NumPy columns, not Python lists of every window."""
+        import tracemalloc
+        n = 100_000
+        prices = (100.0 + np.sin(np.arange(n) / 50.0) * 10.0).tolist()
+        dates = [date(2025, 1, 1)] * n
+        rolling_drawdown_iter(prices[:10], dates[:10], window=5)  # compile outside the trace
+        
+        tracemalloc.start()
+        try:
+            first = next(rolling_drawdown_iter(prices, dates, window=5))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert first == rolling_drawdown(prices[:5], dates[:5], window=5)[0]
+        # Columns plus the float64 input are ~40 bytes/price; per-window
+        # Python lists would be several times that
+        assert peak < n * 64
+    
+    def test_rolling_drawdown_iter_validates_eagerly(self):
+        """Test invalid input raises at call time, not on first next()."""
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(3)]
+        
+        with pytest.raises(DrawdownError, match="Zero or negative"):
+            rolling_drawdown_iter([100.0, 0.0, 110.0], dates, window=2)
+        
+        with pytest.raises(DrawdownError, match="Insufficient data"):
+            rolling_drawdown_iter([100.0, 110.0, 105.0], dates, window=5)
+    
+    def test_rolling_drawdown_invalid_prices(self):
+        """Test rolling drawdown rejects non-positive prices and 1-price windows."""
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(4)]
+        
+        with pytest.raises(DrawdownError, match="Zero or negative prices"):
+            rolling_drawdown([100.0, 0.0, 90.0, 110.0], dates, window=2)
+        
+        with pytest.raises(DrawdownError, match="Insufficient data"):
+            rolling_drawdown([100.0, 120.0, 90.0, 110.0], dates, window=1)
 
 
 class TestDrawdownEdgeCases:
@@ -377,3 +496,59 @@ class TestDrawdownEdgeCases:
         assert result['recovery_date'] == dates[0]
         assert result['drawdown_days'] == 0
         assert result['recovery_days'] == 0
+
+
+class TestDrawdownKernel:
+    """Tests for the single-pass (optionally JIT-compiled) drawdown kernel."""
+    
+    @pytest.mark.parametrize('series', ['random_walk', 'repeated_levels', 'rising'])
+    def test_drawdown_kernel_matches_numpy(self, series):
+        """Test kernel indices equal the NumPy multi-pass version, ties included."""
+        rng = np.random.default_rng(42)
+        if series == 'random_walk':
+            prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, 500)))
+        elif series == 'repeated_levels':
+            prices = rng.integers(1, 6, 500).astype(np.float64)
+        else:
+            prices = np.linspace(100.0, 200.0, 500)
+        
+        assert tuple(_drawdown_kernel(prices)) == tuple(_drawdown_numpy(prices))
+    
+    def test_drawdown_stats_numpy_fallback(self, monkeypatch):
+        """Test drawdown_stats gives the same result without numba."""
+        prices = [100.0, 110.0, 120.0, 110.0, 90.0, 100.0, 115.0, 125.0]
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(8)]
+        
+        kernel_result = drawdown_stats(prices, dates)
+        monkeypatch.setattr(drawdown, 'NUMBA_AVAILABLE', False)
+        numpy_result = drawdown_stats(prices, dates)
+        
+        assert numpy_result == kernel_result
+    
+    def test_first_above_matches_linear_scan(self):
+        """Test sparse-table recovery search equals a brute-force scan."""
+        rng = np.random.default_rng(3)
+        prices = rng.integers(1, 10, 64).astype(np.float64)
+        table = _sparse_max_table(prices)
+        
+        for lo in range(0, 64, 3):
+            for hi in range(lo, 64, 5):
+                for value in (0.0, 4.0, 8.0, 9.0):
+                    hits = [i for i in range(lo, hi + 1) if prices[i] > value]
+                    assert _first_above(table, lo, hi, value) == (hits[0] if hits else -1)
+    
+    def test_drawdown_stats_arr_matches_public_api(self):
+        """Test the array entry point matches the public API."""
+        prices = np.array([100.0, 120.0, 90.0, 110.0, 125.0, 80.0])
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(6)]
+        
+        assert _drawdown_stats_arr(prices, dates) == drawdown_stats(list(prices), dates)
+    
+    @pytest.mark.skipif(not __debug__, reason="asserts are stripped under python -O")
+    def test_drawdown_stats_arr_asserts_float64_contiguous(self):
+        """Test the debug-only layout check rejects a strided buffer."""
+        prices = np.array([100.0, 120.0, 90.0, 110.0, 125.0, 80.0])
+        dates = [date(2025, 8, 1) + timedelta(days=i) for i in range(6)]
+        
+        with pytest.raises(AssertionError):
+            _drawdown_stats_arr(prices[::2], dates[::2])
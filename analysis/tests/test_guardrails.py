@@ -14,9 +14,14 @@ from analysis.guardrails import (
     check_data_freshness,
     validate_price_data_integrity,
     run_all_guardrails,
+    summarize_prices,
+    create_data_quality_report,
     DataQualityError,
-    DataQualityWarning
+    DataQualityWarning,
+    _integrity_kernel,
+    _integrity_numpy
 )
+from analysis import guardrails
 
 
 class TestDataSufficiency:
@@ -67,6 +72,22 @@ class TestDataSufficiency:
         assert '1W' in available  
         assert '1M' in available
         assert '3M' in insufficient
+    
+    def test_window_partition_keeps_requested_order(self):
+        """Test both lists follow request order and unknown windows count as available."""
+        price_df = pd.DataFrame({
+            'ticker': ['AAPL'] * 30,
+            'date': [date(2024, 1, 1) + timedelta(days=i) for i in range(30)],
+            'close': [100.0] * 30
+        })
+        
+        with pytest.warns(DataQualityWarning, match="Limited data for 6M"):
+            available, insufficient = validate_sufficient_data_for_metrics(
+                price_df, ['3M', '1M', 'YTD', '6M', '1D']
+            )
+        
+        assert available == ['1M', 'YTD', '1D']
+        assert insufficient == ['3M', '6M']
 
 
 class TestConflictDetection:
@@ -93,6 +114,24 @@ class TestConflictDetection:
         conflicts = detect_conflicting_13f_rows(holdings_df)
         assert len(conflicts) == 0  # Under 10% threshold
     
+    def test_conflict_details(self):
+        """Test conflict entries carry the group key, raw values and spread."""
+        holdings_df = pd.DataFrame([
+            {'cik': f'{i:03d}', 'cusip': f'{i:09d}', 'as_of': date(2024, 9, 30), 'value_usd': 1000000, 'shares': 1000}
+            for i in range(40)
+        ] + [
+            {'cik': '001', 'cusip': '000000001', 'as_of': date(2024, 9, 30), 'value_usd': 1500000, 'shares': 1500},
+            {'cik': '002', 'cusip': '000000002', 'as_of': date(2024, 9, 30), 'value_usd': 1050000, 'shares': 1050}
+        ])
+        
+        conflicts = detect_conflicting_13f_rows(holdings_df)
+        
+        assert len(conflicts) == 1  # 002 is under the 10% threshold
+        conflict = conflicts[0]
+        assert (conflict['cik'], conflict['cusip'], conflict['as_of']) == ('001', '000000001', date(2024, 9, 30))
+        assert conflict['values'] == [1000000, 1500000]
+        assert conflict['variance_pct'] == pytest.approx(500000 / 1250000 * 100)
+    
     def test_major_conflicts_critical(self):
         """Test with major conflicts that should trigger error."""
         # Create many conflicting rows (>5% of total)
@@ -162,6 +201,30 @@ class TestNumericValidation:
         with pytest.raises(DataQualityError, match="Unrealistic percentage"):
             validate_numeric_inputs(metrics)
 
+    
+    def test_concentration_out_of_bounds_error(self):
+        """Test that concentration ratios outside [0, 1] trigger error."""
+        metrics = {
+            'price_metrics': {'returns': {'1D': 0.01}},
+            'institutional_metrics': {'concentration': {'cr1': 0.4, 'cr5': 1.2}}
+        }
+        
+        with pytest.raises(DataQualityError, match="Concentration ratio cr5 out of bounds: 1.2"):
+            validate_numeric_inputs(metrics)
+    
+    def test_error_names_first_offending_path(self):
+        """Test the reported path follows check order when several values fail."""
+        metrics = {
+            'price_metrics': {
+                'returns': {'1D': 0.01, '1M': 12.0},
+                'volatility': {'21D_annualized': float('nan')},
+                'drawdown': {'max_drawdown_pct': None}
+            }
+        }
+        
+        with pytest.raises(DataQualityError, match=r"Unrealistic percentage in returns\.1M"):
+            validate_numeric_inputs(metrics)
+
 
 class TestDataFreshness:
     """Tests for data freshness checking."""
@@ -205,6 +268,48 @@ class TestDataFreshness:
         assert len(warnings) == 1
         assert '13F data is 200 days old' in warnings[0]
 
+    
+    def test_freshness_uses_price_summary(self):
+        """Test a precomputed summary supplies the latest price date."""
+        today = date.today()
+        price_df = pd.DataFrame({
+            'date': [today - timedelta(days=30), today - timedelta(days=20)],
+            'open': [100.0, 101.0],
+            'high': [101.0, 102.0],
+            'low': [99.0, 100.0],
+            'close': [100.5, 101.5],
+            'volume': [1000, 1000]
+        })
+        
+        summary = summarize_prices(price_df)
+        warnings = check_data_freshness(price_df, None, price_summary=summary)
+        
+        assert summary.latest_date == today - timedelta(days=20)
+        assert summary.closes.tolist() == [100.5, 101.5]
+        assert summary.volumes.dtype == np.float64
+        assert not hasattr(summary, '__dict__')
+        assert len(warnings) == 1 and 'Price data is 20 days old' in warnings[0]
+
+    
+    def test_freshness_day_arithmetic_ignores_time_and_missing(self):
+        """Test ages count calendar days from the latest non-missing date."""
+        today = date.today()
+        price_df = pd.DataFrame({
+            'date': pd.to_datetime([
+                datetime.combine(today - timedelta(days=12), datetime.min.time()),
+                datetime.combine(today - timedelta(days=10), datetime.max.time()),
+                None
+            ])
+        })
+        holdings_df = pd.DataFrame({'as_of': [(today - timedelta(days=200)).isoformat(), None]})
+        
+        warnings = check_data_freshness(price_df, holdings_df)
+        
+        assert warnings[0].startswith(
+            f"Price data is 10 days old (latest: {(today - timedelta(days=10)).isoformat()})"
+        )
+        assert warnings[1].startswith("13F data is 200 days old")
+
 
 class TestPriceIntegrity:
     """Tests for price data integrity validation."""
@@ -259,3 +364,145 @@ class TestPriceIntegrity:
         warnings = validate_price_data_integrity(price_df)
         assert len(warnings) == 1
         assert 'Price logic violations' in warnings[0]
+    
+    def test_vectorized_checks_full_ohlcv(self):
+        """Test moves, zero volume and OHLC violations on a complete frame."""
+        price_df = pd.DataFrame({
+            'date': [date(2025, 8, 1), date(2025, 8, 4), date(2025, 8, 5), date(2025, 8, 6)],
+            'open': [100.0, 101.0, 130.0, 128.0],
+            'high': [102.0, 103.0, 131.0, 127.0],  # Day 4: high < open
+            'low': [99.0, 100.0, 125.0, 126.0],
+            'close': [101.0, 102.0, 130.0, 126.5],  # Day 3: +27.5%
+            'volume': [1000000, 0, 1500000, 0]
+        })
+        
+        warnings = validate_price_data_integrity(price_df)
+        
+        assert warnings == [
+            "Large price movement on 2025-08-05: 27.5% change ($102.00 → $130.00)",
+            f"Zero volume detected on 2 days: {[date(2025, 8, 4), date(2025, 8, 6)]}",
+            "Price logic violations found on 1 days"
+        ]
+    
+    def test_integrity_kernel_matches_numpy(self):
+        """Test the fused kernel flags the same rows as the NumPy path."""
+        rng = np.random.default_rng(11)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.12, 300)))
+        opens = closes * (1 + rng.normal(0, 0.01, 300))
+        highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.01, 300)))
+        lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.01, 300)))
+        highs[[5, 40]] = lows[[5, 40]] - 1.0  # OHLC violations
+        opens[77] = np.nan
+        volumes = rng.integers(0, 3, 300).astype(np.float64)
+        
+        kernel = _integrity_kernel(opens, highs, lows, closes, volumes)
+        vectorized = _integrity_numpy(opens, highs, lows, closes, volumes)
+        
+        assert len(kernel[0]) > 0
+        np.testing.assert_array_equal(kernel[0], vectorized[0])
+        np.testing.assert_array_equal(kernel[1], vectorized[1])
+        assert kernel[2] == vectorized[2] >= 2
+    
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_integrity_warnings_same_for_both_paths(self, monkeypatch, use_numba):
+        """Test warnings do not depend on which scan implementation runs."""
+        monkeypatch.setattr(guardrails, 'NUMBA_AVAILABLE', use_numba)
+        price_df = pd.DataFrame({
+            'date': [date(2025, 8, 1), date(2025, 8, 4), date(2025, 8, 5)],
+            'open': [100.0, 101.0, 130.0],
+            'high': [102.0, 100.5, 131.0],
+            'low': [99.0, 100.0, 125.0],
+            'close': [101.0, 102.0, 130.0],
+            'volume': [1000000, 0, 1500000]
+        })
+        
+        assert validate_price_data_integrity(price_df) == [
+            "Large price movement on 2025-08-05: 27.5% change ($102.00 → $130.00)",
+            f"Zero volume detected on 1 days: {[date(2025, 8, 4)]}",
+            "Price logic violations found on 1 days"
+        ]
+
+
+class TestRunAllGuardrails:
+    """Tests for the combined guardrail run."""
+    
+    def _price_df(self, days=30):
+        start = date(2025, 8, 1)
+        return pd.DataFrame({
+            'date': [start + timedelta(days=i) for i in range(days)],
+            'open': [100.0] * days,
+            'high': [101.0] * days,
+            'low': [99.0] * days,
+            'close': [100.0] * days,
+            'volume': [1000000] * days
+        })
+    
+    def test_repeat_call_revalidates_mutated_metrics(self):
+        """Test a second call on the same objects re-runs numeric validation."""
+        price_df = self._price_df()
+        metrics = {'price_metrics': {'returns': {'1D': 0.0}}}
+        
+        first = run_all_guardrails('TEST', price_df, None, metrics, ['1D', '1W'])
+        assert first['data_quality_checks']['numeric_validation'] == 'passed'
+        
+        metrics['price_metrics']['returns']['1D'] = float('nan')
+        with pytest.raises(DataQualityError, match="NaN value"):
+            run_all_guardrails('TEST', price_df, None, metrics, ['1D', '1W'])
+    
+    def test_repeat_call_reemits_data_warnings(self):
+        """Test limited-history warnings fire on every call, not only the first."""
+        price_df = self._price_df(days=60)
+        metrics = {'price_metrics': {'returns': {'1D': 0.0}}}
+        
+        for _ in range(2):
+            with pytest.warns(DataQualityWarning, match="Limited data for 6M"):
+                run_all_guardrails('TEST', price_df, None, metrics, ['1D', '6M'])
+
+
+class TestDataQualityReport:
+    """Tests for the text data quality report."""
+    
+    def test_report_layout(self):
+        """Test sections appear in order, each followed by a blank line."""
+        results = {
+            'ticker': 'AAPL',
+            'timestamp': '2025-08-07',
+            'data_quality_checks': {
+                'sufficient_data': {'available_windows': ['1D', '1W'], 'insufficient_windows': ['1Y']}
+            },
+            'errors': [],
+            'warnings': ['Stale data'],
+            'recommendations': ['Collect more data']
+        }
+        
+        assert create_data_quality_report(results) == "\n".join([
+            "📊 Data Quality Report for AAPL",
+            "Generated: 2025-08-07",
+            "=" * 50,
+            "",
+            "⚠️  WARNINGS:",
+            "   • Stale data",
+            "",
+            "📈 METRIC AVAILABILITY:",
+            "   ✅ Available: 1D, 1W",
+            "   ❌ Insufficient data: 1Y",
+            "",
+            "💡 RECOMMENDATIONS:",
+            "   • Collect more data",
+            "",
+            "⚠️  OVERALL STATUS: WARNINGS PRESENT",
+            "   Proceed with caution and note limitations."
+        ])
+    
+    def test_report_clean_run(self):
+        """Test a report with nothing to flag is header plus status."""
+        results = {
+            'ticker': 'MSFT',
+            'timestamp': '2025-08-07',
+            'data_quality_checks': {'sufficient_data': None}
+        }
+        
+        assert create_data_quality_report(results).endswith(
+            "=" * 50 + "\n\n✅ OVERALL STATUS: DATA QUALITY ACCEPTABLE\n   Safe to proceed with analysis."
+        )
+
@@ -6,13 +6,19 @@ Uses AAPL fixture + tiny 13F fixture; asserts combined JSON matches golden.
 import pytest
 import pandas as pd
 import json
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 # Import aggregator (will be created next)
 from analysis.metrics_aggregator import (
     compose_metrics,
-    MetricsAggregatorError
+    MetricsAggregatorError,
+    group_prices_by_ticker,
+    _calculate_price_metrics,
+    _calculate_institutional_metrics,
+    _date_span_days,
+    _calculate_data_quality_metrics,
+    _determine_data_sources
 )
 
 
@@ -137,6 +143,70 @@ class TestMetricsAggregator:
         volatility = result['price_metrics']['volatility']
         assert volatility['21D_annualized'] is None  # Not enough data
     
+    def test_compose_metrics_string_dates(self):
+        """Test ISO date strings are parsed and unsorted rows are ordered."""
+        price_df = pd.DataFrame({
+            'ticker': ['TEST'] * 3 + ['OTHER'],
+            'date': ['2025-08-04', '2025-08-01', '2025-08-05', '2025-08-01'],
+            'close': [102.0, 100.0, 99.0, 50.0],
+            'volume': [1000000] * 4
+        })
+        
+        result = compose_metrics(
+            price_df=price_df,
+            holdings_df=None,
+            ticker='TEST',
+            as_of_date=date(2025, 8, 5)
+        )
+        
+        assert result['data_period'] == {
+            'start_date': '2025-08-01',
+            'end_date': '2025-08-05',
+            'trading_days': 3
+        }
+        current_price = result['price_metrics']['current_price']
+        assert current_price == {'close': 99.0, 'date': '2025-08-05'}
+        assert type(current_price['close']) is float
+        assert result['price_metrics']['returns']['1D'] == pytest.approx(99.0 / 102.0 - 1)
+    
+    def test_compose_metrics_pre_grouped_matches_mask(self):
+        """Test prices_by_ticker gives the same metrics as filtering price_df."""
+        price_df = pd.DataFrame({
+            'ticker': ['AAA', 'BBB', 'AAA', 'BBB', 'AAA', 'BBB'],
+            'date': [date(2025, 8, 5), date(2025, 8, 1), date(2025, 8, 1),
+                     date(2025, 8, 4), date(2025, 8, 4), date(2025, 8, 5)],
+            'close': [103.0, 50.0, 100.0, 52.0, 101.0, 49.0],
+            'volume': [1000000] * 6
+        })
+        prices_by_ticker = group_prices_by_ticker(price_df)
+        
+        assert set(prices_by_ticker) == {'AAA', 'BBB'}
+        for ticker in ('AAA', 'BBB'):
+            grouped = compose_metrics(price_df, None, ticker, date(2025, 8, 5), prices_by_ticker)
+            masked = compose_metrics(price_df, None, ticker, date(2025, 8, 5))
+            
+            for section in ('data_period', 'price_metrics', 'data_quality'):
+                assert grouped[section] == masked[section]
+        
+        with pytest.raises(MetricsAggregatorError, match="Ticker CCC not found"):
+            compose_metrics(price_df, None, 'CCC', date(2025, 8, 5), prices_by_ticker)
+    
+    def test_compose_metrics_sorted_input_not_resorted(self, monkeypatch):
+        """Test date-ordered rows skip the sort and keep their original index."""
+        price_df = pd.DataFrame({
+            'ticker': ['OTHER', 'TEST', 'OTHER', 'TEST', 'TEST'],
+            'date': [date(2025, 8, 1), date(2025, 8, 1), date(2025, 8, 4),
+                     date(2025, 8, 4), date(2025, 8, 5)],
+            'close': [50.0, 100.0, 51.0, 102.0, 99.0],
+            'volume': [1000000] * 5
+        })
+        monkeypatch.setattr(pd.DataFrame, 'sort_values', lambda *a, **k: pytest.fail("sorted"))
+        
+        result = compose_metrics(price_df, None, 'TEST', date(2025, 8, 5))
+        
+        assert result['data_period']['start_date'] == '2025-08-01'
+        assert result['price_metrics']['current_price'] == {'close': 99.0, 'date': '2025-08-05'}
+    
     def test_compose_metrics_empty_price_data(self):
         """Test with empty price DataFrame."""
         empty_df = pd.DataFrame(columns=['ticker', 'date', 'close'])
@@ -240,3 +310,86 @@ class TestMetricsAggregator:
         # Total value should match fixture
         assert inst_metrics['total_13f_value_usd'] == 100000000000.0  # 100B
         assert inst_metrics['total_13f_holders'] == 3
+
+
+class TestPriceMetrics:
+    """Tests for the price_metrics section helper."""
+    
+    def test_price_metrics_accepts_list_or_array(self):
+        """Test list and float64 array closes give the same section."""
+        import numpy as np
+        dates = [date(2025, 6, 2) + timedelta(days=i) for i in range(30)]
+        prices = [100.0 + i * 0.5 + (i % 3) for i in range(30)]
+        
+        from_list = _calculate_price_metrics(prices, dates)
+        
+        assert from_list == _calculate_price_metrics(np.array(prices), np.array(dates, dtype=object))
+        assert type(from_list['current_price']['close']) is float
+        assert from_list['returns']['1D'] is not None
+
+
+class TestInstitutionalMetrics:
+    """Tests for the 13F institutional section."""
+    
+    def test_top_holders_ranked_with_ties_in_row_order(self):
+        """Test top 10 by value, stable on ties, with share of total."""
+        holdings_df = pd.DataFrame({
+            'filer': [f'Fund {i}' for i in range(12)],
+            'value_usd': [10.0, 50.0, 30.0, 50.0, 5.0, 20.0, 1.0, 2.0, 3.0, 4.0, 6.0, 7.0],
+            'shares': [1.0] * 12,
+            'as_of': ['2025-06-30'] * 12
+        })
+        
+        result = _calculate_institutional_metrics(holdings_df)
+        top_holders = result['top_holders']
+        
+        assert [h['filer'] for h in top_holders[:4]] == ['Fund 1', 'Fund 3', 'Fund 2', 'Fund 5']
+        assert [h['rank'] for h in top_holders] == list(range(1, 11))
+        assert top_holders[0] == {
+            'rank': 1, 'filer': 'Fund 1', 'value_usd': 50.0, 'shares': 1.0,
+            'pct_of_13f_total': 50.0 / 188.0
+        }
+        assert result['quarter_end'] == '2025-06-30'
+        assert result == _calculate_institutional_metrics(holdings_df.to_dict('records'))
+
+
+class TestDataQualityMetrics:
+    """Tests for price coverage helpers."""
+    
+    @pytest.mark.parametrize("dates", [
+        [date(2025, 1, 3), date(2025, 1, 1), date(2025, 3, 2)],
+        ['2025-01-03', '2025-01-01', '2025-03-02'],
+        pd.to_datetime(['2025-01-03', '2025-01-01', '2025-03-02'])
+    ])
+    def test_date_span_days_any_date_column(self, dates, monkeypatch):
+        """Test the span is the same for date objects, strings and datetime64."""
+        series = pd.Series(dates)
+        if not isinstance(dates[0], str):
+            # Already-typed columns are not re-parsed
+            monkeypatch.setattr(pd, 'to_datetime', lambda *a, **k: pytest.fail("re-parsed"))
+        
+        assert _date_span_days(series) == 60
+    
+    def test_13f_quarter_and_age(self):
+        """Test latest quarter and its age come from the given 13F rows."""
+        price_df = pd.DataFrame({'date': [date(2025, 8, 1), date(2025, 8, 4)]})
+        quarter = date.today() - timedelta(days=45)
+        holdings_df = pd.DataFrame({
+            'ticker': ['TEST', 'TEST', 'OTHER'],
+            'as_of': [quarter - timedelta(days=91), quarter, date.today()]
+        })
+        
+        result = _calculate_data_quality_metrics(price_df, holdings_df[holdings_df['ticker'] == 'TEST'])
+        
+        assert result['latest_13f_quarter'] == quarter.isoformat()
+        assert result['13f_data_age_days'] == 45
+        assert type(result['13f_data_age_days']) is int  # show_metrics prints it as-is
+    
+    def test_data_sources_deduplicated_across_frames(self):
+        """Test sources from prices and holdings are merged once each, in order."""
+        price_df = pd.DataFrame({'source': pd.Categorical(['stooq', 'yahoo', 'stooq'])})
+        holdings_df = pd.DataFrame({'source': ['sec_13f', 'yahoo']})
+        
+        assert _determine_data_sources(price_df, holdings_df) == ['stooq', 'yahoo', 'sec_13f']
+        assert _determine_data_sources(price_df.drop(columns='source'), None) == []
+
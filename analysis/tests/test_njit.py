@@ -0,0 +1,56 @@
+"""
+Tests for the optional, lazily imported numba decorator.
+Checks import cost stays off the CLI path and kernels compile on first call.
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from analysis.calculations import _njit, drawdown
+
+
+class TestLazyNjit:
+    """Tests for njit deferring numba until a kernel runs."""
+    
+    def test_importing_analysis_does_not_import_numba(self):
+        """Test the analysis job and calculation modules load without numba."""
+        code = (
+            "import sys, analysis.analysis_job, analysis.guardrails; "
+            "print('numba' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        )
+        
+        assert result.stdout.strip() == 'False'
+    
+    @pytest.mark.skipif(not _njit.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_kernel_compiles_with_numba_prange_and_callees(self):
+        """Test the built dispatcher sees numba.prange and compiled callee kernels."""
+        import numba
+        
+        dispatcher = drawdown._rolling_drawdown_kernel.dispatcher()
+        namespace = dispatcher.py_func.__globals__
+        
+        assert namespace['prange'] is numba.prange
+        assert namespace['_drawdown_kernel'] is drawdown._drawdown_kernel.dispatcher()
+        assert dispatcher.targetoptions['parallel'] is True
+        
+        max_dd, peak, trough, recovery = drawdown._rolling_drawdown_kernel(
+            np.array([100.0, 120.0, 90.0, 130.0]), 3
+        )
+        assert max_dd.tolist() == [-0.25, -0.25]
+    
+    def test_without_numba_decorator_is_identity(self, monkeypatch):
+        """Test both decorator forms return the plain function when numba is absent."""
+        monkeypatch.setattr(_njit, 'NUMBA_AVAILABLE', False)
+        
+        def kernel(x):
+            return x + 1
+        
+        assert _njit.njit(kernel) is kernel
+        assert _njit.njit(cache=True)(kernel) is kernel
+        assert list(_njit.prange(3)) == [0, 1, 2]
@@ -0,0 +1,83 @@
+"""
+Tests for the Parquet metrics sink.
+Round-trips small MetricsJSON dicts through a temp dataset.
+"""
+
+from analysis.sinks.parquet_sink import (
+    flatten_metrics,
+    append_metrics,
+    read_metrics
+)
+
+
+def make_metrics(ticker, as_of_date, cr1=None):
+    """Build a minimal MetricsJSON dictionary."""
+    return {
+        'ticker': ticker,
+        'as_of_date': as_of_date,
+        'price_metrics': {
+            'returns': {'1D': 0.01, '1M': None},
+            'volatility': {'21D_annualized': 0.25},
+            'drawdown': {'max_drawdown_pct': -0.1},
+            'current_price': {'close': 100.0, 'date': as_of_date}
+        },
+        'institutional_metrics': {
+            'total_13f_value_usd': 5e9,
+            'concentration': {'cr1': cr1, 'cr5': None, 'cr10': None, 'hhi': None}
+        } if cr1 is not None else None
+    }
+
+
+class TestParquetSink:
+    """Tests for flatten/append/read of metrics rows."""
+    
+    def test_flatten_metrics_missing_sections_are_none(self):
+        """Test missing institutional metrics flatten to None columns."""
+        row = flatten_metrics(make_metrics('AAPL', '2025-08-05'))
+        
+        assert row['ticker'] == 'AAPL'
+        assert row['returns_1d'] == 0.01
+        assert row['returns_1m'] is None
+        assert row['vol_21d_annualized'] == 0.25
+        assert row['cr1'] is None
+        assert row['total_13f_value_usd'] is None
+    
+    def test_append_metrics_partitions_by_as_of_date(self, tmp_path):
+        """Test rows for different tickers/dates accumulate and reads filter by partition."""
+        append_metrics(tmp_path, [make_metrics('AAPL', '2025-08-05', cr1=0.6)])
+        append_metrics(tmp_path, [
+            make_metrics('MSFT', '2025-08-05', cr1=0.4),
+            make_metrics('AAPL', '2025-08-06', cr1=0.5)
+        ])
+        
+        table = read_metrics(tmp_path, as_of_date='2025-08-05', columns=['ticker', 'cr1'])
+        rows = sorted(table.to_pylist(), key=lambda r: r['ticker'])
+        
+        assert rows == [{'ticker': 'AAPL', 'cr1': 0.6}, {'ticker': 'MSFT', 'cr1': 0.4}]
+        assert read_metrics(tmp_path).num_rows == 3
+    
+    def test_append_metrics_rerun_replaces_row(self, tmp_path):
+        """Test writing the same ticker and date twice keeps exactly one row."""
+        append_metrics(tmp_path, [make_metrics('AAPL', '2025-08-05', cr1=0.6)])
+        append_metrics(tmp_path, [make_metrics('MSFT', '2025-08-05', cr1=0.4)])
+        append_metrics(tmp_path, [make_metrics('AAPL', '2025-08-05', cr1=0.7)])
+        
+        table = read_metrics(tmp_path, as_of_date='2025-08-05', columns=['ticker', 'cr1'])
+        rows = sorted(table.to_pylist(), key=lambda r: r['ticker'])
+        
+        assert rows == [{'ticker': 'AAPL', 'cr1': 0.7}, {'ticker': 'MSFT', 'cr1': 0.4}]
+    
+    def test_append_metrics_duplicate_in_one_call_keeps_last(self, tmp_path):
+        """Test duplicate (as_of_date, ticker) pairs in one call collapse to the last."""
+        written = append_metrics(tmp_path, [
+            make_metrics('AAPL', '2025-08-05', cr1=0.6),
+            make_metrics('AAPL', '2025-08-05', cr1=0.7)
+        ])
+        
+        assert written == 1
+        assert read_metrics(tmp_path, columns=['cr1']).to_pylist() == [{'cr1': 0.7}]
+    
+    def test_append_metrics_empty_list_writes_nothing(self, tmp_path):
+        """Test empty input is a no-op."""
+        assert append_metrics(tmp_path / 'metrics', []) == 0
+        assert not (tmp_path / 'metrics').exists()
@@ -13,7 +13,9 @@ from analysis.calculations.returns import (
     window_ends,
     simple_returns,
     simple_returns_vectorized,
-    ReturnsError
+    calculate_period_returns,
+    ReturnsError,
+    _window_ends_counts
 )
 
 
@@ -85,6 +87,35 @@ class TestWindowEnds:
         # All should be calculable
         assert result['1D'] == 299  # 300 - 1
         assert result['252D'] == 48  # 300 - 252 = 48
+    
+    def test_calculate_period_returns_matches_simple_returns(self):
+        """Test batched windows equal per-window simple_returns exactly."""
+        prices = list(100 * np.exp(np.cumsum(np.random.default_rng(2).normal(0, 0.02, 80))))
+        trading_dates = [date(2024, 1, 1)] * 80
+        
+        result = calculate_period_returns(prices, trading_dates, [1, 5, 21, 63, 126])
+        
+        for window in (1, 5, 21, 63):
+            assert result[f"{window}D"] == simple_returns(prices, window)
+        assert result['126D'] is None
+    
+    def test_calculate_period_returns_invalid_prices_all_none(self):
+        """Test a non-positive price nulls every window."""
+        result = calculate_period_returns([100.0, 0.0, 105.0], [date(2024, 1, 1)] * 3, [1, 2])
+        
+        assert result == {'1D': None, '2D': None}
+    
+    def test_window_ends_counts_cached_per_length(self):
+        """Test availability counts are reused across series of the same length."""
+        _window_ends_counts.cache_clear()
+        windows = [1, 5, 21]
+        
+        first = window_ends([date(2024, 1, 1)] * 30, windows)
+        calculate_period_returns([100.0 + i for i in range(30)], [date(2024, 1, 1)] * 30, windows)
+        
+        assert first == {'1D': 29, '5D': 25, '21D': 9}
+        info = _window_ends_counts.cache_info()
+        assert info.misses == 1 and info.hits == 1
 
 
 class TestSimpleReturns:
@@ -119,6 +150,13 @@ class TestSimpleReturns:
         expected = -0.20
         assert abs(ret - expected) < 1e-6
     
+    def test_simple_returns_array_input_returns_float(self):
+        """Test NumPy input is accepted and the result is a plain float."""
+        ret = simple_returns(np.array([100.0, 104.0, 110.0]), k=2)
+        
+        assert type(ret) is float
+        assert ret == (110.0 / 100.0) - 1
+    
     def test_simple_returns_insufficient_data(self):
         """Test with insufficient data."""
         prices = [100.0]  # Only 1 price
@@ -216,3 +254,17 @@ class TestSimpleReturnsVectorized:
         
         assert isinstance(returns, np.ndarray)
         assert returns.dtype == np.float64
+    
+    def test_simple_returns_vectorized_matches_pointwise(self):
+        """Test array-divide output equals per-window simple returns."""
+        prices = [100.0, 104.0, 99.5, 101.25, 108.0, 107.5, 111.0]
+        
+        returns = simple_returns_vectorized(prices, k=2)
+        
+        expected = [prices[i] / prices[i - 2] - 1 for i in range(2, len(prices))]
+        assert returns.tolist() == expected
+    
+    def test_simple_returns_vectorized_invalid_prices(self):
+        """Test vectorized returns reject zero or negative prices."""
+        with pytest.raises(ReturnsError, match="Zero or negative"):
+            simple_returns_vectorized([100.0, 0.0, 110.0], k=1)
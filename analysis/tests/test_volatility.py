@@ -13,7 +13,9 @@ from analysis.calculations.volatility import (
     log_returns,
     realized_vol,
     rolling_volatility,
-    VolatilityError
+    calculate_volatility_metrics,
+    VolatilityError,
+    _check_finite
 )
 
 
@@ -77,6 +79,14 @@ class TestLogReturns:
         
         assert isinstance(log_ret, np.ndarray)
         assert log_ret.dtype == np.float64
+    
+    def test_log_returns_matches_log_difference(self):
+        """Test log of price ratios equals the difference of log prices."""
+        prices = list(100 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.02, 250))))
+        
+        log_ret = log_returns(prices)
+        
+        np.testing.assert_allclose(log_ret, np.diff(np.log(prices)), rtol=0, atol=1e-14)
 
 
 class TestRealizedVolatility:
@@ -197,6 +207,62 @@ class TestRollingVolatility:
         last_3_returns = log_ret[-3:]  # [0.01, 0.00, 0.01]
         expected_last = np.std(last_3_returns, ddof=1)
         assert abs(rolling_vol[-1] - expected_last) < 1e-6
+    
+    def test_rolling_volatility_matches_per_window_std(self):
+        """Test every rolling value equals the sample std of its window."""
+        log_ret = np.random.default_rng(7).normal(0.0, 0.01, 300)
+        
+        rolling_vol = rolling_volatility(log_ret, window=21, annualize=252)
+        
+        expected = [
+            np.std(log_ret[i - 20:i + 1], ddof=1) * np.sqrt(252)
+            for i in range(20, len(log_ret))
+        ]
+        np.testing.assert_allclose(rolling_vol, expected, rtol=1e-12)
+    
+    def test_rolling_volatility_long_series_stable(self):
+        """Test prefix-sum variance stays accurate on long drifting series."""
+        log_ret = np.random.default_rng(11).normal(0.05, 0.01, 5000)
+        
+        rolling_vol = rolling_volatility(log_ret, window=252, annualize=1)
+        
+        assert rolling_vol.shape == (5000 - 252 + 1,)
+        assert abs(rolling_vol[0] - np.std(log_ret[:252], ddof=1)) < 1e-12
+        assert abs(rolling_vol[-1] - np.std(log_ret[-252:], ddof=1)) < 1e-12
+    
+    def test_rolling_volatility_constant_returns(self):
+        """Test constant returns give exactly zero (no negative variance)."""
+        rolling_vol = rolling_volatility(np.full(30, 0.01), window=5)
+        
+        assert (rolling_vol == 0.0).all()
+    
+    def test_rolling_volatility_float32_close_to_float64(self):
+        """Test the opt-in float32 path stays within 1e-6 relative of float64."""
+        prices = list(100 * np.exp(np.cumsum(np.random.default_rng(5).normal(0, 0.015, 2000))))
+        
+        vol64 = rolling_volatility(log_returns(prices), window=63)
+        vol32 = rolling_volatility(
+            log_returns(prices, dtype=np.float32), window=63, dtype=np.float32
+        )
+        
+        assert vol32.dtype == np.float32
+        np.testing.assert_allclose(vol32, vol64, rtol=1e-6)
+        assert abs(
+            realized_vol(log_returns(prices, dtype=np.float32), 63, dtype=np.float32)
+            - realized_vol(log_returns(prices), 63)
+        ) < 1e-6
+    
+    def test_rolling_volatility_rejects_non_finite(self):
+        """Test rolling volatility keeps the NaN/Inf fail-closed policy."""
+        with pytest.raises(VolatilityError, match="NaN values"):
+            rolling_volatility(np.array([0.01, np.nan, 0.02, 0.01]), window=2)
+        
+        with pytest.raises(VolatilityError, match="Infinite values"):
+            rolling_volatility(np.array([0.01, -np.inf, 0.02, 0.01]), window=2)
+    
+    def test_finite_check_accepts_huge_finite_values(self):
+        """Test finite returns are accepted even when their sum would overflow."""
+        _check_finite(np.array([1e308, 1e308, -1e308, 1e308]))
 
 
 class TestVolatilityIntegration:
@@ -262,3 +328,28 @@ class TestVolatilityIntegration:
         
         with pytest.raises(VolatilityError, match="Infinite values"):
             realized_vol(log_ret, window=3)
+
+
+class TestVolatilityMetrics:
+    """Tests for multi-window volatility metrics."""
+    
+    def test_volatility_metrics_match_realized_vol(self):
+        """Test one-pass tail sums equal realized_vol for each window."""
+        prices = list(100 * np.exp(np.cumsum(np.random.default_rng(9).normal(0.002, 0.015, 300))))
+        log_ret = log_returns(prices)
+        
+        result = calculate_volatility_metrics(prices, windows=[21, 63, 252, 400])
+        
+        for window in (21, 63, 252):
+            expected = realized_vol(log_ret, window=window, annualize=252)
+            assert abs(result[f"{window}D_annualized"] - expected) < 1e-12
+        assert result['400D_annualized'] is None
+    
+    def test_volatility_metrics_invalid_inputs_all_none(self):
+        """Test bad prices and degenerate windows give None, not errors."""
+        assert calculate_volatility_metrics([100.0, 0.0, 101.0], windows=[1, 2]) == \
+            {'1D_annualized': None, '2D_annualized': None}
+        assert calculate_volatility_metrics([100.0, 101.0, 99.0], windows=[1]) == \
+            {'1D_annualized': None}
+        assert calculate_volatility_metrics([100.0, float('nan'), 101.0], windows=[2]) == \
+            {'2D_annualized': None}
@@ -69,7 +69,7 @@ def generate_report(ticker: str, llm_enabled: bool = False):
         
         if not metrics_path.exists():
             print(f"ERROR: No metrics found for {ticker}")
-            print(f"💡 Run analysis first: python analysis/analyze_ticker.py {ticker}")
+            print(f"💡 Run analysis first: python -m analysis.analyze_ticker {ticker}")
             sys.exit(1)
         
         with open(metrics_path, 'r') as f:
@@ -227,6 +227,56 @@ class TestPriceLoader:
         count = cursor.fetchone()[0]
         assert count == 2
 
+    
+    def test_upsert_prices_duplicate_key_in_batch(self, in_memory_db):
+        """Test a key repeated within one batch counts as insert then update, last row wins."""
+        row = {
+            'ticker': 'AAPL', 'date': date(2024, 1, 15),
+            'open': 185.25, 'high': 186.80, 'low': 184.50, 'close': 185.92,
+            'adj_close': 185.75, 'volume': 65284300, 'source': 'yfinance',
+            'as_of': date(2024, 1, 15), 'ingested_at': datetime(2024, 1, 16, 9, 0, 0),
+        }
+        
+        inserted, updated = upsert_prices(in_memory_db, [row, {**row, 'close': 186.00}])
+        
+        assert (inserted, updated) == (1, 1)
+        assert in_memory_db.execute("SELECT close FROM prices").fetchall() == [(186.00,)]
+    
+    def test_upsert_prices_updates_only_conflicting_chunks(self, in_memory_db, monkeypatch):
+        """Test an overlapping re-ingest rewrites only the chunk holding the old key."""
+        monkeypatch.setattr('storage.loaders._UPSERT_CHUNK', 4)
+        base = {
+            'ticker': 'AAPL', 'open': 185.25, 'high': 186.80, 'low': 184.50,
+            'close': 185.92, 'adj_close': 185.75, 'volume': 65284300, 'source': 'yfinance',
+            'as_of': date(2024, 1, 31), 'ingested_at': datetime(2024, 2, 1, 9, 0, 0),
+        }
+        upsert_prices(in_memory_db, [{**base, 'date': date(2024, 1, 1)}])
+        
+        rows = [{**base, 'date': date(2024, 1, day), 'close': 190.0} for day in range(1, 9)]
+        rows.append({**base, 'date': date(2024, 1, 8), 'close': 191.0})  # Later duplicate wins
+        
+        statements = []
+        in_memory_db.set_trace_callback(statements.append)
+        inserted, updated = upsert_prices(in_memory_db, rows)
+        in_memory_db.set_trace_callback(None)
+        
+        assert (inserted, updated) == (7, 2)
+        assert sum(sql.lstrip().startswith('UPDATE') for sql in statements) == 4 + 1
+        assert in_memory_db.execute(
+            "SELECT close FROM prices WHERE date IN ('2024-01-01', '2024-01-02', '2024-01-08') ORDER BY date"
+        ).fetchall() == [(190.0,), (190.0,), (191.0,)]
+    
+    def test_upsert_prices_not_null_still_raises(self, in_memory_db):
+        """Test only key conflicts are skipped, not constraint violations."""
+        row = {
+            'ticker': 'AAPL', 'date': date(2024, 1, 15),
+            'open': 185.25, 'high': 186.80, 'low': 184.50, 'close': None,
+            'adj_close': 185.75, 'volume': 65284300, 'source': 'yfinance',
+            'as_of': date(2024, 1, 15), 'ingested_at': datetime(2024, 1, 16, 9, 0, 0),
+        }
+        
+        with pytest.raises(sqlite3.IntegrityError):
+            upsert_prices(in_memory_db, [row])
 
 class TestHoldings13FLoader:
     """Tests for upsert_13f function."""
@@ -412,3 +462,26 @@ class TestDatabaseInit:
         assert 'prices' in tables
         assert 'holdings_13f' in tables
         assert 'runs' in tables
+    
+    def test_init_database_latest_quarter_lookup_uses_index(self):
+        """Test holdings MAX(as_of) per ticker is served by the compound index."""
+        conn = sqlite3.connect(':memory:')
+        init_database(conn)
+        
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT MAX(as_of) FROM holdings_13f WHERE ticker = ?",
+            ('AAPL',)
+        ).fetchall()
+        
+        assert any('idx_13f_ticker_as_of' in row[-1] for row in plan)
+    
+    def test_get_connection_applies_read_pragmas(self, tmp_path):
+        """Test that get_connection configures WAL and read-path PRAGMAs."""
+        conn = get_connection(str(tmp_path / 'research.db'))
+        
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        
+        conn.close()